@@ -0,0 +1,248 @@
+const path = require('path');
+const os = require('os');
+const crypto = require('crypto');
+const fs = require('fs-extra');
+const { execFile } = require('child_process');
+const ffmpegPath = require('ffmpeg-static');
+const { getMediaInfoBatch } = require('./dist/service/mediaIndex');
+const {
+  SEGMENT_BANK_DIR,
+  SEGMENT_BANK_FILE,
+  SEGMENT_BANK_VERSION,
+  BANK_FPS,
+  BANK_ENCODE_OPTIONS,
+  loadSegmentBank
+} = require('./dist/service/segmentBank');
+
+// Pre-cut the standardized clips into fixed-length, closed-GOP segments so
+// background video can be assembled by concat alone (see src/service/segmentBank.ts).
+//
+// Usage: node build-segment-bank.js [standardizedDir] [--segment-seconds N] [--jobs N] [--threads N]
+// Run it after standardize-videos.js; unchanged clips are skipped.
+
+function parseArgs(argv) {
+  const options = {
+    standardizedDir: path.join(__dirname, 'standardized_videos'),
+    segmentSeconds: parseFloat(process.env.SEGMENT_SECONDS || '2'),
+    threads: parseInt(process.env.STANDARDIZE_THREADS || '2', 10),
+    jobs: process.env.STANDARDIZE_JOBS ? parseInt(process.env.STANDARDIZE_JOBS, 10) : null
+  };
+  for (let i = 0; i < argv.length; i++) {
+    if (argv[i] === '--segment-seconds') {
+      options.segmentSeconds = parseFloat(argv[++i]);
+    } else if (argv[i] === '--jobs') {
+      options.jobs = parseInt(argv[++i], 10);
+    } else if (argv[i] === '--threads') {
+      options.threads = parseInt(argv[++i], 10);
+    } else {
+      options.standardizedDir = path.resolve(argv[i]);
+    }
+  }
+  // Segments must be a whole number of frames
+  options.segmentSeconds = Math.max(1, Math.round(options.segmentSeconds * BANK_FPS)) / BANK_FPS;
+  options.threads = Math.max(1, options.threads || 1);
+  options.jobs = Math.max(1, options.jobs || Math.floor(os.cpus().length / options.threads));
+  return options;
+}
+
+/**
+ * Themes as extendVideoToMatchAudio sees them: each subfolder, or the root when there are none.
+ */
+async function listThemes(standardizedDir) {
+  const entries = await fs.readdir(standardizedDir, { withFileTypes: true });
+  const subfolders = entries.filter(e => e.isDirectory()).map(e => e.name).sort();
+  const themes = subfolders.length > 0 ? subfolders : [''];
+  const result = {};
+  for (const theme of themes) {
+    const dir = path.join(standardizedDir, theme);
+    result[theme] = (await fs.readdir(dir)).filter(f => /\.mp4$/i.test(f)).sort().map(f => path.join(dir, f));
+  }
+  return result;
+}
+
+function runFfmpeg(args) {
+  return new Promise((resolve, reject) => {
+    execFile(ffmpegPath || 'ffmpeg', args, { maxBuffer: 16 * 1024 * 1024 }, (error, stdout, stderr) => {
+      if (error) {
+        reject(new Error(stderr || error.message));
+      } else {
+        resolve();
+      }
+    });
+  });
+}
+
+/**
+ * Encode one clip into segments with a forced IDR frame every segmentSeconds.
+ * Segments go to a temporary directory that replaces the clip's directory when complete.
+ */
+async function cutClip(clipPath, clipDir, segmentSeconds, threads) {
+  const partialDir = `${clipDir}.partial`;
+  await fs.remove(partialDir);
+  await fs.ensureDir(partialDir);
+  try {
+    await runFfmpeg([
+      '-y',
+      '-i', clipPath,
+      ...BANK_ENCODE_OPTIONS,
+      '-force_key_frames', `expr:gte(t,n_forced*${segmentSeconds})`,
+      '-forced-idr', '1',
+      '-sc_threshold', '0',
+      '-threads', String(threads),
+      '-f', 'segment',
+      '-segment_time', String(segmentSeconds),
+      '-segment_format', 'mp4',
+      '-reset_timestamps', '1',
+      path.join(partialDir, 'seg_%04d.mp4')
+    ]);
+    await fs.remove(clipDir);
+    await fs.rename(partialDir, clipDir);
+  } catch (error) {
+    await fs.remove(partialDir);
+    throw error;
+  }
+
+  // Keep only full-length segments; the clip's last one is usually shorter
+  const files = (await fs.readdir(clipDir)).filter(f => f.endsWith('.mp4')).sort();
+  const paths = files.map(f => path.join(clipDir, f));
+  const info = await getMediaInfoBatch(paths);
+  const segmentFrames = Math.round(segmentSeconds * BANK_FPS);
+  const kept = [];
+  for (let i = 0; i < paths.length; i++) {
+    const frames = info[i].frameCount || Math.round(info[i].duration * BANK_FPS);
+    if (frames === segmentFrames) {
+      kept.push(paths[i]);
+    } else {
+      await fs.remove(paths[i]);
+    }
+  }
+  return kept;
+}
+
+async function saveBank(bankPath, bank) {
+  const tempPath = `${bankPath}.tmp`;
+  await fs.writeJson(tempPath, bank, { spaces: 2 });
+  await fs.rename(tempPath, bankPath);
+}
+
+/**
+ * Run tasks with at most `limit` in flight.
+ */
+async function runPool(tasks, limit, worker) {
+  let next = 0;
+  const runners = Array.from({ length: Math.min(limit, tasks.length) }, async () => {
+    while (next < tasks.length) {
+      const task = tasks[next++];
+      await worker(task);
+    }
+  });
+  await Promise.all(runners);
+}
+
+async function buildSegmentBank() {
+  const { standardizedDir, segmentSeconds, jobs, threads } = parseArgs(process.argv.slice(2));
+  const bankPath = path.join(SEGMENT_BANK_DIR, SEGMENT_BANK_FILE);
+  // Segments cut with other settings or another length are cut again
+  const settings = crypto.createHash('sha256')
+    .update(`${BANK_ENCODE_OPTIONS.join(' ')} ${segmentSeconds}`)
+    .digest('hex').slice(0, 16);
+
+  console.log('🧱 Segment Bank Builder');
+  console.log('=======================');
+
+  if (!await fs.pathExists(standardizedDir)) {
+    console.error(`❌ Standardized videos directory not found: ${standardizedDir}`);
+    console.log("Run 'node standardize-videos.js' first.");
+    process.exit(1);
+  }
+  await fs.ensureDir(SEGMENT_BANK_DIR);
+
+  const themes = await listThemes(standardizedDir);
+  const existing = await loadSegmentBank();
+  const bank = {
+    version: SEGMENT_BANK_VERSION,
+    segmentSeconds,
+    settings,
+    themes: {}
+  };
+
+  const pending = [];
+  let skipped = 0;
+  for (const [theme, clips] of Object.entries(themes)) {
+    bank.themes[theme] = {};
+    for (const clipPath of clips) {
+      const name = path.parse(clipPath).name;
+      const stats = await fs.stat(clipPath);
+      const mtimeMs = Math.floor(stats.mtimeMs);
+      const previous = existing && existing.settings === settings && existing.themes[theme] && existing.themes[theme][name];
+      if (previous && previous.size === stats.size && previous.mtimeMs === mtimeMs &&
+          (await Promise.all(previous.segments.map(s => fs.pathExists(path.join(SEGMENT_BANK_DIR, s))))).every(Boolean)) {
+        bank.themes[theme][name] = previous;
+        skipped++;
+        continue;
+      }
+      pending.push({ theme, name, clipPath, size: stats.size, mtimeMs });
+    }
+  }
+
+  // Remove segment directories of clips that are gone
+  const current = new Set(Object.entries(themes).flatMap(([theme, clips]) =>
+    clips.map(clipPath => path.join(theme, path.parse(clipPath).name))));
+  if (existing) {
+    for (const [theme, clips] of Object.entries(existing.themes)) {
+      for (const name of Object.keys(clips)) {
+        if (!current.has(path.join(theme, name))) {
+          console.log(`🗑️  Removing segments of ${path.join(theme, name)}`);
+          await fs.remove(path.join(SEGMENT_BANK_DIR, theme, name));
+        }
+      }
+    }
+  }
+
+  console.log(`📁 ${Object.keys(themes).length} themes, ${pending.length + skipped} clips (${pending.length} to cut, ${skipped} unchanged)`);
+  console.log(`⚙️  ${segmentSeconds}s segments, ${jobs} encodes at a time with ${threads} threads each`);
+  console.log('');
+
+  const startTime = Date.now();
+  let completed = 0;
+  let failed = 0;
+  let bankWrite = Promise.resolve();
+
+  await runPool(pending, jobs, async ({ theme, name, clipPath, size, mtimeMs }) => {
+    const clipDir = path.join(SEGMENT_BANK_DIR, theme, name);
+    try {
+      const segments = await cutClip(clipPath, clipDir, segmentSeconds, threads);
+      completed++;
+      bank.themes[theme][name] = {
+        source: clipPath,
+        size,
+        mtimeMs,
+        segments: segments.map(s => path.relative(SEGMENT_BANK_DIR, s))
+      };
+      console.log(`   ✅ [${completed + failed}/${pending.length}] ${theme ? `${theme}/` : ''}${name}: ${segments.length} segments`);
+      bankWrite = bankWrite.then(() => saveBank(bankPath, bank));
+      await bankWrite;
+    } catch (error) {
+      failed++;
+      console.error(`   ❌ [${completed + failed}/${pending.length}] Failed to cut ${clipPath}:`, error.message);
+    }
+  });
+
+  await saveBank(bankPath, bank);
+
+  const segmentCount = Object.values(bank.themes)
+    .reduce((sum, clips) => sum + Object.values(clips).reduce((n, clip) => n + clip.segments.length, 0), 0);
+  console.log('');
+  console.log('🎉 Segment bank ready!');
+  console.log(`✅ ${segmentCount} segments (${(segmentCount * segmentSeconds / 60).toFixed(1)} min of footage) in ${SEGMENT_BANK_DIR}`);
+  console.log(`⏱️  Cutting time: ${((Date.now() - startTime) / 1000).toFixed(1)}s (${completed} cut, ${skipped} unchanged, ${failed} failed)`);
+
+  if (failed > 0) {
+    process.exitCode = 1;
+  }
+}
+
+buildSegmentBank().catch(error => {
+  console.error('💥 Script failed:', error);
+  process.exit(1);
+});
@@ -8,6 +8,10 @@ import subprocess
 import os
 from pathlib import Path
 
+from resource_scheduler import core_allotment, ffmpeg_thread_args
+from progress import ProgressReporter, run_ffmpeg_with_progress
+from media_index import get_media_info
+
 def check_ffmpeg():
     """Check if ffmpeg is available."""
     try:
@@ -16,9 +20,13 @@ def check_ffmpeg():
     except (subprocess.CalledProcessError, FileNotFoundError):
         return False
 
-def burn_subtitles_alternative(video_path, subtitle_path, output_path):
+def burn_subtitles_alternative(video_path, subtitle_path, output_path, threads=None, reporter=None):
     """
     Alternative method to burn subtitles using a simpler ffmpeg approach.
+    
+    Args:
+        threads: Cap on ffmpeg threads (defaults to ffmpeg's automatic choice)
+        reporter: ProgressReporter fed from ffmpeg's -progress output (optional)
     """
     try:
         print(f"Burning subtitles into video...")
@@ -42,18 +50,22 @@ def burn_subtitles_alternative(video_path, subtitle_path, output_path):
             '-c:v', 'libx264',
             '-preset', 'medium',
             '-crf', '23',
+            *(ffmpeg_thread_args(threads) if threads else []),
             '-y',
             str(output_path)
         ]
         
         print("Running alternative ffmpeg command...")
         
-        process = subprocess.run(
-            ffmpeg_cmd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        if reporter is not None:
+            run_ffmpeg_with_progress(ffmpeg_cmd, reporter)
+        else:
+            subprocess.run(
+                ffmpeg_cmd,
+                capture_output=True,
+                text=True,
+                check=True
+            )
         
         print("Successfully burned subtitles using alternative method!")
         return True
@@ -63,15 +75,19 @@ def burn_subtitles_alternative(video_path, subtitle_path, output_path):
         print(f"FFmpeg stderr: {e.stderr}")
         
         # Try the simplest possible method
-        return burn_subtitles_simple(video_path, subtitle_path, output_path)
+        return burn_subtitles_simple(video_path, subtitle_path, output_path, threads, reporter)
     
     except Exception as e:
         print(f"Error with alternative method: {e}")
         return False
 
-def burn_subtitles_simple(video_path, subtitle_path, output_path):
+def burn_subtitles_simple(video_path, subtitle_path, output_path, threads=None, reporter=None):
     """
     Simplest subtitle burning method with center positioning.
+    
+    Args:
+        threads: Cap on ffmpeg threads (defaults to ffmpeg's automatic choice)
+        reporter: ProgressReporter fed from ffmpeg's -progress output (optional)
     """
     try:
         print("Using simplest subtitle burning method...")
@@ -82,18 +98,22 @@ def burn_subtitles_simple(video_path, subtitle_path, output_path):
             '-i', str(video_path),
             '-vf', f"subtitles={str(subtitle_path)}:force_style='Alignment=10,MarginV=0,FontSize=20,PrimaryColour=&Hffffff,OutlineColour=&H000000,Outline=2'",
             '-c:a', 'copy',
+            *(ffmpeg_thread_args(threads) if threads else []),
             '-y',
             str(output_path)
         ]
         
         print("Running simple ffmpeg command...")
         
-        process = subprocess.run(
-            ffmpeg_cmd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        if reporter is not None:
+            run_ffmpeg_with_progress(ffmpeg_cmd, reporter)
+        else:
+            subprocess.run(
+                ffmpeg_cmd,
+                capture_output=True,
+                text=True,
+                check=True
+            )
         
         print("Successfully burned subtitles using simple method!")
         return True
@@ -139,8 +159,16 @@ def main():
         print("Run 'python generate_subtitles_only.py' first to generate subtitle files")
         return 1
     
-    # Burn subtitles into video using the working alternative method
-    success = burn_subtitles_alternative(video_path, subtitle_path, output_video_path)
+    # Burn subtitles into video using the working alternative method,
+    # within this stage's share of the host's cores
+    total_frames = get_media_info(str(video_path))['frameCount'] or None
+    with core_allotment('burn-subtitles') as cores:
+        # Progress is published for /api/pipeline/status (see progress.py) once the stage has its cores,
+        # so waiting for them does not read as a stalled stage
+        reporter = ProgressReporter('burn-subtitles', total=total_frames)
+        success = burn_subtitles_alternative(video_path, subtitle_path, output_video_path, threads=cores,
+                                             reporter=reporter)
+    reporter.finish(error=None if success else "Subtitle burn failed")
     
     if success:
         print("\nSUCCESS!")
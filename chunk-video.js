@@ -101,12 +101,51 @@ async function chunkVideo(inputPath, outputDir) {
   console.log(`All ${numChunks} chunks created successfully in ${outputDir}`);
 }
 
+// Cut at keyframes with chunk_planner.py (exact boundaries, manifest for the overlay stage)
+function runChunkPlanner(inputPath, outputDir) {
+  const { spawn } = require('child_process');
+  const planner = spawn(
+    process.env.PYTHON || 'python3',
+    [
+      path.join(__dirname, 'chunk_planner.py'),
+      inputPath,
+      outputDir,
+      '--min', String(MIN_CHUNK_DURATION),
+      '--max', String(MAX_CHUNK_DURATION)
+    ],
+    { stdio: 'inherit' }
+  );
+  return new Promise((resolve, reject) => {
+    planner.on('error', reject);
+    planner.on('exit', (code) => {
+      if (code === 0) resolve();
+      else reject(new Error(`chunk_planner.py exited with code ${code}`));
+    });
+  });
+}
+
 // Run the function
 (async () => {
   try {
     console.log(`Starting video chunking process...`);
     console.log(`Input video: ${inputVideo}`);
     console.log(`Output directory: ${outputDir}`);
+    if (process.env.CHUNK_PLANNER !== 'duration') {
+      try {
+        await runChunkPlanner(inputVideo, outputDir);
+        return;
+      } catch (error) {
+        console.warn(`Keyframe chunk planner failed (${error.message}); falling back to duration-based chunking`);
+      }
+    }
+    // Duration-based chunks: drop any manifest and the chunks kept from the last job,
+    // so the overlay stage does not pick up stale ones
+    await fs.remove(path.join(outputDir, 'manifest.json'));
+    if (await fs.pathExists(outputDir)) {
+      for (const name of await fs.readdir(outputDir)) {
+        if (/^chunk_\d+\.mp4$/.test(name)) await fs.remove(path.join(outputDir, name));
+      }
+    }
     await chunkVideo(inputVideo, outputDir);
   } catch (error) {
     console.error('Error:', error);
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Keyframe-aware chunk planner.
+Reads the keyframe timestamps of the subtitled video from ffprobe packet
+flags (through the shared media index), picks chunk boundaries that land
+exactly on keyframes within the duration limits, cuts the chunks with stream
+copy in a single ffmpeg pass, and writes a manifest for the overlay stage.
+"""
+
+import os
+import sys
+import json
+import math
+import argparse
+import subprocess
+from pathlib import Path
+
+from media_index import get_media_info, probe_file
+
+# Chunk duration limits in seconds
+MIN_CHUNK_DURATION = 45
+MAX_CHUNK_DURATION = 85
+
+MANIFEST_FILE = 'manifest.json'
+
+# Cost per second a chunk falls outside the limits, used only when the keyframes allow no valid plan
+OUT_OF_RANGE_PENALTY = 1e6
+
+
+def plan_boundaries(keyframes, duration, min_duration=MIN_CHUNK_DURATION, max_duration=MAX_CHUNK_DURATION):
+    """
+    Choose chunk start times from the keyframes.
+
+    Chunk count is picked the same way as chunk-video.js (fewest chunks that
+    respect the maximum, reduced while they would undercut the minimum), and
+    a dynamic program over the keyframes then picks the boundaries whose
+    chunks are closest to equal length, with every chunk within the limits
+    whenever the keyframes allow it.
+
+    Args:
+        keyframes (list): Keyframe timestamps in seconds, ascending
+        duration (float): Video duration in seconds
+        min_duration (float): Shortest allowed chunk
+        max_duration (float): Longest allowed chunk
+
+    Returns:
+        list: Chunk start times (the first is always 0.0)
+    """
+    if duration <= max_duration:
+        return [0.0]
+
+    num_chunks = math.ceil(duration / max_duration)
+    while duration / num_chunks < min_duration and num_chunks > 1:
+        num_chunks -= 1
+    target = duration / num_chunks
+
+    # Candidate boundaries: keyframes strictly inside the video, plus the start and end
+    points = [0.0] + [t for t in keyframes if 0.0 < t < duration] + [duration]
+
+    def segment_cost(length):
+        cost = (length - target) ** 2
+        if length < min_duration:
+            cost += OUT_OF_RANGE_PENALTY * (min_duration - length)
+        elif length > max_duration:
+            cost += OUT_OF_RANGE_PENALTY * (length - max_duration)
+        return cost
+
+    best = [math.inf] * len(points)
+    previous = [None] * len(points)
+    best[0] = 0.0
+    for j in range(1, len(points)):
+        for i in range(j - 1, -1, -1):
+            length = points[j] - points[i]
+            # Segments far beyond the maximum cannot win once a valid one exists
+            if length > 2 * max_duration and best[j] < OUT_OF_RANGE_PENALTY:
+                break
+            cost = best[i] + segment_cost(length)
+            if cost < best[j]:
+                best[j] = cost
+                previous[j] = i
+
+    starts = []
+    j = len(points) - 1
+    while previous[j] is not None:
+        j = previous[j]
+        starts.append(points[j])
+    return sorted(starts)
+
+
+def cut_chunks(input_path, starts, output_dir):
+    """
+    Cut the video at the given keyframe times with stream copy in one ffmpeg pass.
+
+    The segment muxer cuts at the first keyframe at or after each time; the
+    times are nudged back by a millisecond so rounding never skips a keyframe.
+
+    Returns:
+        list: Chunk file paths in order
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    cut_times = [max(0.0, t - 0.001) for t in starts[1:]]
+
+    ffmpeg_cmd = [
+        'ffmpeg', '-y',
+        '-i', str(input_path),
+        '-map', '0',
+        '-c', 'copy',
+        '-f', 'segment',
+        '-segment_start_number', '1',
+        '-reset_timestamps', '1',
+        '-avoid_negative_ts', 'make_zero'
+    ]
+    if cut_times:
+        ffmpeg_cmd += ['-segment_times', ','.join(f"{t:.6f}" for t in cut_times)]
+    else:
+        # One chunk: make sure the muxer never splits on its default 2 s interval
+        ffmpeg_cmd += ['-segment_time', str(10 ** 9)]
+    ffmpeg_cmd.append(os.path.join(output_dir, 'chunk_%d.mp4'))
+
+    subprocess.run(ffmpeg_cmd, capture_output=True, text=True, check=True)
+    return [os.path.join(output_dir, f'chunk_{i}.mp4') for i in range(1, len(starts) + 1)]
+
+
+def _clear_chunks(output_dir):
+    """Remove chunks and the manifest left by an earlier run."""
+    if not os.path.isdir(output_dir):
+        return
+    for name in os.listdir(output_dir):
+        if (name.startswith('chunk_') and name.endswith('.mp4')) or name == MANIFEST_FILE:
+            os.remove(os.path.join(output_dir, name))
+
+
+def plan_and_cut(input_path, output_dir, min_duration=MIN_CHUNK_DURATION, max_duration=MAX_CHUNK_DURATION):
+    """
+    Plan keyframe-aligned chunks, cut them and write the manifest.
+
+    Returns:
+        dict: The manifest
+    """
+    info = get_media_info(str(input_path), keyframes=True)
+    duration = info['duration']
+    keyframes = info['keyframes'] or []
+    print(f"Video duration: {duration:.2f}s, {len(keyframes)} keyframes")
+
+    starts = plan_boundaries(keyframes, duration, min_duration, max_duration)
+    ends = starts[1:] + [duration]
+
+    _clear_chunks(output_dir)
+    files = cut_chunks(input_path, starts, output_dir)
+
+    chunks = []
+    for index, (path, start, end) in enumerate(zip(files, starts, ends), 1):
+        actual = probe_file(path)['duration']
+        in_range = min_duration <= end - start <= max_duration or len(starts) == 1
+        chunks.append({
+            'index': index,
+            'file': os.path.basename(path),
+            'start': round(start, 6),
+            'end': round(end, 6),
+            'duration': round(end - start, 6),
+            'actualDuration': round(actual, 3),
+            'withinLimits': in_range
+        })
+        print(f"Chunk {index}/{len(starts)}: start={start:.3f}s, duration={end - start:.3f}s"
+              + ("" if in_range else " (outside limits: no suitable keyframe)"))
+
+    manifest = {
+        'source': os.path.abspath(input_path),
+        'duration': duration,
+        'minDuration': min_duration,
+        'maxDuration': max_duration,
+        'chunks': chunks
+    }
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(f"{manifest_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    print(f"All {len(chunks)} chunks created in {output_dir}")
+    return manifest
+
+
+def load_manifest(output_dir):
+    """
+    Return the chunk files listed in a chunk directory's manifest, in order.
+
+    Returns:
+        list: Chunk paths, or None when there is no manifest
+    """
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    chunks = sorted(manifest['chunks'], key=lambda chunk: chunk['index'])
+    return [os.path.join(output_dir, chunk['file']) for chunk in chunks]
+
+
+def main():
+    """Plan and cut chunks from the command line."""
+    project_root = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="Cut a video into keyframe-aligned chunks")
+    parser.add_argument('input', nargs='?', default=str(project_root / 'output' / 'final_video_with_subtitles.mp4'),
+                        help="Video to chunk")
+    parser.add_argument('output_dir', nargs='?', default=str(project_root / 'output' / 'chunks'),
+                        help="Directory for the chunks and manifest")
+    parser.add_argument('--min', type=float, default=MIN_CHUNK_DURATION, help="Shortest chunk in seconds")
+    parser.add_argument('--max', type=float, default=MAX_CHUNK_DURATION, help="Longest chunk in seconds")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"Error: Input video not found at {args.input}")
+        return 1
+
+    try:
+        plan_and_cut(args.input, args.output_dir, args.min, args.max)
+        return 0
+    except subprocess.CalledProcessError as e:
+        print(f"ffmpeg failed while cutting chunks: {e.stderr}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
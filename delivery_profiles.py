@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Delivery encoding profiles for the final video chunks.
+The overlay stage encodes each chunk once with one of these profiles, and the
+upload step sends the files as they are. Extra renditions (e.g. a small
+review proxy) can be encoded in the same ffmpeg run: the composited frames
+are decoded once and split to one scaled encode per rendition.
+"""
+
+import os
+
+# 'web' matches the settings the upload step used to re-encode with
+DELIVERY_PROFILES = {
+    'web': {
+        'crf': 28,
+        'preset': 'faster',
+        'audio_bitrate': '128k'
+    },
+    'high': {
+        'crf': 23,
+        'preset': 'medium',
+        'audio_bitrate': '192k'
+    },
+    'draft': {
+        'crf': 32,
+        'preset': 'veryfast',
+        'audio_bitrate': '96k'
+    }
+}
+
+# Profile used when none is given; override with DELIVERY_PROFILE
+DEFAULT_PROFILE = os.environ.get('DELIVERY_PROFILE', 'web')
+
+# Extra renditions encoded next to each deliverable. 'size' is the output
+# width and height, and 'subdir' is where the files go, relative to the
+# deliverable's directory, so uploads of that directory skip them
+RENDITIONS = {
+    'proxy': {
+        'size': (480, 854),
+        'subdir': 'proxy',
+        'profile': {
+            'crf': 30,
+            'preset': 'veryfast',
+            'audio_bitrate': '64k'
+        }
+    }
+}
+
+# Renditions encoded by default; set DELIVERY_RENDITIONS=proxy to add the review proxy
+DEFAULT_RENDITIONS = [name.strip() for name in os.environ.get('DELIVERY_RENDITIONS', '').split(',') if name.strip()]
+
+
+def get_profile(name=None):
+    """
+    Look up a delivery profile by name.
+
+    Args:
+        name (str): Profile name (defaults to DEFAULT_PROFILE)
+
+    Returns:
+        dict: crf, preset and audio_bitrate
+    """
+    name = name or DEFAULT_PROFILE
+    if name not in DELIVERY_PROFILES:
+        raise ValueError(f"Unknown delivery profile '{name}'. Available: {', '.join(DELIVERY_PROFILES)}")
+    return DELIVERY_PROFILES[name]
+
+
+def get_rendition(name):
+    """
+    Look up an extra rendition by name.
+
+    Returns:
+        dict: size, subdir and profile
+    """
+    if name not in RENDITIONS:
+        raise ValueError(f"Unknown rendition '{name}'. Available: {', '.join(RENDITIONS)}")
+    return RENDITIONS[name]
+
+
+def video_encode_args(profile):
+    """Return the ffmpeg video encoder arguments for a profile."""
+    return [
+        '-c:v', 'libx264',
+        '-crf', str(profile['crf']),
+        '-preset', profile['preset'],
+        '-pix_fmt', 'yuv420p'
+    ]
+
+
+def audio_encode_args(profile):
+    """Return the ffmpeg audio encoder arguments for a profile."""
+    return ['-c:a', 'aac', '-b:a', profile['audio_bitrate']]
+
+
+def delivery_encode_args(profile):
+    """Return the ffmpeg arguments that encode a deliverable MP4 with a profile."""
+    return [*video_encode_args(profile), *audio_encode_args(profile), '-movflags', '+faststart']
+
+
+def rendition_output_args(output_file, profile, renditions=(), video='0:v:0', audio='1:a:0?', output_args=()):
+    """
+    Return the ffmpeg output arguments for a deliverable and its extra renditions.
+
+    With no extra renditions this is a plain delivery encode. Otherwise the
+    video is split once and each rendition gets its own scale and encoder, so
+    an extra rendition costs only its encode. Rendition directories are
+    created as needed.
+
+    Args:
+        output_file (str): Path of the main deliverable
+        profile (dict): Delivery profile of the main deliverable
+        renditions (list): Names of extra renditions (see RENDITIONS)
+        video (str): Input video stream specifier
+        audio (str): Input audio stream specifier (None for video-only outputs)
+        output_args (list): Arguments repeated for every output (e.g. threads)
+
+    Returns:
+        tuple: (ffmpeg arguments, output paths with the main deliverable first)
+    """
+    audio_map = ['-map', audio] if audio else []
+    if not renditions:
+        args = ['-map', video, *audio_map, *delivery_encode_args(profile), *output_args, output_file]
+        return args, [output_file]
+
+    labels = [f'[r{i}]' for i in range(len(renditions) + 1)]
+    filters = [f"[{video}]split={len(labels)}{''.join(labels)}"]
+    args = ['-map', labels[0], *audio_map, *delivery_encode_args(profile), *output_args, output_file]
+    outputs = [output_file]
+
+    for i, name in enumerate(renditions, 1):
+        rendition = get_rendition(name)
+        width, height = rendition['size']
+        filters.append(f"{labels[i]}scale={width}:{height},setsar=1[s{i}]")
+
+        rendition_dir = os.path.join(os.path.dirname(output_file), rendition['subdir'])
+        os.makedirs(rendition_dir, exist_ok=True)
+        rendition_file = os.path.join(rendition_dir, os.path.basename(output_file))
+        args += ['-map', f'[s{i}]', *audio_map, *delivery_encode_args(rendition['profile']), *output_args,
+                 rendition_file]
+        outputs.append(rendition_file)
+
+    return ['-filter_complex', ';'.join(filters), *args], outputs
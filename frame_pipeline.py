@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Pipelined frame processing for the OpenCV stages.
+A decoder thread reads frames into a fixed ring of preallocated arrays,
+compose workers draw on them, and a writer thread hands them to the encoder
+in frame order. Decode, compose and encode of one video overlap on separate
+cores, since OpenCV releases the GIL while it decodes, draws and encodes.
+Memory use is capped by the ring size.
+"""
+
+import os
+import queue
+import threading
+
+import numpy as np
+
+# Frames held in memory at once (decoded, being composed or waiting to be written)
+RING_FRAMES = int(os.environ.get('OVERLAY_RING_FRAMES', '16'))
+
+# Seconds between checks for a failed stage while waiting on a queue
+_POLL_SECONDS = 0.1
+
+
+class FramePipeline:
+    """
+    Run read -> compose -> write over the frames of one video on three stages of threads.
+
+    compose(index, frame) edits a frame in place and may run on several
+    frames at once; write(frame) is called in frame order and must be done
+    with the array when it returns, since the slot is then reused.
+    """
+
+    def __init__(self, read, compose, write, shape, workers=2, ring_frames=RING_FRAMES, limit=None,
+                 on_written=None):
+        """
+        Args:
+            read (callable): read(buffer) -> frame or None at the end; fills buffer when it can
+            compose (callable): compose(index, frame), drawing on the frame in place
+            write (callable): write(frame), in frame order
+            shape (tuple): Frame array shape (height, width, channels)
+            workers (int): Compose threads
+            ring_frames (int): Preallocated frame arrays
+            limit (int): Stop after this many frames (defaults to the end of the input)
+            on_written (callable): on_written(frames_written), after each write (e.g. progress)
+        """
+        self.read = read
+        self.compose = compose
+        self.write = write
+        self.workers = max(1, workers)
+        self.limit = limit
+        self.on_written = on_written
+        # At least one frame per stage, so every thread can make progress
+        self.ring = [np.empty(shape, dtype=np.uint8) for _ in range(max(ring_frames, self.workers + 2))]
+        self.frames = 0
+        self._free = queue.Queue()
+        self._composing = queue.Queue()
+        self._done = {}
+        self._done_ready = threading.Condition()
+        self._decoded_total = None
+        self._stop = threading.Event()
+        self._error = None
+
+    def _fail(self, error):
+        if self._error is None:
+            self._error = error
+        self._stop.set()
+        with self._done_ready:
+            self._done_ready.notify_all()
+
+    def _get(self, q):
+        """Block on a queue until an item arrives or another stage fails (then None)"""
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return None
+
+    def _decode(self):
+        index = 0
+        try:
+            while self.limit is None or index < self.limit:
+                slot = self._get(self._free)
+                if slot is None:
+                    return
+                buffer = self.ring[slot]
+                frame = self.read(buffer)
+                if frame is None:
+                    break
+                if frame is not buffer:
+                    np.copyto(buffer, frame)
+                self._composing.put((index, slot))
+                index += 1
+        except Exception as e:
+            self._fail(e)
+            return
+        finally:
+            for _ in range(self.workers):
+                self._composing.put(None)
+        with self._done_ready:
+            self._decoded_total = index
+            self._done_ready.notify_all()
+
+    def _compose(self):
+        try:
+            while not self._stop.is_set():
+                item = self._composing.get()
+                if item is None:
+                    return
+                index, slot = item
+                self.compose(index, self.ring[slot])
+                with self._done_ready:
+                    self._done[index] = slot
+                    self._done_ready.notify_all()
+        except Exception as e:
+            self._fail(e)
+
+    def _write(self):
+        try:
+            while True:
+                with self._done_ready:
+                    while (self.frames not in self._done and self._decoded_total != self.frames
+                           and not self._stop.is_set()):
+                        self._done_ready.wait(_POLL_SECONDS)
+                    if self._stop.is_set() or self.frames not in self._done:
+                        return
+                    slot = self._done.pop(self.frames)
+                self.write(self.ring[slot])
+                self.frames += 1
+                self._free.put(slot)
+                if self.on_written:
+                    self.on_written(self.frames)
+        except Exception as e:
+            self._fail(e)
+
+    def run(self):
+        """
+        Process every frame, returning the number written.
+
+        Raises the first error of any stage after all threads have stopped.
+        """
+        for slot in range(len(self.ring)):
+            self._free.put(slot)
+        threads = [threading.Thread(target=self._decode, name='frame-decode', daemon=True)]
+        threads += [threading.Thread(target=self._compose, name=f'frame-compose-{i}', daemon=True)
+                    for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        # The calling thread is the writer
+        self._write()
+        self._stop.set()
+        for thread in threads:
+            thread.join()
+        if self._error is not None:
+            raise self._error
+        return self.frames
+
+
+def capture_reader(cap):
+    """Return a FramePipeline read function for a cv2.VideoCapture, decoding into the ring slot."""
+    def read(buffer):
+        ret, frame = cap.read(buffer)
+        return frame if ret else None
+    return read
+
+
+def compose_workers(cores):
+    """Compose threads for a core allotment: what is left after the decode and write threads."""
+    return max(1, (cores or 1) - 2)
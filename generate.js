@@ -1,13 +1,13 @@
 const path = require('path');
+const crypto = require('crypto');
 const fs = require('fs-extra');
-const userText = fs.readFileSync('./userText.txt', 'utf8');
 
 // Import the compiled JS
-const { generateTTS } = require('./dist/service/tts');
-const { concatenateVideos, overlayAudioOnVideo, extendVideoToMatchAudio } = require('./dist/service/video');
+const { generateTTSBatch } = require('./dist/service/tts');
+const { concatenateVideos, overlayAudioOnVideo, extendVideoToMatchAudio, buildFinalVideo } = require('./dist/service/video');
 
-// Function to split text into chunks without breaking words
-function splitTextIntoChunks(text, maxLen = 4000) {
+// Split one over-long piece of text into chunks without breaking words
+function splitAtWords(text, maxLen) {
   const chunks = [];
   let currentIndex = 0;
   
@@ -24,15 +24,82 @@ function splitTextIntoChunks(text, maxLen = 4000) {
     }
     
     chunks.push(text.slice(currentIndex, endIndex));
-    currentIndex = endIndex + 1; // Skip the space
+    // Skip the space, but not a character of a word too long to split at a space
+    currentIndex = text[endIndex] === ' ' ? endIndex + 1 : endIndex;
   }
   
   return chunks;
 }
 
+// Whether a chunk may end after this sentence: decided by the sentence's own text,
+// so an edit elsewhere in the story does not move the boundary (about 1 in 4 sentences qualify)
+function isContentBoundary(sentence) {
+  const digest = crypto.createHash('sha1').update(sentence.trim()).digest();
+  return digest[0] % 4 === 0;
+}
+
+// Function to split text into chunks at sentence boundaries chosen by content.
+// Chunk boundaries stay put when a sentence elsewhere changes, so unchanged chunks hit the TTS cache.
+function splitTextIntoChunks(text, maxLen = 4000, minLen = 1500) {
+  const chunks = [];
+  let current = '';
+  
+  const flush = () => {
+    if (current.trim()) chunks.push(current.trim());
+    current = '';
+  };
+  
+  // Sentences keep their trailing punctuation and whitespace. Every character belongs to a sentence,
+  // including punctuation at the start of a line; a trailing sentence may lack punctuation
+  const sentences = text.match(/[^.!?\n]*(?:[.!?]+["')\]]*|\n)\s*|[^.!?\n]+/g) || [];
+  for (const sentence of sentences) {
+    if (sentence.length > maxLen) {
+      flush();
+      chunks.push(...splitAtWords(sentence.trim(), maxLen));
+      continue;
+    }
+    if (current.length + sentence.length > maxLen) {
+      flush();
+    }
+    current += sentence;
+    const endsParagraph = /\n\s*\n\s*$/.test(sentence);
+    if (current.length >= minLen && (endsParagraph || isContentBoundary(sentence))) {
+      flush();
+    }
+  }
+  flush();
+  
+  return chunks;
+}
+
 // Generate a unique runId for this script execution
 const runId = new Date().toISOString().replace(/[-:.TZ]/g, '');
 
+// Transcribe TTS chunks while the rest of the job runs (STREAM_SUBTITLES=1)
+const streamSubtitles = process.env.STREAM_SUBTITLES === '1';
+
+// Start the streaming transcriber on this run's temp directory
+function startSubtitleWatcher(tempDir, expectedChunks, subtitlePath) {
+  const { spawn } = require('child_process');
+  const watcher = spawn(
+    process.env.PYTHON || 'python3',
+    [
+      path.join(__dirname, 'subs_ai', 'streaming_transcriber.py'),
+      tempDir,
+      '--expected-chunks', String(expectedChunks),
+      '--output', subtitlePath
+    ],
+    { stdio: 'inherit' }
+  );
+  return new Promise((resolve, reject) => {
+    watcher.on('error', reject);
+    watcher.on('exit', (code) => {
+      if (code === 0) resolve();
+      else reject(new Error(`Streaming transcriber exited with code ${code}`));
+    });
+  });
+}
+
 async function main() {
   try {
     // 1. Create required directories
@@ -43,19 +110,26 @@ async function main() {
     await fs.ensureDir(path.join(__dirname, 'input_videos'));
     
     // 2. Split text into chunks
+    const userText = fs.readFileSync('./userText.txt', 'utf8');
     const chunks = splitTextIntoChunks(userText, 4000);
     console.log(`Split text into ${chunks.length} chunks`);
     
-    // 3. Generate TTS audio for each chunk
-    const audioChunkPaths = [];
-    for (let idx = 0; idx < chunks.length; idx++) {
-      const chunk = chunks[idx];
-      const audioPath = path.join(tempDir, `chunk_${idx+1}.wav`);
-      console.log(`Generating TTS for chunk ${idx+1}/${chunks.length}...`);
-      await generateTTS(chunk, audioPath);
-      audioChunkPaths.push(audioPath);
+    // Subtitles are transcribed chunk by chunk in the background
+    let subtitlesDone = null;
+    if (streamSubtitles) {
+      const subtitlePath = path.join(outputDir, 'final_video.vtt');
+      console.log('Starting streaming subtitle transcription...');
+      subtitlesDone = startSubtitleWatcher(tempDir, chunks.length, subtitlePath);
+      // Surface failures when awaited below rather than as an unhandled rejection
+      subtitlesDone.catch(() => {});
     }
     
+    // 3. Generate TTS audio for each chunk (TTS_CONCURRENCY requests at a time, kept in story order)
+    const chunkPaths = chunks.map((_, idx) => path.join(tempDir, `chunk_${idx+1}.wav`));
+    const ttsStart = Date.now();
+    const audioChunkPaths = await generateTTSBatch(chunks, chunkPaths);
+    console.log(`Generated TTS for ${chunks.length} chunks in ${((Date.now() - ttsStart) / 1000).toFixed(1)}s`);
+    
     // 4. Concatenate all audio chunks into one combined audio
     const combinedAudioPath = path.join(tempDir, 'combined_audio.wav');
     if (audioChunkPaths.length > 1) {
@@ -99,14 +173,34 @@ async function main() {
     
     // 5. Create video sequence to match audio duration
     const inputVideosDir = path.join(__dirname, 'input_videos');
-    const extendedVideoPath = path.join(tempDir, 'extended_video.mp4');
-    console.log('Creating video sequence to match audio duration...');
-    await extendVideoToMatchAudio(inputVideosDir, combinedAudioPath, extendedVideoPath);
-    
-    // 6. Overlay the audio onto the video sequence
     const finalVideoPath = path.join(outputDir, 'final_video.mp4');
-    console.log('Overlaying audio onto video sequence...');
-    await overlayAudioOnVideo(extendedVideoPath, combinedAudioPath, finalVideoPath);
+    if (process.env.STREAMING_PIPELINE === '1') {
+      // Streaming mode: concatenate and add the audio in one pass, without extended_video.mp4
+      console.log('Building final video in a single pass (streaming mode)...');
+      await buildFinalVideo(inputVideosDir, combinedAudioPath, finalVideoPath);
+    } else {
+      const extendedVideoPath = path.join(tempDir, 'extended_video.mp4');
+      console.log('Creating video sequence to match audio duration...');
+      await extendVideoToMatchAudio(inputVideosDir, combinedAudioPath, extendedVideoPath);
+      
+      // 6. Overlay the audio onto the video sequence
+      console.log('Overlaying audio onto video sequence...');
+      await overlayAudioOnVideo(extendedVideoPath, combinedAudioPath, finalVideoPath);
+    }
+    
+    if (subtitlesDone) {
+      console.log('Waiting for streaming subtitles to finish...');
+      const subtitlePath = path.join(outputDir, 'final_video.vtt');
+      try {
+        await subtitlesDone;
+        // Mark the subtitles as newer than final_video.mp4 so the subtitle step reuses them
+        const now = new Date();
+        await fs.utimes(subtitlePath, now, now);
+        console.log('Subtitles saved to:', subtitlePath);
+      } catch (err) {
+        console.warn('Streaming subtitles failed, the subtitle step will transcribe the final video:', err.message);
+      }
+    }
     
     console.log('🎉 Process completed successfully!');
     console.log('Final video saved to:', finalVideoPath);
@@ -117,4 +211,9 @@ async function main() {
   }
 }
 
-main();
+// test_tts.js requires this file for splitTextIntoChunks
+if (require.main === module) {
+  main();
+}
+
+module.exports = { splitTextIntoChunks };
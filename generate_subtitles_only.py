@@ -5,26 +5,82 @@ Run this from the project root directory.
 """
 
 import sys
+import json
+import argparse
 from pathlib import Path
 
 # Add the subs_ai directory to the path
 sys.path.insert(0, str(Path(__file__).parent / "subs_ai"))
 
-from simple_subtitle_generator import main as generate_subtitle_files
+from simple_subtitle_generator import main as generate_subtitle_files, iter_cues, write_subtitle_file
+from resource_scheduler import core_allotment
+
+def stream_cues_ndjson(video_path=None):
+    """
+    Print cues as NDJSON lines while transcription runs, then write the VTT file
+    next to the video (output/final_video.vtt for the default video).
+    
+    Progress messages go to stderr so stdout carries only JSON events:
+    one {"event": "cue", ...} line per cue and a final {"event": "done", ...}.
+    """
+    project_root = Path(__file__).parent
+    video_path = Path(video_path) if video_path else project_root / 'output' / 'final_video.mp4'
+    vtt_path = video_path.with_suffix('.vtt')
+    
+    def emit(event):
+        sys.stdout.write(json.dumps(event, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+    
+    print(f"Streaming cues for {video_path}...", file=sys.stderr)
+    
+    try:
+        # Import whisper (and torch) first so the allotment can cap torch's threads
+        import whisper
+        
+        cues = []
+        with core_allotment('transcribe'):
+            for cue in iter_cues(str(video_path), model_type='base'):
+                cues.append(cue)
+                emit({'event': 'cue', **cue})
+        
+        result = {'text': ' '.join(cue['text'] for cue in cues), 'segments': cues}
+        write_subtitle_file(result, str(vtt_path), 'vtt')
+        emit({'event': 'done', 'cueCount': len(cues), 'file': str(vtt_path)})
+        return 0
+    except Exception as e:
+        emit({'event': 'error', 'message': str(e)})
+        return 1
 
 def main():
     """Main function to generate subtitle files only."""
     
+    parser = argparse.ArgumentParser(description="Generate subtitles for output/final_video.mp4")
+    parser.add_argument('--ndjson', action='store_true', help="Stream cues to stdout as NDJSON while transcribing")
+    parser.add_argument('--video', default=None, help="Video to stream cues for with --ndjson (defaults to output/final_video.mp4)")
+    args = parser.parse_args()
+    
+    if args.ndjson:
+        return stream_cues_ndjson(args.video)
+    
     print("Generating VTT subtitle file for final_video.mp4...")
     print("=" * 50)
     
+    project_root = Path(__file__).parent
+    video_path = project_root / 'output' / 'final_video.mp4'
+    vtt_path = project_root / 'output' / 'final_video.vtt'
+    
+    # generate.js with STREAM_SUBTITLES=1 already wrote subtitles for this video
+    if vtt_path.exists() and video_path.exists() and vtt_path.stat().st_mtime >= video_path.stat().st_mtime:
+        print(f"Subtitles already generated during TTS: {vtt_path}")
+        print("\nTo burn subtitles into video, run: python burn_subtitles.py")
+        return 0
+    
     # Generate subtitle files
     result = generate_subtitle_files()
     
     if result == 0:
         print("\nSUCCESS!")
         print("=" * 50)
-        project_root = Path(__file__).parent
         print(f"Generated subtitle file:")
         print(f"   - {project_root / 'output' / 'final_video.vtt'}")
         print("\nTo burn subtitles into video, run: python burn_subtitles.py")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Checkpoint journal for resumable jobs.
+Each job keeps a JSON journal of the stages and units of work (overlay
+chunks, transcription windows) it has completed, with the signatures of
+their inputs and outputs. A restarted job skips every unit whose record
+still matches the files on disk and redoes the rest, so an output that was
+only partly written when the job died is never reused.
+The API server records whole steps in the same file (src/service/jobJournal.ts).
+
+    python3 job_journal.py --job run-1700000000000   # show what a job has completed
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+
+from progress import JOB_ID
+
+# One journal per job: <job>.json
+JOURNAL_DIR = os.environ.get('REELGEN_JOURNAL_DIR', str(Path(__file__).parent / 'output' / 'journal'))
+
+# Read size when hashing files
+_HASH_BLOCK = 1024 * 1024
+
+
+def file_signature(path):
+    """Return the SHA-256, size and modification time (ms) of a file."""
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return {'sha256': digest.hexdigest(), 'size': stat.st_size, 'mtimeMs': stat.st_mtime_ns // 1_000_000}
+
+
+class JobJournal:
+    """
+    Completed stages and units of one job, with their input and output signatures.
+
+    A record is valid while its params are the same and every input and
+    output still has its recorded signature. Files whose size and
+    modification time are unchanged are trusted without hashing them again.
+    """
+
+    def __init__(self, job_id=None, journal_dir=None):
+        """
+        Args:
+            job_id (str): Job the journal belongs to (defaults to REELGEN_JOB_ID)
+            journal_dir (str): Directory of the journal files (defaults to REELGEN_JOURNAL_DIR)
+        """
+        self.job_id = job_id or JOB_ID
+        self.path = os.path.join(journal_dir or JOURNAL_DIR, f"{self.job_id}.json")
+        self._lock = threading.Lock()
+        # Hashes computed by this process, by (path, size, mtime)
+        self._hashes = {}
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                journal = json.load(f)
+            if 'stages' in journal and 'units' in journal:
+                return journal
+        except (OSError, ValueError):
+            pass
+        return {'jobId': self.job_id, 'stages': {}, 'units': {}}
+
+    def _save(self, journal):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.{os.urandom(4).hex()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(journal, f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def _signature(self, path):
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if key not in self._hashes:
+            self._hashes[key] = file_signature(path)
+        return self._hashes[key]
+
+    def _matches(self, path, signature):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if stat.st_size != signature['size']:
+            return False
+        if stat.st_mtime_ns // 1_000_000 == signature['mtimeMs']:
+            return True
+        return self._signature(path)['sha256'] == signature['sha256']
+
+    def _valid(self, entry, inputs, params):
+        if entry is None or entry.get('params') != params:
+            return False
+        if set(entry['inputs']) != {str(path) for path in inputs}:
+            return False
+        files = {**entry['inputs'], **entry['outputs']}
+        return all(self._matches(path, signature) for path, signature in files.items())
+
+    def _entry(self, outputs, inputs, params, data):
+        return {
+            'completedAt': time.time(),
+            'params': params,
+            'inputs': {str(path): self._signature(path) for path in inputs},
+            'outputs': {str(path): self._signature(path) for path in outputs},
+            'data': data
+        }
+
+    def stage_done(self, stage, inputs=(), params=None):
+        """Return True if the stage completed with these inputs and params and its outputs are intact."""
+        return self._valid(self._load()['stages'].get(stage), inputs, params)
+
+    def complete_stage(self, stage, outputs=(), inputs=(), params=None):
+        """Record a completed stage with the signatures of its inputs and outputs."""
+        entry = self._entry(outputs, inputs, params, None)
+        with self._lock:
+            journal = self._load()
+            journal['stages'][stage] = entry
+            self._save(journal)
+
+    def unit(self, stage, key, inputs=(), params=None):
+        """
+        Look up a completed unit of a stage.
+
+        Returns:
+            dict: The unit's record ('outputs', 'data', ...) if it is still valid, otherwise None
+        """
+        entry = self._load()['units'].get(stage, {}).get(str(key))
+        return entry if self._valid(entry, inputs, params) else None
+
+    def complete_unit(self, stage, key, outputs=(), inputs=(), params=None, data=None):
+        """Record a completed unit of a stage, with optional JSON data to restore when it is skipped."""
+        entry = self._entry(outputs, inputs, params, data)
+        with self._lock:
+            journal = self._load()
+            journal['units'].setdefault(stage, {})[str(key)] = entry
+            self._save(journal)
+
+    def checkpoint(self, stage, inputs=(), params=None):
+        """Return a UnitCheckpoint for units of a stage that share inputs and params."""
+        return UnitCheckpoint(self, stage, inputs, params)
+
+
+class UnitCheckpoint:
+    """
+    Data-only units of one stage (e.g. transcription windows), keyed by position.
+
+    The shared inputs are hashed at most once per process, since the
+    journal keeps the hashes it has computed.
+    """
+
+    def __init__(self, journal, stage, inputs=(), params=None):
+        self.journal = journal
+        self.stage = stage
+        self.inputs = list(inputs)
+        self.params = params
+
+    def get(self, key):
+        """Return the data saved for a unit, or None if it must be redone."""
+        entry = self.journal.unit(self.stage, key, self.inputs, self.params)
+        return entry['data'] if entry else None
+
+    def put(self, key, data):
+        """Save the data of a completed unit."""
+        self.journal.complete_unit(self.stage, key, inputs=self.inputs, params=self.params, data=data)
+
+
+def main():
+    """Print what a job has completed."""
+    parser = argparse.ArgumentParser(description="Show a job's checkpoint journal")
+    parser.add_argument('--job', default=None, help="Job id (defaults to REELGEN_JOB_ID)")
+    args = parser.parse_args()
+
+    journal = JobJournal(args.job)
+    state = journal._load()
+    print(f"Job {journal.job_id} ({journal.path})")
+    for stage, entry in state['stages'].items():
+        print(f"   stage {stage}: {len(entry['outputs'])} outputs, completed {time.ctime(entry['completedAt'])}")
+    for stage, units in state['units'].items():
+        print(f"   {stage}: {len(units)} units")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,372 @@
+const os = require('os');
+const path = require('path');
+const { spawn, execFile } = require('child_process');
+const fs = require('fs-extra');
+const axios = require('axios');
+const ffmpegPath = require('ffmpeg-static');
+const { createServer: createTTSServer } = require('./tts-standin');
+const { createServer: createS3Server } = require('./s3-standin');
+
+// Load test for POST /api/pipeline/run-all, fully offline.
+//
+//   npm run build && node load-test.js --jobs 8 --concurrency 4
+//
+// Starts the TTS and S3 stand-ins, generates synthetic background clips and
+// runs one API server per concurrent job, each in its own sandbox directory
+// (the pipeline keeps per-job files such as caption.txt and output/ in the
+// working directory). All servers share the host, so CPU, disk and the core
+// scheduler are contended as they would be with concurrent jobs on one
+// instance. Reports per-stage latency percentiles, jobs/hour, peak RSS of the
+// servers and their stages, and peak disk usage.
+
+const CODE_DIRS = ['dist', 'subs_ai'];
+const SYNTHETIC_SOURCES = ['testsrc2', 'smptebars', 'rgbtestsrc', 'testsrc'];
+
+function parseArgs(argv) {
+  const options = {
+    jobs: 4,
+    concurrency: 2,
+    textChars: 1500,
+    clips: 4,
+    clipSeconds: 20,
+    streaming: false,
+    report: null,
+    keep: false
+  };
+  for (let i = 0; i < argv.length; i++) {
+    switch (argv[i]) {
+      case '--jobs': options.jobs = parseInt(argv[++i], 10); break;
+      case '--concurrency': options.concurrency = parseInt(argv[++i], 10); break;
+      case '--text-chars': options.textChars = parseInt(argv[++i], 10); break;
+      case '--clips': options.clips = parseInt(argv[++i], 10); break;
+      case '--clip-seconds': options.clipSeconds = parseFloat(argv[++i]); break;
+      case '--streaming': options.streaming = true; break;
+      case '--report': options.report = path.resolve(argv[++i]); break;
+      case '--keep': options.keep = true; break;
+      default:
+        console.error(`Unknown option: ${argv[i]}`);
+        process.exit(1);
+    }
+  }
+  options.concurrency = Math.max(1, Math.min(options.concurrency, options.jobs));
+  return options;
+}
+
+function runFfmpeg(args) {
+  return new Promise((resolve, reject) => {
+    execFile(ffmpegPath || 'ffmpeg', args, (error, stdout, stderr) => {
+      if (error) reject(new Error(stderr || error.message));
+      else resolve();
+    });
+  });
+}
+
+// Clips shaped like standardize-videos.js output: 720x1280, 30 fps, H.264, no audio
+async function makeSyntheticClips(dir, count, seconds) {
+  await fs.ensureDir(dir);
+  for (let i = 0; i < count; i++) {
+    const source = SYNTHETIC_SOURCES[i % SYNTHETIC_SOURCES.length];
+    await runFfmpeg([
+      '-y', '-f', 'lavfi', '-i', `${source}=size=720x1280:rate=30`,
+      '-t', String(seconds),
+      '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23', '-pix_fmt', 'yuv420p', '-an',
+      path.join(dir, `synthetic_${i + 1}.mp4`)
+    ]);
+  }
+}
+
+// Story text of roughly `chars` characters, with sentence and paragraph breaks like a real story
+function makeStory(chars, jobIndex) {
+  const sentences = [];
+  let length = 0;
+  for (let i = 0; length < chars; i++) {
+    const sentence = `Job ${jobIndex} sentence ${i + 1} tells the story a little further along the way.`;
+    sentences.push(sentence + (i % 6 === 5 ? '\n\n' : ' '));
+    length += sentence.length + 1;
+  }
+  return sentences.join('').trim();
+}
+
+// Copy the code into a sandbox and link the shared, read-only inputs
+async function makeSandbox(dir, clipsDir) {
+  await fs.ensureDir(dir);
+  for (const name of await fs.readdir(__dirname)) {
+    if (/\.(js|py)$/.test(name) || name === 'package.json') {
+      await fs.copy(path.join(__dirname, name), path.join(dir, name));
+    }
+  }
+  for (const name of CODE_DIRS) {
+    await fs.copy(path.join(__dirname, name), path.join(dir, name), {
+      filter: src => !src.includes('__pycache__')
+    });
+  }
+  await fs.symlink(path.join(__dirname, 'node_modules'), path.join(dir, 'node_modules'), 'dir');
+  await fs.symlink(clipsDir, path.join(dir, 'standardized_videos'), 'dir');
+  await fs.ensureDir(path.join(dir, 'input_videos'));
+}
+
+async function waitForHealth(port, server, timeoutMs = 30000) {
+  const deadline = Date.now() + timeoutMs;
+  while (Date.now() < deadline) {
+    if (server.exitCode !== null) throw new Error(`Server on port ${port} exited with code ${server.exitCode}`);
+    try {
+      await axios.get(`http://localhost:${port}/health`, { timeout: 1000 });
+      return;
+    } catch {
+      await new Promise(resolve => setTimeout(resolve, 250));
+    }
+  }
+  throw new Error(`Server on port ${port} did not become healthy`);
+}
+
+async function freePort() {
+  const server = require('net').createServer();
+  await new Promise(resolve => server.listen(0, resolve));
+  const { port } = server.address();
+  await new Promise(resolve => server.close(resolve));
+  return port;
+}
+
+/**
+ * Resident memory (bytes) of the given processes and all their descendants (Linux /proc).
+ */
+async function treeRss(rootPids) {
+  const children = new Map();
+  const rss = new Map();
+  for (const entry of await fs.readdir('/proc')) {
+    if (!/^\d+$/.test(entry)) continue;
+    try {
+      const stat = await fs.readFile(`/proc/${entry}/stat`, 'utf8');
+      const ppid = parseInt(stat.slice(stat.lastIndexOf(')') + 2).split(' ')[1], 10);
+      const status = await fs.readFile(`/proc/${entry}/status`, 'utf8');
+      const match = status.match(/^VmRSS:\s+(\d+) kB/m);
+      rss.set(Number(entry), match ? parseInt(match[1], 10) * 1024 : 0);
+      if (!children.has(ppid)) children.set(ppid, []);
+      children.get(ppid).push(Number(entry));
+    } catch {
+      // Process exited while reading
+    }
+  }
+  let total = 0;
+  const queue = [...rootPids];
+  while (queue.length > 0) {
+    const pid = queue.pop();
+    total += rss.get(pid) || 0;
+    queue.push(...(children.get(pid) || []));
+  }
+  return total;
+}
+
+async function diskUsage(dir) {
+  let total = 0;
+  let entries;
+  try {
+    entries = await fs.readdir(dir, { withFileTypes: true });
+  } catch {
+    return 0;
+  }
+  for (const entry of entries) {
+    const entryPath = path.join(dir, entry.name);
+    if (entry.isDirectory()) {
+      total += await diskUsage(entryPath);
+    } else if (entry.isFile()) {
+      try {
+        total += (await fs.stat(entryPath)).size;
+      } catch {
+        // Removed while walking
+      }
+    }
+  }
+  return total;
+}
+
+function percentile(sorted, p) {
+  if (sorted.length === 0) return null;
+  return sorted[Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1)];
+}
+
+function summarize(values) {
+  const sorted = [...values].sort((a, b) => a - b);
+  return {
+    count: sorted.length,
+    p50: percentile(sorted, 50),
+    p90: percentile(sorted, 90),
+    p95: percentile(sorted, 95),
+    max: sorted[sorted.length - 1] ?? null
+  };
+}
+
+async function main() {
+  const options = parseArgs(process.argv.slice(2));
+  if (!await fs.pathExists(path.join(__dirname, 'dist', 'server.js'))) {
+    console.error("❌ dist/server.js not found; run 'npm run build' first");
+    process.exit(1);
+  }
+
+  const workDir = await fs.mkdtemp(path.join(os.tmpdir(), 'reelgen-load-'));
+  const clipsDir = path.join(workDir, 'clips');
+  const servers = [];
+  const tts = createTTSServer();
+  const s3 = createS3Server();
+
+  console.log('🏋️  ReelGen Load Test');
+  console.log('=====================');
+  console.log(`${options.jobs} jobs, ${options.concurrency} at a time, ~${options.textChars} characters each${options.streaming ? ', streaming mode' : ''}`);
+  console.log(`Work directory: ${workDir}\n`);
+
+  try {
+    await new Promise(resolve => tts.listen(0, resolve));
+    await new Promise(resolve => s3.listen(0, resolve));
+
+    console.log(`🎞️  Generating ${options.clips} synthetic ${options.clipSeconds}s background clips...`);
+    await makeSyntheticClips(clipsDir, options.clips, options.clipSeconds);
+
+    const env = {
+      ...process.env,
+      TTS_ENDPOINT: `http://localhost:${tts.address().port}/audio/speech`,
+      TTS_CACHE_DISABLE: '1',
+      AZURE_API_KEY: process.env.AZURE_API_KEY || 'load-test',
+      AWS_S3_ENDPOINT: `http://localhost:${s3.address().port}`,
+      AWS_S3_BUCKET: 'reelgen-load-test',
+      AWS_ACCESS_KEY_ID: 'testing',
+      AWS_SECRET_ACCESS_KEY: 'testing',
+      AWS_REGION: 'us-east-1',
+      // Keep the synthetic clips out of the project's media index and away from its segment bank
+      MEDIA_INDEX_PATH: path.join(workDir, 'media_index.json'),
+      SEGMENT_BANK_DIR: path.join(workDir, 'segment_bank'),
+      STREAMING_PIPELINE: options.streaming ? '1' : (process.env.STREAMING_PIPELINE || '')
+    };
+
+    console.log(`🚀 Starting ${options.concurrency} API servers...`);
+    for (let i = 0; i < options.concurrency; i++) {
+      const dir = path.join(workDir, `sandbox_${i + 1}`);
+      await makeSandbox(dir, clipsDir);
+      const port = await freePort();
+      const logFile = fs.createWriteStream(path.join(workDir, `server_${i + 1}.log`));
+      const proc = spawn('node', ['dist/server.js'], {
+        cwd: dir,
+        env: { ...env, PORT: String(port), REELGEN_PROGRESS_DIR: path.join(dir, 'output', 'progress') },
+        stdio: ['ignore', 'pipe', 'pipe']
+      });
+      proc.stdout.pipe(logFile);
+      proc.stderr.pipe(logFile);
+      servers.push({ dir, port, proc });
+      await waitForHealth(port, proc);
+    }
+
+    // Sample memory and disk while the jobs run
+    let peakRss = 0;
+    let peakDisk = 0;
+    const sample = async () => {
+      peakRss = Math.max(peakRss, await treeRss(servers.map(s => s.proc.pid)));
+      peakDisk = Math.max(peakDisk, await diskUsage(workDir));
+    };
+    let sampling = true;
+    const sampler = (async () => {
+      while (sampling) {
+        await sample();
+        await new Promise(resolve => setTimeout(resolve, 1000));
+      }
+    })();
+
+    console.log(`\n▶️  Running ${options.jobs} jobs...`);
+    const jobs = [];
+    let nextJob = 0;
+    const startedAt = Date.now();
+    await Promise.all(servers.map(async (server) => {
+      while (nextJob < options.jobs) {
+        const index = ++nextJob;
+        const jobStart = Date.now();
+        const job = { index, port: server.port, success: false, stages: {} };
+        try {
+          const response = await axios.post(`http://localhost:${server.port}/api/pipeline/run-all`, {
+            text: makeStory(options.textChars, index),
+            caption: `Load test ${index}`
+          }, { timeout: 0 });
+          job.success = true;
+          for (const result of response.data.results) {
+            job.stages[result.name] = result.durationMs;
+          }
+          if (response.data.uploadStats) {
+            // Uploads overlap the encode; the job only waits for what is left after it
+            const { afterEncodeSeconds, seconds } = response.data.uploadStats;
+            job.stages.upload = (afterEncodeSeconds ?? seconds) * 1000;
+          }
+          job.videos = response.data.finalVideos.length;
+        } catch (error) {
+          const data = error.response?.data;
+          job.error = data?.details || error.message;
+          for (const result of data?.results || []) {
+            if (result.success) job.stages[result.name] = result.durationMs;
+          }
+        }
+        job.totalMs = Date.now() - jobStart;
+        jobs.push(job);
+        console.log(`   ${job.success ? '✅' : '❌'} Job ${index}: ${(job.totalMs / 1000).toFixed(1)}s` +
+          (job.success ? `, ${job.videos} videos` : ` (${job.error})`));
+      }
+    }));
+    const wallSeconds = (Date.now() - startedAt) / 1000;
+    sampling = false;
+    await sampler;
+    await sample();
+
+    // Per-stage latency over the jobs that reached each stage
+    const stageNames = [...new Set(jobs.flatMap(job => Object.keys(job.stages)))];
+    const stages = {};
+    for (const name of stageNames) {
+      stages[name] = summarize(jobs.filter(job => job.stages[name] !== undefined).map(job => job.stages[name]));
+    }
+    stages.total = summarize(jobs.filter(job => job.success).map(job => job.totalMs));
+
+    const succeeded = jobs.filter(job => job.success).length;
+    const report = {
+      options,
+      wallSeconds,
+      jobsSucceeded: succeeded,
+      jobsFailed: jobs.length - succeeded,
+      jobsPerHour: succeeded / (wallSeconds / 3600),
+      peakRssBytes: peakRss,
+      peakDiskBytes: peakDisk,
+      stages,
+      jobs
+    };
+
+    console.log('\n' + '='.repeat(70));
+    console.log(`Load test: ${options.jobs} jobs, concurrency ${options.concurrency}`);
+    console.log('='.repeat(70));
+    console.log(`${'stage'.padEnd(16)} ${'n'.padStart(4)} ${'p50 s'.padStart(9)} ${'p90 s'.padStart(9)} ${'p95 s'.padStart(9)} ${'max s'.padStart(9)}`);
+    const seconds = ms => (ms === null ? '-' : (ms / 1000).toFixed(2));
+    for (const [name, stat] of Object.entries(stages)) {
+      console.log(`${name.padEnd(16)} ${String(stat.count).padStart(4)} ${seconds(stat.p50).padStart(9)} ${seconds(stat.p90).padStart(9)} ${seconds(stat.p95).padStart(9)} ${seconds(stat.max).padStart(9)}`);
+    }
+    console.log('');
+    console.log(`Jobs: ${succeeded} succeeded, ${jobs.length - succeeded} failed in ${wallSeconds.toFixed(1)}s`);
+    console.log(`Throughput: ${report.jobsPerHour.toFixed(1)} jobs/hour`);
+    console.log(`Peak RSS (servers and stages): ${(peakRss / 1024 / 1024).toFixed(0)} MB`);
+    console.log(`Peak disk usage (sandboxes and clips): ${(peakDisk / 1024 / 1024).toFixed(0)} MB`);
+    console.log(`S3 stand-in received ${(s3.stats().bytes / 1024 / 1024).toFixed(1)} MB in ${s3.stats().objects} objects`);
+
+    if (options.report) {
+      await fs.writeJson(options.report, report, { spaces: 2 });
+      console.log(`Report written to ${options.report}`);
+    }
+    process.exitCode = succeeded === jobs.length ? 0 : 1;
+  } finally {
+    for (const server of servers) {
+      server.proc.kill();
+    }
+    tts.close();
+    s3.close();
+    if (options.keep) {
+      console.log(`Sandboxes and server logs kept in ${workDir}`);
+    } else {
+      await fs.remove(workDir);
+    }
+  }
+}
+
+main().catch(error => {
+  console.error('💥 Load test failed:', error.message);
+  process.exit(1);
+});
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Persistent media metadata index shared by the Python and Node stages.
+Stores duration, fps, resolution, codec, frame count and (on request)
+keyframe timestamps per file, keyed by absolute path and validated by size
+and mtime, so each file is probed once instead of on every job.
+The Node side (src/service/mediaIndex.ts) reads and writes the same file.
+"""
+
+import os
+import sys
+import json
+import argparse
+import threading
+import subprocess
+from pathlib import Path
+
+# Shared with src/service/mediaIndex.ts
+INDEX_PATH = os.environ.get('MEDIA_INDEX_PATH', str(Path(__file__).parent / 'media_index.json'))
+
+INDEX_VERSION = 1
+
+# Serializes saves from threads of one process (e.g. the overlay's thread pools)
+_save_lock = threading.Lock()
+
+
+def load_index(index_path=INDEX_PATH):
+    """Load the index, returning an empty one if it is missing or unreadable."""
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') == INDEX_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return {'version': INDEX_VERSION, 'files': {}}
+
+
+def save_index(index, index_path=INDEX_PATH):
+    """
+    Merge the index into the file on disk and replace it atomically.
+
+    Entries written by other processes since this one loaded the index are
+    kept, and this process's entries replace older ones for the same path. A lost race only means a file is
+    probed again later.
+    """
+    with _save_lock:
+        on_disk = load_index(index_path)
+        on_disk['files'].update(index['files'])
+        index['files'] = on_disk['files']
+
+        os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        temp_path = f"{index_path}.{os.getpid()}.{os.urandom(4).hex()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(on_disk, f, indent=2)
+        os.replace(temp_path, index_path)
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    # Whole milliseconds, matching Math.floor(stat.mtimeMs) on the Node side
+    return stat.st_size, stat.st_mtime_ns // 1_000_000
+
+
+def _parse_rate(rate):
+    """Parse an ffprobe rate such as '30000/1001'."""
+    try:
+        numerator, denominator = rate.split('/')
+        return float(numerator) / float(denominator) if float(denominator) else 0.0
+    except (AttributeError, ValueError):
+        return 0.0
+
+
+def probe_file(path):
+    """
+    Probe a media file with ffprobe.
+
+    Returns:
+        dict: duration, fps, width, height, codec and frameCount
+    """
+    ffprobe_cmd = [
+        'ffprobe', '-v', 'error',
+        '-print_format', 'json',
+        '-show_format', '-show_streams',
+        path
+    ]
+    result = subprocess.run(ffprobe_cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed for {path}: {result.stderr}")
+
+    metadata = json.loads(result.stdout)
+    video = next((s for s in metadata.get('streams', []) if s.get('codec_type') == 'video'), None)
+    audio = next((s for s in metadata.get('streams', []) if s.get('codec_type') == 'audio'), None)
+    duration = float(metadata.get('format', {}).get('duration', 0) or 0)
+
+    info = {
+        'duration': duration,
+        'fps': 0.0,
+        'width': 0,
+        'height': 0,
+        'codec': (video or audio or {}).get('codec_name'),
+        'frameCount': 0,
+        'hasAudio': audio is not None
+    }
+
+    if video:
+        fps = _parse_rate(video.get('avg_frame_rate')) or _parse_rate(video.get('r_frame_rate'))
+        info['fps'] = fps
+        info['width'] = int(video.get('width', 0))
+        info['height'] = int(video.get('height', 0))
+        frame_count = video.get('nb_frames')
+        info['frameCount'] = int(frame_count) if frame_count and frame_count.isdigit() else int(round(duration * fps))
+
+    return info
+
+
+def probe_keyframes(path):
+    """
+    Read keyframe timestamps of the first video stream from packet flags.
+
+    Returns:
+        list: Keyframe presentation timestamps in seconds, ascending
+    """
+    ffprobe_cmd = [
+        'ffprobe', '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time,flags',
+        '-of', 'csv=p=0',
+        path
+    ]
+    result = subprocess.run(ffprobe_cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed for {path}: {result.stderr}")
+
+    keyframes = []
+    for line in result.stdout.splitlines():
+        parts = line.strip().split(',')
+        if len(parts) >= 2 and 'K' in parts[1] and parts[0] not in ('', 'N/A'):
+            keyframes.append(round(float(parts[0]), 6))
+    return sorted(keyframes)
+
+
+def get_media_info(path, keyframes=False, index=None):
+    """
+    Return metadata for a file, probing only when the index is missing or stale.
+
+    Args:
+        path (str): Media file path
+        keyframes (bool): Also make sure keyframe timestamps are indexed
+        index (dict): Index from load_index to update in place; when omitted
+            the shared index is loaded and saved around this call
+
+    Returns:
+        dict: Entry with size, mtimeMs, duration, fps, width, height, codec,
+            frameCount, hasAudio and keyframes (None until requested)
+    """
+    own_index = index is None
+    if own_index:
+        index = load_index()
+
+    key = os.path.abspath(path)
+    size, mtime_ms = _file_signature(key)
+    entry = index['files'].get(key)
+    changed = False
+
+    if not entry or entry.get('size') != size or entry.get('mtimeMs') != mtime_ms:
+        entry = {'size': size, 'mtimeMs': mtime_ms, **probe_file(key), 'keyframes': None}
+        changed = True
+
+    if keyframes and entry.get('keyframes') is None:
+        entry['keyframes'] = probe_keyframes(key)
+        changed = True
+
+    if changed:
+        index['files'][key] = entry
+        if own_index:
+            save_index(index)
+
+    return entry
+
+
+def index_paths(paths, keyframes=False):
+    """
+    Make sure every path is indexed, saving the index once at the end.
+
+    Returns:
+        dict: Absolute path -> entry
+    """
+    index = load_index()
+    entries = {}
+    for path in paths:
+        entries[os.path.abspath(path)] = get_media_info(path, keyframes=keyframes, index=index)
+    save_index(index)
+    return entries
+
+
+def main():
+    """Populate the index for files or directories from the command line."""
+    parser = argparse.ArgumentParser(description="Populate the shared media metadata index")
+    parser.add_argument('paths', nargs='+', help="Media files or directories (searched recursively)")
+    parser.add_argument('--keyframes', action='store_true', help="Also index keyframe timestamps")
+    args = parser.parse_args()
+
+    media_extensions = {'.mp4', '.mov', '.avi', '.mkv', '.wav', '.m4a'}
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if os.path.splitext(name.lower())[1] in media_extensions)
+        else:
+            files.append(path)
+
+    entries = index_paths(files, keyframes=args.keyframes)
+    print(f"Indexed {len(entries)} files in {INDEX_PATH}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
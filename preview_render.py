@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Instant preview of the caption box and subtitles.
+Grabs a handful of frames by seeking (t=0, 2.5 s and the first few subtitle
+cues), burns the subtitles into just those frames with the same ffmpeg
+filter as burn_subtitles.py, draws the caption box with the same layout as
+video_overlay_opencv.py, and writes one JPEG per frame plus a contact sheet.
+Nothing is encoded, so a preview takes well under a second.
+
+    python3 preview_render.py                        # caption from caption.txt
+    python3 preview_render.py --caption "New caption" --cues 5
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from media_index import get_media_info
+from streaming_pipeline import subtitle_filter
+from video_overlay_opencv import layout_caption, draw_caption
+
+PROJECT_ROOT = Path(__file__).parent
+
+# Fixed preview times in seconds, before the cue starts are added
+DEFAULT_TIMES = (0.0, 2.5)
+
+# Preview the first few cues, a little after each starts so the cue is on screen
+DEFAULT_CUES = 3
+CUE_OFFSET = 0.1
+
+# Contact sheet layout
+THUMB_WIDTH = 360
+SHEET_COLUMNS = 3
+
+_CUE_TIME = re.compile(r'((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})\s*-->')
+
+
+def _parse_timestamp(stamp):
+    """Convert a WebVTT/SRT timestamp (hh:mm:ss.mmm or mm:ss.mmm) to seconds."""
+    seconds = 0.0
+    for part in stamp.replace(',', '.').split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def cue_start_times(subtitle_path, limit=DEFAULT_CUES):
+    """
+    Read the start times of the first cues of a subtitle file.
+
+    Returns:
+        list: Cue start times in seconds
+    """
+    starts = []
+    with open(subtitle_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            match = _CUE_TIME.search(line)
+            if match:
+                starts.append(_parse_timestamp(match.group(1)))
+                if len(starts) >= limit:
+                    break
+    return starts
+
+
+def preview_times(duration, subtitle_path=None, times=DEFAULT_TIMES, cues=DEFAULT_CUES):
+    """Fixed times plus the first cue starts, de-duplicated and clamped inside the video."""
+    candidates = list(times)
+    if subtitle_path and cues:
+        candidates += [start + CUE_OFFSET for start in cue_start_times(subtitle_path, cues)]
+    last = max(0.0, duration - 0.1)
+    return sorted({round(min(max(0.0, t), last), 3) for t in candidates})
+
+
+def grab_frame(video_path, at, width, height, subtitle_path=None):
+    """
+    Decode the single frame at a timestamp, with the subtitles burned in.
+
+    -copyts keeps the original timestamps after the input seek, so the
+    subtitles filter shows the cues that are on screen at that moment.
+
+    Returns:
+        numpy.ndarray: BGR frame
+    """
+    ffmpeg_cmd = [
+        'ffmpeg', '-nostdin', '-v', 'error',
+        '-ss', f'{at:.3f}', '-copyts',
+        '-i', str(video_path),
+        *(['-vf', subtitle_filter(subtitle_path)] if subtitle_path else []),
+        '-frames:v', '1',
+        '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+        'pipe:1'
+    ]
+    result = subprocess.run(ffmpeg_cmd, capture_output=True)
+    expected = width * height * 3
+    if result.returncode != 0 or len(result.stdout) < expected:
+        raise RuntimeError(f"Could not grab frame at {at:.3f}s: {result.stderr.decode(errors='replace')[-1000:]}")
+    return np.frombuffer(result.stdout[:expected], dtype=np.uint8).reshape(height, width, 3).copy()
+
+
+def contact_sheet(frames, times, thumb_width=THUMB_WIDTH, columns=SHEET_COLUMNS):
+    """Tile the frames into one image, each labelled with its timestamp."""
+    height, width = frames[0].shape[:2]
+    thumb_height = int(round(height * thumb_width / width))
+    columns = min(columns, len(frames))
+    rows = (len(frames) + columns - 1) // columns
+
+    sheet = np.zeros((rows * thumb_height, columns * thumb_width, 3), dtype=np.uint8)
+    for index, (frame, at) in enumerate(zip(frames, times)):
+        thumb = cv2.resize(frame, (thumb_width, thumb_height), interpolation=cv2.INTER_AREA)
+        cv2.putText(thumb, f"{at:.2f}s", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 4, cv2.LINE_AA)
+        cv2.putText(thumb, f"{at:.2f}s", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, cv2.LINE_AA)
+        row, column = divmod(index, columns)
+        sheet[row * thumb_height:(row + 1) * thumb_height, column * thumb_width:(column + 1) * thumb_width] = thumb
+    return sheet
+
+
+def render_preview(video_path, caption, output_dir, subtitle_path=None, part=1,
+                   times=DEFAULT_TIMES, cues=DEFAULT_CUES):
+    """
+    Render preview frames and a contact sheet.
+
+    The caption box is drawn on every preview frame (in the pipeline it shows
+    during the first 5 seconds of each chunk), so its layout can be checked
+    next to any subtitle cue.
+
+    Args:
+        video_path (str): Video to preview (normally output/final_video.mp4)
+        caption (str): Caption text; rendered as "Part <part> | <caption>"
+        output_dir (str): Directory for the JPEGs
+        subtitle_path (str): Subtitle file to burn in (optional)
+        part (int): Part number shown in the caption
+        times (tuple): Fixed preview times in seconds
+        cues (int): Number of cue starts to preview
+
+    Returns:
+        dict: Preview times, frame paths, contact sheet path and elapsed seconds
+    """
+    start = time.time()
+    info = get_media_info(str(video_path))
+    width, height = info['width'], info['height']
+    at_times = preview_times(info['duration'], subtitle_path, times, cues)
+
+    # Each grab is a separate short ffmpeg run, so they can all seek at once
+    with ThreadPoolExecutor(max_workers=len(at_times)) as pool:
+        frames = list(pool.map(lambda at: grab_frame(video_path, at, width, height, subtitle_path), at_times))
+
+    layout = layout_caption(f"Part {part} | {caption}", width)
+    os.makedirs(output_dir, exist_ok=True)
+    for name in os.listdir(output_dir):
+        if name.startswith('preview_') and name.endswith('.jpg'):
+            os.remove(os.path.join(output_dir, name))
+
+    frame_paths = []
+    for frame, at in zip(frames, at_times):
+        draw_caption(frame, layout)
+        frame_path = os.path.join(output_dir, f"preview_{at:07.3f}.jpg")
+        cv2.imwrite(frame_path, frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        frame_paths.append(frame_path)
+
+    sheet_path = os.path.join(output_dir, 'contact_sheet.jpg')
+    cv2.imwrite(sheet_path, contact_sheet(frames, at_times), [cv2.IMWRITE_JPEG_QUALITY, 90])
+
+    return {
+        'times': at_times,
+        'frames': frame_paths,
+        'contactSheet': sheet_path,
+        'seconds': round(time.time() - start, 3)
+    }
+
+
+def main():
+    """Render a preview from the command line."""
+    parser = argparse.ArgumentParser(description="Preview the caption box and subtitles on a few frames")
+    parser.add_argument('--video', default=str(PROJECT_ROOT / 'output' / 'final_video.mp4'), help="Video to preview")
+    parser.add_argument('--subtitles', default=str(PROJECT_ROOT / 'output' / 'final_video.vtt'),
+                        help="Subtitle file (skipped if missing)")
+    parser.add_argument('--caption', default=None, help="Caption text (defaults to caption.txt)")
+    parser.add_argument('--part', type=int, default=1, help="Part number shown in the caption")
+    parser.add_argument('--times', default=','.join(str(t) for t in DEFAULT_TIMES),
+                        help="Comma-separated preview times in seconds")
+    parser.add_argument('--cues', type=int, default=DEFAULT_CUES, help="Number of subtitle cue starts to preview")
+    parser.add_argument('--output-dir', default=str(PROJECT_ROOT / 'output' / 'preview'), help="Directory for the JPEGs")
+    parser.add_argument('--json', action='store_true', help="Print the result as JSON")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.video):
+        print(f"Video file not found: {args.video}")
+        return 1
+
+    caption = args.caption
+    if caption is None:
+        try:
+            with open("caption.txt", "r", encoding="utf-8") as f:
+                caption = f.readline().strip()
+        except OSError:
+            caption = "Default Caption"
+
+    subtitle_path = args.subtitles if os.path.exists(args.subtitles) else None
+    times = [float(t) for t in args.times.split(',') if t.strip()]
+
+    try:
+        result = render_preview(args.video, caption, args.output_dir, subtitle_path, args.part, times, args.cues)
+    except RuntimeError as e:
+        print(f"Preview failed: {e}")
+        return 1
+
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for path in result['frames']:
+            print(f"Frame: {path}")
+        print(f"Contact sheet: {result['contactSheet']}")
+        print(f"Preview rendered in {result['seconds']:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Live progress reporting for long-running pipeline stages.
+Stages publish frames done, percent complete, fps and ETA to a small JSON
+status file per job and stage, which /api/pipeline/status reads. ffmpeg
+commands report through its -progress output; Python frame loops call
+ProgressReporter.update directly.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import subprocess
+from collections import deque
+from pathlib import Path
+
+# Status files live here, one per job and stage: <job>__<stage>.json
+PROGRESS_DIR = os.environ.get('REELGEN_PROGRESS_DIR', str(Path(__file__).parent / 'output' / 'progress'))
+
+# Set by the caller (e.g. the API server) so concurrent jobs report separately
+JOB_ID = os.environ.get('REELGEN_JOB_ID', 'default')
+
+# Minimum seconds between status file writes
+WRITE_INTERVAL = 0.5
+
+
+class ProgressReporter:
+    """
+    Publish the progress of one stage of one job to its status file.
+
+    Rates are measured over a short sliding window, so a stalled encode shows
+    its fps dropping instead of its lifetime average.
+    """
+
+    def __init__(self, stage, total=None, job_id=None, unit='frames'):
+        """
+        Args:
+            stage (str): Stage name ('burn-subtitles', 'overlay', ...)
+            total (int): Units of work expected (optional; percent and ETA need it)
+            job_id (str): Job the stage belongs to (defaults to REELGEN_JOB_ID)
+            unit (str): What is being counted
+        """
+        self.stage = stage
+        self.total = total
+        self.job_id = job_id or JOB_ID
+        self.unit = unit
+        self.done = 0
+        self.started_at = time.time()
+        self.message = None
+        self._samples = deque(maxlen=20)
+        self._last_write = 0.0
+        self.path = os.path.join(PROGRESS_DIR, f"{self.job_id}__{stage}.json")
+        self._write('running', force=True)
+
+    def _rate(self):
+        if len(self._samples) < 2:
+            elapsed = time.time() - self.started_at
+            return self.done / elapsed if elapsed > 0 else 0.0
+        (t0, d0), (t1, d1) = self._samples[0], self._samples[-1]
+        # A counter that restarts (e.g. a fallback command) reads as 0 until the window refills
+        return max(0.0, (d1 - d0) / (t1 - t0)) if t1 > t0 else 0.0
+
+    def _write(self, status, force=False, error=None):
+        now = time.time()
+        if not force and now - self._last_write < WRITE_INTERVAL:
+            return
+        self._last_write = now
+
+        rate = self._rate()
+        percent = None
+        eta = None
+        if self.total:
+            percent = round(min(100.0, 100.0 * self.done / self.total), 1)
+            if rate > 0 and status == 'running':
+                eta = round(max(0.0, (self.total - self.done) / rate), 1)
+
+        state = {
+            'job': self.job_id,
+            'stage': self.stage,
+            'pid': os.getpid(),
+            'status': status,
+            'unit': self.unit,
+            'done': self.done,
+            'total': self.total,
+            'percent': percent,
+            'rate': round(rate, 2),
+            'etaSeconds': eta,
+            'message': self.message,
+            'error': error,
+            'startedAt': self.started_at,
+            'updatedAt': now
+        }
+        try:
+            os.makedirs(PROGRESS_DIR, exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.path)
+        except OSError:
+            # Progress is best effort; never fail the stage over it
+            pass
+
+    def update(self, done, total=None, message=None):
+        """Record units done so far (and optionally a new total or status message)."""
+        self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+        self._samples.append((time.time(), done))
+        self._write('running')
+
+    def finish(self, error=None):
+        """Mark the stage as done, or as failed when an error is given."""
+        if error is None and self.total:
+            self.done = self.total
+        self._write('failed' if error else 'done', force=True, error=error)
+
+
+def _insert_progress_args(ffmpeg_cmd):
+    """Add '-progress pipe:1 -nostats' right after the ffmpeg executable."""
+    return [ffmpeg_cmd[0], '-progress', 'pipe:1', '-nostats', *ffmpeg_cmd[1:]]
+
+
+def run_ffmpeg_with_progress(ffmpeg_cmd, reporter, offset=0, check=True):
+    """
+    Run ffmpeg and feed its -progress output into a reporter.
+
+    The reporter counts frames; `offset` is added to ffmpeg's frame counter
+    so several commands can report into one stage (e.g. one per chunk).
+
+    Args:
+        ffmpeg_cmd (list): ffmpeg command, starting with the executable
+        reporter (ProgressReporter): Reporter to update
+        offset (int): Frames already done before this command
+        check (bool): Raise CalledProcessError on a non-zero exit
+
+    Returns:
+        subprocess.CompletedProcess: With stderr (the tail of ffmpeg's log) captured
+    """
+    cmd = _insert_progress_args(ffmpeg_cmd)
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+    # Drain stderr on a thread so a chatty ffmpeg cannot block on a full pipe
+    stderr_tail = deque(maxlen=200)
+    drain = threading.Thread(target=lambda: stderr_tail.extend(process.stderr), daemon=True)
+    drain.start()
+
+    block = {}
+    for line in process.stdout:
+        key, _, value = line.strip().partition('=')
+        block[key] = value
+        if key != 'progress':
+            continue
+        # A block ends with progress=continue or progress=end
+        if block.get('frame', '').isdigit():
+            fps = block.get('fps', '0')
+            reporter.update(offset + int(block['frame']),
+                            message=f"ffmpeg at {fps} fps, speed {block.get('speed', 'N/A').strip()}")
+        block = {}
+
+    process.wait()
+    drain.join()
+    stderr = ''.join(stderr_tail)
+    if check and process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr)
+    return subprocess.CompletedProcess(cmd, process.returncode, stderr=stderr)
+
+
+def read_progress(job_id=None):
+    """
+    Read the status files, optionally for one job only.
+
+    Returns:
+        list: Status dicts, newest first
+    """
+    if not os.path.isdir(PROGRESS_DIR):
+        return []
+    states = []
+    for name in os.listdir(PROGRESS_DIR):
+        if not name.endswith('.json') or (job_id and not name.startswith(f"{job_id}__")):
+            continue
+        try:
+            with open(os.path.join(PROGRESS_DIR, name), 'r', encoding='utf-8') as f:
+                states.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(states, key=lambda s: s.get('updatedAt', 0), reverse=True)
+
+
+def main():
+    """Print the progress of running and recent stages."""
+    parser = argparse.ArgumentParser(description="Show pipeline stage progress")
+    parser.add_argument('--job', default=None, help="Only show this job")
+    args = parser.parse_args()
+
+    for state in read_progress(args.job):
+        percent = f"{state['percent']}%" if state.get('percent') is not None else '?'
+        eta = f"ETA {state['etaSeconds']}s" if state.get('etaSeconds') is not None else ''
+        print(f"{state['job']:>16} {state['stage']:>16} {state['status']:>8} {percent:>7} "
+              f"{state['rate']:>8} {state['unit']}/s {eta}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Host-wide CPU core budget for the Python pipeline stages.
+Each stage asks for a core allotment before it starts heavy work. Allotments
+are recorded in a ledger shared by every process on the host, so
+overlapping jobs queue instead of oversubscribing the CPU. Granted cores are
+applied to torch, OpenCV and the ffmpeg -threads option.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # No cross-process locking on Windows; allotments are granted immediately
+    fcntl = None
+
+# Ledger shared by all processes on the host
+SCHEDULER_DIR = os.environ.get('REELGEN_SCHEDULER_DIR', os.path.join('/tmp', 'reelgen_scheduler'))
+LEDGER_FILE = os.path.join(SCHEDULER_DIR, 'cores.json')
+LOCK_FILE = os.path.join(SCHEDULER_DIR, 'cores.lock')
+
+# Total cores the pipeline may use at once (defaults to every core)
+CORE_BUDGET = int(os.environ.get('REELGEN_CORE_BUDGET', os.cpu_count() or 1))
+
+# Default allotment per stage; override with REELGEN_CORES_<STAGE> (e.g. REELGEN_CORES_TRANSCRIBE=2)
+STAGE_CORES = {
+    'transcribe': 4,
+    'burn-subtitles': 4,
+    'overlay': 4,
+    'stream': 4
+}
+
+# Seconds between checks while waiting for capacity
+POLL_INTERVAL = 0.25
+
+
+def stage_cores(stage):
+    """Return the configured core allotment for a stage."""
+    env_name = 'REELGEN_CORES_' + stage.upper().replace('-', '_')
+    if os.environ.get(env_name):
+        return int(os.environ[env_name])
+    return STAGE_CORES.get(stage, 1)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+@contextmanager
+def _locked_ledger():
+    """Open the ledger under an exclusive lock and save it on exit."""
+    os.makedirs(SCHEDULER_DIR, exist_ok=True)
+    with open(LOCK_FILE, 'a+') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            try:
+                with open(LEDGER_FILE, 'r', encoding='utf-8') as f:
+                    ledger = json.load(f)
+            except (OSError, ValueError):
+                ledger = {}
+            ledger.setdefault('allotments', [])
+            ledger.setdefault('waiting', [])
+            ledger.setdefault('stats', {'granted': 0, 'queued': 0, 'wait_seconds': 0.0})
+
+            # Drop entries left behind by processes that died
+            ledger['allotments'] = [a for a in ledger['allotments'] if _pid_alive(a['pid'])]
+            ledger['waiting'] = [w for w in ledger['waiting'] if _pid_alive(w['pid'])]
+
+            yield ledger
+
+            temp_path = LEDGER_FILE + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(ledger, f, indent=2)
+            os.replace(temp_path, LEDGER_FILE)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def apply_thread_limits(cores):
+    """
+    Limit the thread pools of this process and its children to the given cores.
+
+    torch and cv2 are only configured when the calling stage already imported them.
+    """
+    os.environ['OMP_NUM_THREADS'] = str(cores)
+    os.environ['MKL_NUM_THREADS'] = str(cores)
+
+    if 'torch' in sys.modules:
+        sys.modules['torch'].set_num_threads(cores)
+    if 'cv2' in sys.modules:
+        sys.modules['cv2'].setNumThreads(cores)
+
+
+def ffmpeg_thread_args(cores):
+    """Return the ffmpeg arguments that cap its threads at the allotment."""
+    return ['-threads', str(cores)]
+
+
+@contextmanager
+def core_allotment(stage, cores=None):
+    """
+    Reserve cores for a stage, waiting in line while the host is at capacity.
+
+    Args:
+        stage (str): Stage name, used for defaults and metrics
+        cores (int): Cores to reserve (defaults to the stage's configured allotment)
+
+    Yields:
+        int: Number of cores granted
+    """
+    cores = max(1, min(cores or stage_cores(stage), CORE_BUDGET))
+
+    if fcntl is None:
+        apply_thread_limits(cores)
+        yield cores
+        return
+
+    pid = os.getpid()
+    ticket = f"{pid}-{time.time()}"
+    requested_at = time.time()
+    queued = False
+
+    while True:
+        with _locked_ledger() as ledger:
+            allocated = sum(a['cores'] for a in ledger['allotments'])
+            waiting = ledger['waiting']
+            first_in_line = not waiting or waiting[0]['ticket'] == ticket
+
+            if first_in_line and allocated + cores <= CORE_BUDGET:
+                ledger['waiting'] = [w for w in waiting if w['ticket'] != ticket]
+                ledger['allotments'].append({
+                    'ticket': ticket,
+                    'pid': pid,
+                    'stage': stage,
+                    'cores': cores,
+                    'started': time.time()
+                })
+                ledger['stats']['granted'] += 1
+                ledger['stats']['wait_seconds'] += time.time() - requested_at
+                break
+
+            if not queued:
+                waiting.append({'ticket': ticket, 'pid': pid, 'stage': stage, 'cores': cores})
+                ledger['stats']['queued'] += 1
+                queued = True
+                print(f"[scheduler] {stage} waiting for {cores} cores ({allocated}/{CORE_BUDGET} in use)",
+                      file=sys.stderr)
+
+        time.sleep(POLL_INTERVAL)
+
+    waited = time.time() - requested_at
+    # stderr keeps stdout free for stages that stream data (e.g. NDJSON cues)
+    print(f"[scheduler] {stage} granted {cores} cores" + (f" after {waited:.1f}s" if queued else ""),
+          file=sys.stderr)
+    apply_thread_limits(cores)
+
+    try:
+        yield cores
+    finally:
+        with _locked_ledger() as ledger:
+            ledger['allotments'] = [a for a in ledger['allotments'] if a['ticket'] != ticket]
+
+
+def utilization():
+    """
+    Report current core usage across the host.
+
+    Returns:
+        dict: Budget, allocated cores, utilization, active allotments, queue and totals
+    """
+    if fcntl is None:
+        return {'budget': CORE_BUDGET, 'allocated': 0, 'utilization': 0.0,
+                'allotments': [], 'waiting': [], 'stats': {}}
+
+    with _locked_ledger() as ledger:
+        allocated = sum(a['cores'] for a in ledger['allotments'])
+        now = time.time()
+        return {
+            'budget': CORE_BUDGET,
+            'allocated': allocated,
+            'utilization': round(allocated / CORE_BUDGET, 3),
+            'allotments': [
+                {'pid': a['pid'], 'stage': a['stage'], 'cores': a['cores'],
+                 'running_seconds': round(now - a['started'], 1)}
+                for a in ledger['allotments']
+            ],
+            'waiting': [{'pid': w['pid'], 'stage': w['stage'], 'cores': w['cores']} for w in ledger['waiting']],
+            'stats': ledger['stats']
+        }
+
+
+def main():
+    """Print the scheduler's current utilization."""
+    parser = argparse.ArgumentParser(description="Show host-wide core allotments")
+    parser.parse_args()
+    print(json.dumps(utilization(), indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+const http = require('http');
+const crypto = require('crypto');
+
+// Local stand-in for S3, covering the calls made by src/service/upload.ts
+// (PutObject, multipart upload, HeadObject, CreateBucket).
+// Object bodies are counted and discarded, so uploads cost no disk space.
+//
+//   node s3-standin.js        # serve on S3_STANDIN_PORT (default 5056)
+//
+// Point the pipeline at it with AWS_S3_ENDPOINT=http://localhost:5056
+// (any AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY will do).
+
+const PORT = parseInt(process.env.S3_STANDIN_PORT || '5056', 10);
+const LATENCY_MS = parseInt(process.env.S3_STANDIN_LATENCY_MS || '20', 10); // Fixed delay per request
+const BANDWIDTH_MBPS = parseFloat(process.env.S3_STANDIN_MBPS || '0');     // Per-request bandwidth cap (0 = none)
+
+function xml(res, status, body) {
+  res.writeHead(status, { 'Content-Type': 'application/xml' });
+  res.end(`<?xml version="1.0" encoding="UTF-8"?>\n${body}`);
+}
+
+function createServer() {
+  const objects = new Map();  // "bucket/key" -> { size, etag }
+  const uploads = new Map();  // uploadId -> { bucket, key, parts: Map(partNumber -> { size, md5 }) }
+  const stats = { requests: 0, bytes: 0, objects: 0 };
+
+  const server = http.createServer((req, res) => {
+    const url = new URL(req.url, 'http://localhost');
+    const [bucket, ...keyParts] = url.pathname.slice(1).split('/').map(decodeURIComponent);
+    const key = keyParts.join('/');
+    const query = url.searchParams;
+
+    const md5 = crypto.createHash('md5');
+    let size = 0;
+    const startedAt = Date.now();
+    req.on('data', (data) => {
+      size += data.length;
+      md5.update(data);
+    });
+    req.on('end', () => {
+      stats.requests++;
+      stats.bytes += size;
+      const transferMs = BANDWIDTH_MBPS > 0 ? (size / (BANDWIDTH_MBPS * 1024 * 1024)) * 1000 : 0;
+      const delay = Math.max(0, LATENCY_MS + transferMs - (Date.now() - startedAt));
+      setTimeout(() => respond(req.method, bucket, key, query, size, md5.digest('hex'), res), delay);
+    });
+  });
+
+  function respond(method, bucket, key, query, size, digest, res) {
+    const objectId = `${bucket}/${key}`;
+
+    if (!key) {
+      // CreateBucket / HeadBucket
+      res.writeHead(200).end();
+    } else if (method === 'POST' && query.has('uploads')) {
+      const uploadId = crypto.randomBytes(12).toString('hex');
+      uploads.set(uploadId, { bucket, key, parts: new Map() });
+      xml(res, 200, `<InitiateMultipartUploadResult><Bucket>${bucket}</Bucket><Key>${key}</Key><UploadId>${uploadId}</UploadId></InitiateMultipartUploadResult>`);
+    } else if (method === 'PUT' && query.has('uploadId')) {
+      const upload = uploads.get(query.get('uploadId'));
+      if (!upload) return xml(res, 404, '<Error><Code>NoSuchUpload</Code></Error>');
+      upload.parts.set(Number(query.get('partNumber')), { size, md5: digest });
+      res.writeHead(200, { ETag: `"${digest}"` }).end();
+    } else if (method === 'POST' && query.has('uploadId')) {
+      const upload = uploads.get(query.get('uploadId'));
+      if (!upload) return xml(res, 404, '<Error><Code>NoSuchUpload</Code></Error>');
+      const parts = [...upload.parts.entries()].sort((a, b) => a[0] - b[0]).map(([, part]) => part);
+      const combined = crypto.createHash('md5');
+      parts.forEach(part => combined.update(Buffer.from(part.md5, 'hex')));
+      const etag = `"${combined.digest('hex')}-${parts.length}"`;
+      objects.set(objectId, { size: parts.reduce((sum, part) => sum + part.size, 0), etag });
+      uploads.delete(query.get('uploadId'));
+      stats.objects++;
+      xml(res, 200, `<CompleteMultipartUploadResult><Location>http://localhost/${objectId}</Location><Bucket>${bucket}</Bucket><Key>${key}</Key><ETag>${etag}</ETag></CompleteMultipartUploadResult>`);
+    } else if (method === 'DELETE' && query.has('uploadId')) {
+      uploads.delete(query.get('uploadId'));
+      res.writeHead(204).end();
+    } else if (method === 'PUT') {
+      objects.set(objectId, { size, etag: `"${digest}"` });
+      stats.objects++;
+      res.writeHead(200, { ETag: `"${digest}"` }).end();
+    } else if (method === 'HEAD') {
+      const object = objects.get(objectId);
+      if (!object) return res.writeHead(404).end();
+      res.writeHead(200, { 'Content-Length': object.size, ETag: object.etag }).end();
+    } else {
+      xml(res, 400, '<Error><Code>NotImplemented</Code></Error>');
+    }
+  }
+
+  server.stats = () => ({ ...stats });
+  return server;
+}
+
+if (require.main === module) {
+  createServer().listen(PORT, () => {
+    console.log(`🪣 S3 stand-in listening on http://localhost:${PORT}`);
+    console.log(`   Latency: ${LATENCY_MS}ms per request, bandwidth cap: ${BANDWIDTH_MBPS || 'none'} MB/s`);
+  });
+}
+
+module.exports = { createServer };
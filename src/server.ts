@@ -1,28 +1,28 @@
 import express, { Request, Response, NextFunction } from 'express';
 import cors from 'cors';
 import path from 'path';
+import os from 'os';
 import fs from 'fs-extra';
-import { exec } from 'child_process';
+import { exec, execFile, spawn } from 'child_process';
 import { promisify } from 'util';
 import dotenv from 'dotenv';
 import { generateTTS } from './service/tts';
 import { concatenateVideos, overlayAudioOnVideo, chunkVideo } from './service/video';
 import { processUserText } from './main';
-import AWS from 'aws-sdk';
+import { createS3Client, createUploadQueue, UploadReport } from './service/upload';
+import { followNdjson } from './service/ndjsonFollower';
+import { isValidJobId, stageComplete, recordStage } from './service/jobJournal';
 import FormData from 'form-data';
 import axios from 'axios';
 
 // Load environment variables
 dotenv.config();
 
-// Initialize AWS SDK
-const s3 = new AWS.S3({
-  accessKeyId: process.env.AWS_ACCESS_KEY_ID,
-  secretAccessKey: process.env.AWS_SECRET_ACCESS_KEY,
-  region: process.env.AWS_REGION
-});
+// Initialize AWS SDK (AWS_S3_ENDPOINT selects an S3-compatible server)
+const s3 = createS3Client();
 
 const execAsync = promisify(exec);
+const execFileAsync = promisify(execFile);
 const PORT = process.env.PORT || 3000;
 const app = express();
 
@@ -226,6 +226,86 @@ app.post('/api/pipeline/subtitles', async (req, res) => {
   }
 });
 
+/**
+ * POST /api/pipeline/subtitles/stream
+ * Step 2 (streaming): Send subtitle cues while transcription is still running.
+ * Responds with NDJSON by default, or server-sent events when the client
+ * accepts text/event-stream or passes { "format": "sse" }.
+ */
+// @ts-ignore Express v5 type compatibility
+app.post('/api/pipeline/subtitles/stream', async (req, res) => {
+  const { videoPath = 'output/final_video.mp4', format } = req.body || {};
+  const useSse = format === 'sse' || (format === undefined && (req.headers.accept || '').includes('text/event-stream'));
+
+  if (!await fs.pathExists(videoPath)) {
+    return res.status(400).json({ error: `Video file not found: ${videoPath}` });
+  }
+
+  console.log(`[API] Streaming subtitle cues (${useSse ? 'sse' : 'ndjson'})...`);
+
+  res.status(200);
+  res.setHeader('Content-Type', useSse ? 'text/event-stream' : 'application/x-ndjson');
+  res.setHeader('Cache-Control', 'no-cache');
+  res.setHeader('Connection', 'keep-alive');
+  res.flushHeaders();
+
+  const child = spawn('python3', ['./generate_subtitles_only.py', '--ndjson', '--video', path.resolve(videoPath)]);
+
+  const send = (line: string) => {
+    if (!line.trim()) return;
+    if (useSse) {
+      let eventName = 'message';
+      try {
+        eventName = JSON.parse(line).event || eventName;
+      } catch {
+        // Forward non-JSON lines as plain messages
+      }
+      res.write(`event: ${eventName}\ndata: ${line}\n\n`);
+    } else {
+      res.write(`${line}\n`);
+    }
+  };
+
+  // Forward each complete line as soon as the generator prints it
+  let buffered = '';
+  child.stdout.setEncoding('utf8');
+  child.stdout.on('data', (data: string) => {
+    buffered += data;
+    const lines = buffered.split('\n');
+    buffered = lines.pop() || '';
+    lines.forEach(send);
+  });
+
+  let stderr = '';
+  child.stderr.on('data', (data: Buffer) => {
+    stderr += data.toString();
+  });
+
+  child.on('error', (error) => {
+    console.error('[API] Error starting subtitle stream:', error);
+    send(JSON.stringify({ event: 'error', message: error.message }));
+    res.end();
+  });
+
+  child.on('close', (code) => {
+    send(buffered);
+    if (code !== 0) {
+      console.error('[API] Subtitle stream failed:', stderr);
+      send(JSON.stringify({ event: 'error', message: `Subtitle generation exited with code ${code}` }));
+    } else {
+      console.log('[API] Subtitle stream completed successfully');
+    }
+    res.end();
+  });
+
+  // Stop transcribing if the client goes away
+  res.on('close', () => {
+    if (child.exitCode === null) {
+      child.kill();
+    }
+  });
+});
+
 /**
  * POST /api/pipeline/burn-subtitles
  * Step 3: Burn subtitles into video (equivalent to burn_subtitles.py)
@@ -436,63 +516,122 @@ app.post('/api/pipeline/overlay', async (req, res) => {
 });
 
 /**
- * Compress video using FFmpeg before upload
+ * POST /api/pipeline/recaption
+ * Re-apply only a new caption to the last render (video_overlay_opencv.py --caption-only)
  */
-async function compressVideo(inputPath: string): Promise<string> {
+// @ts-ignore Express v5 type compatibility
+app.post('/api/pipeline/recaption', async (req, res) => {
   try {
-    const dir = path.dirname(inputPath);
-    const filename = path.basename(inputPath, '.mp4');
-    const outputPath = path.join(dir, `${filename}_compressed.mp4`);
-
-    console.log(`[API] Compressing video: ${inputPath}`);
+    const { caption, outputDir = 'processed_videos' } = req.body;
     
-    // Use FFmpeg to compress the video
-    // -crf 28: Higher compression (default is 23, higher = more compression)
-    // -preset faster: Faster encoding with reasonable compression
-    // -movflags +faststart: Enables fast start for web playback
-    const command = `ffmpeg -y -i "${inputPath}" -c:v libx264 -crf 28 -preset faster -c:a aac -b:a 128k -movflags +faststart "${outputPath}"`;
+    if (!caption) {
+      return res.status(400).json({ error: 'Caption is required' });
+    }
     
-    await execAsync(command);
-    console.log(`[API] Video compressed successfully: ${outputPath}`);
+    console.log('[API] Re-applying caption...');
+    await fs.writeFile('caption.txt', caption, 'utf8');
+    
+    const startedAt = Date.now();
+    const { stdout, stderr } = await execAsync('python3 ./video_overlay_opencv.py --caption-only');
+    
+    const processedDir = path.join(__dirname, `../${outputDir}`);
+    let processedFiles: Array<{filename: string, path: string, relativePath: string}> = [];
+    
+    if (await fs.pathExists(processedDir)) {
+      const files = await fs.readdir(processedDir);
+      processedFiles = files
+        .filter(file => file.endsWith('.mp4'))
+        .sort((a, b) => {
+          const numA = parseInt(a.match(/video_(\d+)\.mp4/)?.[1] || '0');
+          const numB = parseInt(b.match(/video_(\d+)\.mp4/)?.[1] || '0');
+          return numA - numB;
+        })
+        .map(file => ({
+          filename: file,
+          path: path.join(processedDir, file),
+          relativePath: `${outputDir}/${file}`
+        }));
+    }
+    
+    res.json({
+      success: true,
+      message: 'Caption re-applied successfully',
+      caption,
+      processedVideos: processedFiles,
+      videoCount: processedFiles.length,
+      seconds: (Date.now() - startedAt) / 1000,
+      logs: {
+        stdout: stdout,
+        stderr: stderr
+      }
+    });
     
-    return outputPath;
   } catch (error) {
-    console.error(`[API] Error compressing video:`, error);
-    throw error;
+    console.error('[API] Error re-applying caption:', error);
+    const errorInfo = handleError(error);
+    res.status(500).json({
+      error: 'Failed to re-apply caption',
+      details: errorInfo.message,
+      stack: errorInfo.stack
+    });
   }
-}
+});
 
 /**
- * Upload a video file directly to S3
+ * POST /api/pipeline/preview
+ * Render the caption box and subtitles on a few frames, without encoding (preview_render.py)
  */
-async function uploadVideoToS3(videoPath: string): Promise<string> {
+// @ts-ignore Express v5 type compatibility
+app.post('/api/pipeline/preview', async (req, res) => {
   try {
-    // Compress the video first
-    const compressedVideoPath = await compressVideo(videoPath);
+    const {
+      caption,
+      videoPath = 'output/final_video.mp4',
+      subtitlePath = 'output/final_video.vtt',
+      part = 1,
+      times,
+      cues
+    } = req.body;
     
-    const fileStream = fs.createReadStream(compressedVideoPath);
-    const fileName = path.basename(videoPath); // Use original filename
+    const fullVideoPath = path.join(__dirname, `../${videoPath}`);
+    if (!await fs.pathExists(fullVideoPath)) {
+      return res.status(400).json({ error: `Video file not found: ${fullVideoPath}` });
+    }
     
-    const uploadParams = {
-      Bucket: process.env.AWS_S3_BUCKET || '',
-      Key: `processed_videos/${fileName}`,
-      Body: fileStream
-    };
-
-    console.log(`[S3] Uploading ${fileName} to S3...`);
-    const uploadResult = await s3.upload(uploadParams).promise();
+    // Arguments are passed without a shell, so the caption needs no quoting
+    const args = [
+      './preview_render.py', '--json',
+      '--video', fullVideoPath,
+      '--subtitles', path.join(__dirname, `../${subtitlePath}`),
+      '--part', String(part)
+    ];
+    if (caption) args.push('--caption', caption);
+    if (Array.isArray(times)) args.push('--times', times.join(','));
+    if (cues !== undefined) args.push('--cues', String(cues));
+    
+    const { stdout } = await execFileAsync('python3', args);
+    const preview = JSON.parse(stdout.trim().split('\n').pop() || '{}');
+    const toUrl = (file: string) => `/output/preview/${path.basename(file)}`;
+    
+    res.json({
+      success: true,
+      message: 'Preview rendered successfully',
+      times: preview.times,
+      frames: preview.frames.map(toUrl),
+      contactSheet: toUrl(preview.contactSheet),
+      seconds: preview.seconds
+    });
     
-    // Clean up compressed video
-    await fs.remove(compressedVideoPath).catch(err => 
-      console.warn(`[S3] Warning: Could not delete compressed video: ${err.message}`)
-    );
-
-    return uploadResult.Location;
   } catch (error) {
-    console.error(`[S3] Error uploading ${videoPath}:`, error);
-    throw error;
+    console.error('[API] Error rendering preview:', error);
+    const errorInfo = handleError(error);
+    res.status(500).json({
+      error: 'Failed to render preview',
+      details: errorInfo.message,
+      stack: errorInfo.stack
+    });
   }
-}
+});
 
 /**
  * POST /api/pipeline/run-all
@@ -500,10 +639,10 @@ async function uploadVideoToS3(videoPath: string): Promise<string> {
  */
 // @ts-ignore Express v5 type compatibility
 app.post('/api/pipeline/run-all', async (req, res) => {
-  const results: Array<{step: number, name: string, success: boolean, stdout?: string, stderr?: string, error?: string}> = [];
+  const results: Array<{step: number, name: string, success: boolean, durationMs: number, skipped?: boolean, stdout?: string, stderr?: string, error?: string}> = [];
   
   try {
-    const { text, caption } = req.body;
+    const { text, caption, jobId: resumeJobId } = req.body;
     
     if (!text) {
       return res.status(400).json({ error: 'Text is required' });
@@ -512,8 +651,53 @@ app.post('/api/pipeline/run-all', async (req, res) => {
     if (!caption) {
       return res.status(400).json({ error: 'Caption is required' });
     }
+
+    if (resumeJobId !== undefined && !isValidJobId(resumeJobId)) {
+      return res.status(400).json({ error: 'jobId may only contain letters, digits, "-" and "_"' });
+    }
     
-    console.log('[API] Starting complete pipeline...');
+    // Stages publish live progress under this id (see progress.py and GET /api/pipeline/status).
+    // Passing the jobId of an interrupted run resumes it from its checkpoint journal (see job_journal.py)
+    const jobId = resumeJobId || `run-${Date.now()}`;
+    // STREAMING_PIPELINE=1 replaces steps 3-5 with streaming_pipeline.py
+    const streaming = process.env.STREAMING_PIPELINE === '1';
+    const totalSteps = streaming ? 3 : 5;
+    const root = path.join(__dirname, '..');
+    const file = (...parts: string[]) => path.join(root, ...parts);
+    // The overlay (or streaming) step appends a line here as each video is finished
+    const eventsFile = file('output', `${jobId}.videos.ndjson`);
+    const jobExec = { env: { ...process.env, REELGEN_JOB_ID: jobId, OVERLAY_EVENTS_FILE: eventsFile } };
+    console.log(`[API] ${resumeJobId ? 'Resuming' : 'Starting'} complete pipeline (job ${jobId})...`);
+
+    /**
+     * Run one step, or skip it when the journal shows this job already completed it with the same inputs.
+     * Inputs and outputs are files or directories; results[].durationMs is the step's wall time.
+     */
+    const runStep = async (step: number, name: string, label: string, command: string, inputs: string[], outputs: string[]) => {
+      console.log(`[API] Step ${step}/${totalSteps}: ${label}...`);
+      const stepStartedAt = Date.now();
+      if (await stageComplete(jobId, name, inputs)) {
+        console.log(`[API] Step ${step}/${totalSteps} already completed by job ${jobId}; skipping`);
+        results.push({ step, name, success: true, skipped: true, durationMs: Date.now() - stepStartedAt });
+        return;
+      }
+      try {
+        const { stdout, stderr } = await execAsync(command, jobExec);
+        const durationMs = Date.now() - stepStartedAt;
+        await recordStage(jobId, name, inputs, outputs);
+        results.push({ step, name, success: true, durationMs, stdout, stderr });
+      } catch (error) {
+        const errorInfo = handleError(error);
+        results.push({
+          step,
+          name,
+          success: false,
+          durationMs: Date.now() - stepStartedAt,
+          error: errorInfo.message
+        });
+        throw error;
+      }
+    };
     
     // Write text to userText.txt (combined for TTS)
     await fs.writeFile('userText.txt', `${caption} ${text}`, 'utf8');
@@ -521,119 +705,56 @@ app.post('/api/pipeline/run-all', async (req, res) => {
     // Write caption to caption.txt (for video overlay)
     await fs.writeFile('caption.txt', caption, 'utf8');
 
-    // Step 1: Generate video
-    console.log('[API] Step 1/5: Generate video...');
-    try {
-      const { stdout: stdout1, stderr: stderr1 } = await execAsync('node generate.js');
-      results.push({
-        step: 1,
-        name: 'generate',
-        success: true,
-        stdout: stdout1,
-        stderr: stderr1
-      });
-    } catch (error) {
-      const errorInfo = handleError(error);
-      results.push({
-        step: 1,
-        name: 'generate',
-        success: false,
-        error: errorInfo.message
-      });
-      throw error;
-    }
-    
-    // Step 2: Generate subtitles
-    console.log('[API] Step 2/5: Generate subtitles...');
-    try {
-      const { stdout: stdout2, stderr: stderr2 } = await execAsync('python3 ./generate_subtitles_only.py');
-      results.push({
-        step: 2,
-        name: 'subtitles',
-        success: true,
-        stdout: stdout2,
-        stderr: stderr2
-      });
-    } catch (error) {
-      const errorInfo = handleError(error);
-      results.push({
-        step: 2,
-        name: 'subtitles',
-        success: false,
-        error: errorInfo.message
-      });
-      throw error;
-    }
-    
-    // Step 3: Burn subtitles
-    console.log('[API] Step 3/5: Burn subtitles...');
-    try {
-      const { stdout: stdout3, stderr: stderr3 } = await execAsync('python3 burn_subtitles.py');
-      results.push({
-        step: 3,
-        name: 'burn-subtitles',
-        success: true,
-        stdout: stdout3,
-        stderr: stderr3
-      });
-    } catch (error) {
-      const errorInfo = handleError(error);
-      results.push({
-        step: 3,
-        name: 'burn-subtitles',
-        success: false,
-        error: errorInfo.message
-      });
-      throw error;
-    }
-    
-    // Step 4: Chunk video
-    console.log('[API] Step 4/5: Chunk video...');
-    try {
-      const { stdout: stdout4, stderr: stderr4 } = await execAsync('node ./chunk-video.js');
-      results.push({
-        step: 4,
-        name: 'chunk',
-        success: true,
-        stdout: stdout4,
-        stderr: stderr4
-      });
-    } catch (error) {
-      const errorInfo = handleError(error);
-      results.push({
-        step: 4,
-        name: 'chunk',
-        success: false,
-        error: errorInfo.message
-      });
-      throw error;
-    }
+    await runStep(1, 'generate', 'Generate video', 'node generate.js',
+      [file('userText.txt')], [file('output', 'final_video.mp4')]);
+
+    await runStep(2, 'subtitles', 'Generate subtitles', 'python3 ./generate_subtitles_only.py',
+      [file('output', 'final_video.mp4')], [file('output', 'final_video.vtt')]);
+
+    // Upload each video as soon as it is finished, while later ones are still encoding;
+    // the overlay stage already encoded them at delivery settings
+    const uploads = createUploadQueue({}, s3);
+    const uploadKeys = new Set<string>();
+    const uploadVideo = (videoPath: string) => {
+      const key = `processed_videos/${path.basename(videoPath)}`;
+      if (uploadKeys.has(key)) return;
+      uploadKeys.add(key);
+      console.log(`[API] Uploading ${path.basename(videoPath)} to S3...`);
+      uploads.add({ path: videoPath, key });
+    };
+    await fs.remove(eventsFile);
+    const stopFollowing = followNdjson(eventsFile, (event) => {
+      if (event.event === 'video' && typeof event.file === 'string') {
+        uploadVideo(path.resolve(root, event.file));
+      }
+    });
     
-    // Step 5: Video overlay
-    console.log('[API] Step 5/5: Video overlay...');
     try {
-      const { stdout: stdout5, stderr: stderr5 } = await execAsync('python3 ./video_overlay_opencv.py');
-      results.push({
-        step: 5,
-        name: 'overlay',
-        success: true,
-        stdout: stdout5,
-        stderr: stderr5
-      });
-    } catch (error) {
-      const errorInfo = handleError(error);
-      results.push({
-        step: 5,
-        name: 'overlay',
-        success: false,
-        error: errorInfo.message
-      });
-      throw error;
+      if (streaming) {
+        // Step 3 (streaming): burn subtitles, chunk and overlay through pipes, without intermediate files
+        await runStep(3, 'stream', 'Stream subtitles, chunks and overlay', 'python3 ./streaming_pipeline.py',
+          [file('output', 'final_video.mp4'), file('output', 'final_video.vtt'), file('caption.txt')],
+          [file('processed_videos')]);
+      } else {
+        await runStep(3, 'burn-subtitles', 'Burn subtitles', 'python3 burn_subtitles.py',
+          [file('output', 'final_video.mp4'), file('output', 'final_video.vtt')],
+          [file('output', 'final_video_with_subtitles.mp4')]);
+
+        await runStep(4, 'chunk', 'Chunk video', 'node ./chunk-video.js',
+          [file('output', 'final_video_with_subtitles.mp4')], [file('output', 'chunks')]);
+
+        await runStep(5, 'overlay', 'Video overlay', 'python3 ./video_overlay_opencv.py',
+          [file('output', 'chunks'), file('caption.txt')], [file('processed_videos')]);
+      }
+    } finally {
+      await stopFollowing();
+      await fs.remove(eventsFile);
     }
+    const encodedAt = Date.now();
     
     console.log('[API] Complete pipeline finished successfully');
     
-    // After all steps complete, get processed videos and upload them
+    // Upload the videos that were not announced while encoding (e.g. a skipped step), then wait for all uploads
     const processedDir = path.join(__dirname, '../processed_videos');
     let processedFiles: Array<{
       filename: string, 
@@ -641,6 +762,7 @@ app.post('/api/pipeline/run-all', async (req, res) => {
       relativePath: string,
       s3Url?: string
     }> = [];
+    let uploadReport: UploadReport | null = null;
     
     if (await fs.pathExists(processedDir)) {
       const files = await fs.readdir(processedDir);
@@ -657,33 +779,37 @@ app.post('/api/pipeline/run-all', async (req, res) => {
           relativePath: `processed_videos/${file}`
         }));
 
-      // Upload each video to S3
-      console.log('[API] Uploading processed videos to S3...');
-      for (const file of processedFiles) {
-        try {
-          const s3Url = await uploadVideoToS3(file.path);
-          file.s3Url = s3Url;
-          console.log(`[API] Successfully uploaded ${file.filename} to S3`);
-        } catch (error) {
-          console.error(`[API] Failed to upload ${file.filename}:`, error);
-          file.s3Url = `Error: ${(error as Error).message}`;
-        }
-      }
+      processedFiles.forEach(file => uploadVideo(file.path));
+    }
+    if (uploadKeys.size > 0) {
+      uploadReport = await uploads.finish();
+      const byKey = new Map(uploadReport.results.map(result => [result.key, result]));
+      processedFiles.forEach(file => {
+        const result = byKey.get(`processed_videos/${file.filename}`);
+        file.s3Url = result && (result.error ? `Error: ${result.error}` : result.location);
+      });
     }
     
     res.json({
       success: true,
       message: 'Complete pipeline executed successfully',
+      jobId,
       inputText: text,
       inputCaption: caption,
       results: results,
       finalVideos: processedFiles,
-      totalSteps: 5,
+      totalSteps,
       completedSteps: results.filter(r => r.success).length,
       uploadResults: processedFiles.map(file => ({
         filename: file.filename,
         s3Url: file.s3Url
-      }))
+      })),
+      uploadStats: uploadReport && {
+        totalBytes: uploadReport.totalBytes,
+        seconds: uploadReport.seconds,
+        afterEncodeSeconds: (Date.now() - encodedAt) / 1000,
+        throughputMBps: Number(uploadReport.throughputMBps.toFixed(2))
+      }
     });
     
   } catch (error) {
@@ -698,6 +824,72 @@ app.post('/api/pipeline/run-all', async (req, res) => {
   }
 });
 
+/**
+ * Read the stage progress files written by progress.py, grouped by job.
+ * A running stage whose file has not been updated recently, or whose process is gone, is flagged as stalled.
+ */
+async function readProgressStatus(jobFilter?: string) {
+  const progressDir = process.env.REELGEN_PROGRESS_DIR || path.join(__dirname, '../output/progress');
+  const stallSeconds = parseFloat(process.env.REELGEN_PROGRESS_STALL_SECONDS || '30');
+  const jobs: Record<string, Record<string, any>> = {};
+
+  if (!await fs.pathExists(progressDir)) {
+    return jobs;
+  }
+
+  const now = Date.now() / 1000;
+  for (const name of await fs.readdir(progressDir)) {
+    if (!name.endsWith('.json')) continue;
+    const state = await fs.readJson(path.join(progressDir, name)).catch(() => null);
+    if (!state || (jobFilter && state.job !== jobFilter)) continue;
+
+    let alive = true;
+    try {
+      process.kill(state.pid, 0);
+    } catch (error) {
+      alive = (error as NodeJS.ErrnoException).code === 'EPERM';
+    }
+    const secondsSinceUpdate = Math.round(now - state.updatedAt);
+    jobs[state.job] = jobs[state.job] || {};
+    jobs[state.job][state.stage] = {
+      ...state,
+      secondsSinceUpdate,
+      stalled: state.status === 'running' && (!alive || secondsSinceUpdate > stallSeconds)
+    };
+  }
+  return jobs;
+}
+
+/**
+ * Read the core allotments recorded by resource_scheduler.py
+ */
+async function readSchedulerStatus() {
+  const schedulerDir = process.env.REELGEN_SCHEDULER_DIR || '/tmp/reelgen_scheduler';
+  const ledgerPath = path.join(schedulerDir, 'cores.json');
+  const budget = parseInt(process.env.REELGEN_CORE_BUDGET || '', 10) || os.cpus().length;
+
+  if (!await fs.pathExists(ledgerPath)) {
+    return { budget, allocated: 0, utilization: 0, allotments: [], waiting: [] };
+  }
+
+  const ledger = await fs.readJson(ledgerPath).catch(() => ({}));
+  const allotments: Array<{ pid: number, stage: string, cores: number, started: number }> = ledger.allotments || [];
+  const allocated = allotments.reduce((sum, a) => sum + a.cores, 0);
+  return {
+    budget,
+    allocated,
+    utilization: budget > 0 ? allocated / budget : 0,
+    allotments: allotments.map(a => ({
+      pid: a.pid,
+      stage: a.stage,
+      cores: a.cores,
+      runningSeconds: Math.round(Date.now() / 1000 - a.started)
+    })),
+    waiting: ledger.waiting || [],
+    stats: ledger.stats || {}
+  };
+}
+
 /**
  * GET /api/pipeline/status
  * Get current pipeline status and output files
@@ -732,7 +924,9 @@ app.get('/api/pipeline/status', async (req, res) => {
           vtt: await fs.pathExists(path.join(outputDir, 'final_video.vtt')),
           txt: await fs.pathExists(path.join(outputDir, 'final_video.txt'))
         }
-      }
+      },
+      scheduler: await readSchedulerStatus(),
+      progress: await readProgressStatus(typeof req.query.job === 'string' ? req.query.job : undefined)
     };
     
     // Get files in each directory
@@ -0,0 +1,143 @@
+import fs from "fs-extra";
+import path from "path";
+import crypto from "crypto";
+
+// Shared with job_journal.py, which records the overlay parts and transcription windows of a job
+export const JOURNAL_DIR = process.env.REELGEN_JOURNAL_DIR || path.join(__dirname, "..", "..", "output", "journal");
+
+export interface FileSignature {
+  sha256: string;
+  size: number;
+  mtimeMs: number;
+}
+
+export interface JournalEntry {
+  completedAt: number;
+  params: unknown;
+  inputs: Record<string, FileSignature>;
+  outputs: Record<string, FileSignature>;
+  data: unknown;
+}
+
+export interface Journal {
+  jobId: string;
+  stages: Record<string, JournalEntry>;
+  units: Record<string, Record<string, JournalEntry>>;
+}
+
+// Journal writes are chained so concurrent records in one process never interleave
+let journalWrite: Promise<void> = Promise.resolve();
+
+/**
+ * Job ids name journal files, so only plain names are accepted.
+ */
+export function isValidJobId(jobId: unknown): jobId is string {
+  return typeof jobId === "string" && /^[A-Za-z0-9_-]{1,64}$/.test(jobId);
+}
+
+function journalPath(jobId: string): string {
+  return path.join(JOURNAL_DIR, `${jobId}.json`);
+}
+
+export async function loadJournal(jobId: string): Promise<Journal> {
+  try {
+    const journal = await fs.readJson(journalPath(jobId));
+    if (journal.stages && journal.units) {
+      return journal;
+    }
+  } catch {
+    // No journal for this job yet
+  }
+  return { jobId, stages: {}, units: {} };
+}
+
+export async function fileSignature(filePath: string): Promise<FileSignature> {
+  const stats = await fs.stat(filePath);
+  const hash = crypto.createHash("sha256");
+  await new Promise<void>((resolve, reject) => {
+    fs.createReadStream(filePath)
+      .on("data", chunk => hash.update(chunk))
+      .on("end", () => resolve())
+      .on("error", reject);
+  });
+  return { sha256: hash.digest("hex"), size: stats.size, mtimeMs: Math.floor(stats.mtimeMs) };
+}
+
+/**
+ * Whether a file still has a recorded signature. Files with the same size and
+ * modification time are trusted without hashing them again.
+ */
+async function signatureMatches(filePath: string, signature: FileSignature): Promise<boolean> {
+  const stats = await fs.stat(filePath).catch(() => null);
+  if (!stats || stats.size !== signature.size) return false;
+  if (Math.floor(stats.mtimeMs) === signature.mtimeMs) return true;
+  return (await fileSignature(filePath)).sha256 === signature.sha256;
+}
+
+/**
+ * Files under the given paths, expanding directories recursively.
+ */
+export async function expandPaths(paths: string[]): Promise<string[]> {
+  const files: string[] = [];
+  for (const entry of paths) {
+    if (!await fs.pathExists(entry)) continue;
+    if ((await fs.stat(entry)).isDirectory()) {
+      const names = (await fs.readdir(entry)).sort();
+      files.push(...await expandPaths(names.map(name => path.join(entry, name))));
+    } else {
+      files.push(entry);
+    }
+  }
+  return files;
+}
+
+/**
+ * Whether a step of the job completed with these inputs and its outputs are intact.
+ */
+export async function stageComplete(jobId: string, stage: string, inputs: string[]): Promise<boolean> {
+  const entry = (await loadJournal(jobId)).stages[stage];
+  if (!entry) return false;
+
+  const files = await expandPaths(inputs);
+  const recorded = Object.keys(entry.inputs);
+  if (files.length !== recorded.length || files.some(file => !(file in entry.inputs))) return false;
+
+  for (const [file, signature] of [...Object.entries(entry.inputs), ...Object.entries(entry.outputs)]) {
+    if (!await signatureMatches(file, signature)) return false;
+  }
+  return true;
+}
+
+/**
+ * Record a completed step with the signatures of its inputs and outputs (files or directories).
+ * Units recorded by job_journal.py in the meantime are kept.
+ */
+export async function recordStage(jobId: string, stage: string, inputs: string[], outputs: string[]) {
+  const sign = async (paths: string[]) => {
+    const signatures: Record<string, FileSignature> = {};
+    for (const file of await expandPaths(paths)) {
+      signatures[file] = await fileSignature(file);
+    }
+    return signatures;
+  };
+  const entry: JournalEntry = {
+    completedAt: Date.now() / 1000,
+    params: null,
+    inputs: await sign(inputs),
+    outputs: await sign(outputs),
+    data: null
+  };
+
+  const save = journalWrite.then(async () => {
+    const journal = await loadJournal(jobId);
+    journal.stages[stage] = entry;
+    const filePath = journalPath(jobId);
+    await fs.ensureDir(JOURNAL_DIR);
+    const tempPath = `${filePath}.${process.pid}.${crypto.randomBytes(4).toString("hex")}.tmp`;
+    await fs.writeJson(tempPath, journal, { spaces: 2 });
+    await fs.rename(tempPath, filePath);
+  });
+  // A failed write must not block the ones after it
+  journalWrite = save.catch(() => {});
+  await save;
+}
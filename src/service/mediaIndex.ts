@@ -0,0 +1,172 @@
+import ffmpeg from "fluent-ffmpeg";
+import fs from "fs-extra";
+import path from "path";
+import crypto from "crypto";
+import { execFile } from "child_process";
+
+// Shared with media_index.py
+const INDEX_PATH = process.env.MEDIA_INDEX_PATH || path.join(__dirname, "..", "..", "media_index.json");
+const INDEX_VERSION = 1;
+
+// Saves are chained so concurrent lookups in one process never interleave their read-merge-write
+let indexWrite: Promise<void> = Promise.resolve();
+
+export interface MediaInfo {
+  size: number;
+  mtimeMs: number;
+  duration: number;
+  fps: number;
+  width: number;
+  height: number;
+  codec: string | null;
+  frameCount: number;
+  hasAudio: boolean;
+  keyframes: number[] | null;
+}
+
+export interface MediaIndex {
+  version: number;
+  files: Record<string, MediaInfo>;
+}
+
+export async function loadMediaIndex(indexPath: string = INDEX_PATH): Promise<MediaIndex> {
+  try {
+    const index = await fs.readJson(indexPath);
+    if (index.version === INDEX_VERSION && index.files) {
+      return index;
+    }
+  } catch {
+    // Missing or unreadable index: start fresh
+  }
+  return { version: INDEX_VERSION, files: {} };
+}
+
+/**
+ * Merge the index into the file on disk and replace it atomically.
+ * Entries written by other processes, or by other saves in this one, in the meantime are kept.
+ */
+export function saveMediaIndex(index: MediaIndex, indexPath: string = INDEX_PATH): Promise<void> {
+  const save = indexWrite.then(async () => {
+    const onDisk = await loadMediaIndex(indexPath);
+    Object.assign(onDisk.files, index.files);
+    index.files = onDisk.files;
+
+    await fs.ensureDir(path.dirname(indexPath));
+    const tempPath = `${indexPath}.${process.pid}.${crypto.randomBytes(4).toString("hex")}.tmp`;
+    await fs.writeJson(tempPath, onDisk, { spaces: 2 });
+    await fs.rename(tempPath, indexPath);
+  });
+  // A failed save must not block the ones after it
+  indexWrite = save.catch(() => {});
+  return save;
+}
+
+function parseRate(rate: string | undefined): number {
+  if (!rate) return 0;
+  const [numerator, denominator] = rate.split("/").map(Number);
+  return denominator ? numerator / denominator : 0;
+}
+
+async function probeFile(filePath: string): Promise<Omit<MediaInfo, "size" | "mtimeMs" | "keyframes">> {
+  const metadata = await new Promise<ffmpeg.FfprobeData>((resolve, reject) => {
+    ffmpeg.ffprobe(filePath, (err, data) => (err ? reject(err) : resolve(data)));
+  });
+
+  const video = metadata.streams.find(s => s.codec_type === "video");
+  const audio = metadata.streams.find(s => s.codec_type === "audio");
+  const duration = Number(metadata.format.duration) || 0;
+  const fps = video ? parseRate(video.avg_frame_rate) || parseRate(video.r_frame_rate) : 0;
+  const nbFrames = video ? parseInt(String(video.nb_frames), 10) : NaN;
+
+  return {
+    duration,
+    fps,
+    width: video?.width || 0,
+    height: video?.height || 0,
+    codec: (video || audio)?.codec_name || null,
+    frameCount: Number.isNaN(nbFrames) ? Math.round(duration * fps) : nbFrames,
+    hasAudio: Boolean(audio)
+  };
+}
+
+/**
+ * Read keyframe timestamps of the first video stream from packet flags
+ */
+export async function probeKeyframes(filePath: string): Promise<number[]> {
+  const stdout = await new Promise<string>((resolve, reject) => {
+    execFile(
+      "ffprobe",
+      ["-v", "error", "-select_streams", "v:0", "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", filePath],
+      { maxBuffer: 64 * 1024 * 1024 },
+      (error, out, stderr) => (error ? reject(new Error(stderr || error.message)) : resolve(out))
+    );
+  });
+
+  return stdout
+    .split("\n")
+    .map(line => line.trim().split(","))
+    .filter(([pts, flags]) => flags && flags.includes("K") && pts && pts !== "N/A")
+    .map(([pts]) => Number(parseFloat(pts).toFixed(6)))
+    .sort((a, b) => a - b);
+}
+
+/**
+ * Return metadata for a file, probing only when the index entry is missing
+ * or the file's size or mtime changed. Pass an index to batch several
+ * lookups and save once; otherwise the shared index is loaded and saved.
+ */
+export async function getMediaInfo(
+  filePath: string,
+  options: { keyframes?: boolean, index?: MediaIndex } = {}
+): Promise<MediaInfo> {
+  const index = options.index || await loadMediaIndex();
+  const key = path.resolve(filePath);
+  const stats = await fs.stat(key);
+  // Whole milliseconds, matching st_mtime_ns // 1_000_000 on the Python side
+  const mtimeMs = Math.floor(stats.mtimeMs);
+
+  let entry = index.files[key];
+  let changed = false;
+
+  if (!entry || entry.size !== stats.size || entry.mtimeMs !== mtimeMs) {
+    entry = { size: stats.size, mtimeMs, ...await probeFile(key), keyframes: null };
+    changed = true;
+  }
+
+  if (options.keyframes && entry.keyframes === null) {
+    entry.keyframes = await probeKeyframes(key);
+    changed = true;
+  }
+
+  if (changed) {
+    index.files[key] = entry;
+    if (!options.index) {
+      await saveMediaIndex(index);
+    }
+  }
+
+  return entry;
+}
+
+/**
+ * Look up several files against one index load and save
+ */
+export async function getMediaInfoBatch(
+  filePaths: string[],
+  options: { keyframes?: boolean } = {}
+): Promise<MediaInfo[]> {
+  const index = await loadMediaIndex();
+  const entries: MediaInfo[] = [];
+  let changed = false;
+  for (const filePath of filePaths) {
+    const previous = index.files[path.resolve(filePath)];
+    const hadKeyframes = previous?.keyframes != null;
+    const entry = await getMediaInfo(filePath, { ...options, index });
+    changed = changed || entry !== previous || (entry.keyframes != null) !== hadKeyframes;
+    entries.push(entry);
+  }
+  if (changed) {
+    await saveMediaIndex(index);
+  }
+  return entries;
+}
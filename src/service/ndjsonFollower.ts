@@ -0,0 +1,57 @@
+import fs from "fs-extra";
+import { StringDecoder } from "string_decoder";
+
+/**
+ * Follow an NDJSON file that another process appends to (e.g. the overlay's
+ * OVERLAY_EVENTS_FILE), calling onEvent for each complete line.
+ * The file does not need to exist yet. Non-JSON lines are ignored.
+ *
+ * Returns a function that reads the rest of the file and stops following it.
+ */
+export function followNdjson(filePath: string, onEvent: (event: any) => void, intervalMs: number = 250): () => Promise<void> {
+  const decoder = new StringDecoder("utf8");
+  let position = 0;
+  let buffered = "";
+  let reading: Promise<void> = Promise.resolve();
+
+  const read = async () => {
+    const stats = await fs.stat(filePath).catch(() => null);
+    if (!stats || stats.size <= position) return;
+
+    const length = stats.size - position;
+    const buffer = Buffer.alloc(length);
+    const fd = await fs.open(filePath, "r");
+    try {
+      const { bytesRead } = await fs.read(fd, buffer, 0, length, position);
+      position += bytesRead;
+      buffered += decoder.write(buffer.subarray(0, bytesRead));
+    } finally {
+      await fs.close(fd);
+    }
+
+    const lines = buffered.split("\n");
+    buffered = lines.pop() || "";
+    for (const line of lines) {
+      if (!line.trim()) continue;
+      let event;
+      try {
+        event = JSON.parse(line);
+      } catch {
+        continue;
+      }
+      onEvent(event);
+    }
+  };
+
+  // Reads run one after another, so lines are delivered in order
+  const poll = () => {
+    reading = reading.then(read).catch(error => console.error(`[API] Error reading ${filePath}:`, error));
+  };
+  const timer = setInterval(poll, intervalMs);
+
+  return async () => {
+    clearInterval(timer);
+    poll();
+    await reading;
+  };
+}
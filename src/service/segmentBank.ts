@@ -0,0 +1,165 @@
+import fs from "fs-extra";
+import path from "path";
+import { execFile } from "child_process";
+import ffmpegPath from "ffmpeg-static";
+
+// Written by build-segment-bank.js
+export const SEGMENT_BANK_DIR = process.env.SEGMENT_BANK_DIR || path.join(__dirname, "..", "..", "segment_bank");
+export const SEGMENT_BANK_FILE = "bank.json";
+export const SEGMENT_BANK_VERSION = 1;
+
+// Frame rate of the standardized clips and the bank segments
+export const BANK_FPS = 30;
+
+// Encoder settings shared by the bank segments and the assembled tail, so they concatenate with stream copy
+export const BANK_ENCODE_OPTIONS = [
+  "-c:v", "libx264",
+  "-preset", "medium",
+  "-crf", "23",
+  "-r", String(BANK_FPS),
+  "-pix_fmt", "yuv420p",
+  "-flags", "+cgop",
+  "-an",
+  "-map_metadata", "-1",
+  "-fflags", "+bitexact"
+];
+
+export interface BankClip {
+  source: string;
+  size: number;
+  mtimeMs: number;
+  // Segment files relative to the bank directory, in playback order; all segmentSeconds long
+  segments: string[];
+}
+
+export interface SegmentBank {
+  version: number;
+  segmentSeconds: number;
+  settings: string;
+  // Theme (standardized_videos subfolder, or "" for its root) -> clips
+  themes: Record<string, Record<string, BankClip>>;
+}
+
+export interface BankAssembly {
+  seed: number;
+  theme: string;
+  files: string[];
+  duration: number;
+}
+
+export async function loadSegmentBank(bankDir: string = SEGMENT_BANK_DIR): Promise<SegmentBank | null> {
+  try {
+    const bank = await fs.readJson(path.join(bankDir, SEGMENT_BANK_FILE));
+    if (bank.version === SEGMENT_BANK_VERSION && bank.themes) {
+      return bank;
+    }
+  } catch {
+    // No bank built yet
+  }
+  return null;
+}
+
+/**
+ * Small seedable PRNG (mulberry32); returns floats in [0, 1).
+ */
+export function mulberry32(seed: number): () => number {
+  let state = seed >>> 0;
+  return () => {
+    state = (state + 0x6d2b79f5) >>> 0;
+    let t = state;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+/**
+ * Seed for background assembly: BACKGROUND_SEED when set, otherwise a fresh one (logged, so a run can be repeated).
+ */
+export function backgroundSeed(): number {
+  const fromEnv = process.env.BACKGROUND_SEED;
+  if (fromEnv && !Number.isNaN(Number(fromEnv))) {
+    return Number(fromEnv) >>> 0;
+  }
+  return Math.floor(Math.random() * 4294967296);
+}
+
+function encodeTail(segmentPath: string, frames: number, outputPath: string): Promise<void> {
+  return new Promise((resolve, reject) => {
+    execFile(
+      ffmpegPath || "ffmpeg",
+      ["-y", "-i", segmentPath, "-frames:v", String(frames), ...BANK_ENCODE_OPTIONS, outputPath],
+      (error, stdout, stderr) => {
+        if (error) {
+          reject(new Error(stderr || error.message));
+        } else {
+          resolve();
+        }
+      }
+    );
+  });
+}
+
+/**
+ * Pick bank segments that add up to exactly `duration` (to the frame).
+ *
+ * Whole segments are taken in runs from randomly chosen clips, so the footage
+ * plays continuously between cuts; the remainder is one short tail encoded
+ * from the next segment of the last run into `workDir`. The same seed, bank
+ * and duration always give the same sequence.
+ */
+export async function assembleFromBank(
+  bank: SegmentBank,
+  duration: number,
+  workDir: string,
+  seed: number,
+  bankDir: string = SEGMENT_BANK_DIR
+): Promise<BankAssembly> {
+  const random = mulberry32(seed);
+  const themes = Object.keys(bank.themes)
+    .filter(theme => Object.values(bank.themes[theme]).some(clip => clip.segments.length > 0))
+    .sort();
+  if (themes.length === 0) {
+    throw new Error(`Segment bank in ${bankDir} has no segments; run 'node build-segment-bank.js'`);
+  }
+  const theme = themes[Math.floor(random() * themes.length)];
+  const clips = Object.keys(bank.themes[theme])
+    .sort()
+    .map(name => bank.themes[theme][name])
+    .filter(clip => clip.segments.length > 0);
+
+  const totalFrames = Math.round(duration * BANK_FPS);
+  const segmentFrames = Math.round(bank.segmentSeconds * BANK_FPS);
+  const wholeSegments = Math.floor(totalFrames / segmentFrames);
+  const tailFrames = totalFrames - wholeSegments * segmentFrames;
+
+  let run: BankClip | null = null;
+  let index = 0;
+  const nextSegment = () => {
+    if (!run || index >= run.segments.length) {
+      // Start a new run at a random point of a random clip
+      run = clips[Math.floor(random() * clips.length)];
+      index = Math.floor(random() * run.segments.length);
+    }
+    return path.join(bankDir, run.segments[index++]);
+  };
+
+  const files: string[] = [];
+  for (let i = 0; i < wholeSegments; i++) {
+    files.push(nextSegment());
+  }
+  if (tailFrames > 0) {
+    const tailPath = path.join(workDir, "tail.mp4");
+    await encodeTail(nextSegment(), tailFrames, tailPath);
+    files.push(tailPath);
+  }
+
+  return { seed, theme, files, duration: totalFrames / BANK_FPS };
+}
+
+/**
+ * Concat demuxer list for the assembled files.
+ */
+export function concatList(files: string[]): string {
+  return files.map(file => `file '${path.resolve(file).replace(/\\/g, "/")}'`).join("\n");
+}
@@ -1,31 +1,178 @@
 import axios from "axios";
 import fs from "fs-extra";
+import path from "path";
+import crypto from "crypto";
 import dotenv from "dotenv";
 dotenv.config();
 
-export async function generateTTS(text: string, outputPath: string) {
+const AZURE_TTS_URL = "https://dunlin-deployment.openai.azure.com/openai/deployments/tts-hd/audio/speech?api-version=2025-03-01-preview";
+const TTS_MODEL = "tts-hd";
+const TTS_VOICE = "alloy";
+
+// Synthesized chunks are cached by content so unchanged text is never sent twice
+const TTS_CACHE_DIR = process.env.TTS_CACHE_DIR || path.join(__dirname, "..", "..", "cache", "tts");
+const TTS_CACHE_MAX_BYTES = parseInt(process.env.TTS_CACHE_MAX_BYTES || String(1024 * 1024 * 1024), 10);
+
+export interface TTSOptions {
+  retries?: number;      // Extra attempts after the first one
+  baseDelayMs?: number;  // Backoff before the first retry; doubles on each attempt
+}
+
+export interface TTSBatchOptions extends TTSOptions {
+  concurrency?: number;  // Requests in flight at once
+}
+
+const DEFAULT_RETRIES = parseInt(process.env.TTS_RETRIES || "3", 10);
+const DEFAULT_BASE_DELAY_MS = parseInt(process.env.TTS_RETRY_DELAY_MS || "1000", 10);
+const DEFAULT_CONCURRENCY = parseInt(process.env.TTS_CONCURRENCY || "4", 10);
+
+// TTS_ENDPOINT points the client at another server, e.g. the local stand-in (tts-standin.js)
+function ttsEndpoint() {
+  return process.env.TTS_ENDPOINT || AZURE_TTS_URL;
+}
+
+// The endpoint is part of the key, so audio from a stand-in is never served to a run against the real API
+function cacheKey(text: string) {
+  const key = { endpoint: ttsEndpoint(), model: TTS_MODEL, voice: TTS_VOICE, input: text };
+  return crypto.createHash("sha256").update(JSON.stringify(key)).digest("hex");
+}
+
+function cacheEnabled() {
+  return process.env.TTS_CACHE_DISABLE !== "1";
+}
+
+// Copy via a temporary name so readers never see a partial file.
+// The name is unique per copy, since concurrent tasks may write the same cache entry
+async function copyAtomic(sourcePath: string, targetPath: string) {
+  const partialPath = `${targetPath}.${process.pid}.${crypto.randomBytes(4).toString("hex")}.partial`;
+  await fs.copy(sourcePath, partialPath);
+  await fs.rename(partialPath, targetPath);
+}
+
+async function readFromCache(text: string, outputPath: string) {
+  const cachedPath = path.join(TTS_CACHE_DIR, `${cacheKey(text)}.wav`);
+  try {
+    await copyAtomic(cachedPath, outputPath);
+  } catch (error) {
+    return false;
+  }
+  // mtime records the last use for LRU eviction
+  const now = new Date();
+  await fs.utimes(cachedPath, now, now).catch(() => {});
+  return true;
+}
+
+async function writeToCache(text: string, audioPath: string) {
+  await fs.ensureDir(TTS_CACHE_DIR);
+  await copyAtomic(audioPath, path.join(TTS_CACHE_DIR, `${cacheKey(text)}.wav`));
+  await evictCache();
+}
+
+/**
+ * Delete least recently used cache entries until the cache fits in TTS_CACHE_MAX_BYTES.
+ */
+export async function evictCache(maxBytes: number = TTS_CACHE_MAX_BYTES) {
+  const names = (await fs.readdir(TTS_CACHE_DIR).catch(() => [] as string[])).filter(name => name.endsWith(".wav"));
+  const entries: { name: string; size: number; mtimeMs: number }[] = [];
+  for (const name of names) {
+    const stats = await fs.stat(path.join(TTS_CACHE_DIR, name)).catch(() => null);
+    if (stats) entries.push({ name, size: stats.size, mtimeMs: stats.mtimeMs });
+  }
+
+  let total = entries.reduce((sum, entry) => sum + entry.size, 0);
+  entries.sort((a, b) => a.mtimeMs - b.mtimeMs);
+  for (const entry of entries) {
+    if (total <= maxBytes) break;
+    await fs.remove(path.join(TTS_CACHE_DIR, entry.name));
+    total -= entry.size;
+    console.log(`[generateTTS] Evicted ${entry.name} from TTS cache`);
+  }
+}
+
+function sleep(ms: number) {
+  return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+// Network errors, throttling and server errors are worth retrying; bad requests are not
+function isRetryable(error: any): boolean {
+  const status = error?.response?.status;
+  return status === undefined || status === 408 || status === 429 || status >= 500;
+}
+
+function retryDelayMs(error: any, attempt: number, baseDelayMs: number): number {
+  const retryAfter = parseFloat(error?.response?.headers?.["retry-after"]);
+  if (!isNaN(retryAfter)) {
+    return retryAfter * 1000;
+  }
+  // Exponential backoff with jitter so parallel requests do not retry in lockstep
+  return baseDelayMs * 2 ** attempt * (0.5 + Math.random() / 2);
+}
+
+export async function generateTTS(text: string, outputPath: string, options: TTSOptions = {}) {
   const apiKey = process.env.AZURE_API_KEY;
-  const url = "https://dunlin-deployment.openai.azure.com/openai/deployments/tts-hd/audio/speech?api-version=2025-03-01-preview";
+  const url = ttsEndpoint();
+  const retries = options.retries ?? DEFAULT_RETRIES;
+  const baseDelayMs = options.baseDelayMs ?? DEFAULT_BASE_DELAY_MS;
   const data = {
-    model: "tts-hd",
+    model: TTS_MODEL,
     input: text,
-    voice: "alloy"
+    voice: TTS_VOICE
   };
 
-  console.log("[generateTTS] Sending request to Azure TTS API...");
-  try {
-    const response = await axios.post(url, data, {
-      headers: {
-        "Content-Type": "application/json",
-        "Authorization": `Bearer ${apiKey}`
-      },
-      responseType: "arraybuffer"
-    });
-    console.log("[generateTTS] TTS API response received. Writing to:", outputPath);
-    await fs.writeFile(outputPath, response.data);
-    console.log("[generateTTS] Audio file written.");
-  } catch (error) {
-    console.error("[generateTTS] Error during TTS generation:", error);
-    throw error;
+  if (cacheEnabled() && await readFromCache(text, outputPath)) {
+    console.log("[generateTTS] Reused cached audio for:", outputPath);
+    return outputPath;
   }
-} 
\ No newline at end of file
+
+  for (let attempt = 0; ; attempt++) {
+    console.log(`[generateTTS] Sending request to TTS API (attempt ${attempt + 1})...`);
+    try {
+      const response = await axios.post(url, data, {
+        headers: {
+          "Content-Type": "application/json",
+          "Authorization": `Bearer ${apiKey}`
+        },
+        responseType: "arraybuffer"
+      });
+      console.log("[generateTTS] TTS API response received. Writing to:", outputPath);
+      // Rename into place so readers (e.g. the streaming transcriber) never see a partial file
+      const partialPath = `${outputPath}.partial`;
+      await fs.writeFile(partialPath, response.data);
+      await fs.rename(partialPath, outputPath);
+      console.log("[generateTTS] Audio file written.");
+      if (cacheEnabled()) {
+        // A cache failure must not fail the job
+        await writeToCache(text, outputPath).catch((error) => console.warn("[generateTTS] Could not cache audio:", error?.message || error));
+      }
+      return outputPath;
+    } catch (error: any) {
+      if (attempt >= retries || !isRetryable(error)) {
+        console.error("[generateTTS] Error during TTS generation:", error?.message || error);
+        throw error;
+      }
+      const delay = retryDelayMs(error, attempt, baseDelayMs);
+      console.warn(`[generateTTS] Request failed (${error?.response?.status ?? error?.code ?? error?.message}); retrying in ${Math.round(delay)}ms`);
+      await sleep(delay);
+    }
+  }
+}
+
+/**
+ * Synthesize several texts with at most `concurrency` requests in flight.
+ * Returns the output paths in the same order as the texts, whatever order the requests finish in.
+ */
+export async function generateTTSBatch(texts: string[], outputPaths: string[], options: TTSBatchOptions = {}) {
+  const concurrency = Math.max(1, options.concurrency ?? DEFAULT_CONCURRENCY);
+  const results: string[] = new Array(texts.length);
+  let next = 0;
+
+  const workers = Array.from({ length: Math.min(concurrency, texts.length) }, async () => {
+    while (next < texts.length) {
+      const idx = next++;
+      console.log(`[generateTTSBatch] Generating TTS for chunk ${idx + 1}/${texts.length}...`);
+      results[idx] = await generateTTS(texts[idx], outputPaths[idx], options);
+    }
+  });
+  await Promise.all(workers);
+  return results;
+}
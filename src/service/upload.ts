@@ -0,0 +1,167 @@
+import AWS from "aws-sdk";
+import fs from "fs-extra";
+import path from "path";
+import dotenv from "dotenv";
+dotenv.config();
+
+const MB = 1024 * 1024;
+
+export interface UploadOptions {
+  bucket?: string;
+  partSizeMB?: number;     // Multipart part size (S3 minimum is 5 MB)
+  queueSize?: number;      // Parts in flight per file
+  concurrency?: number;    // Files in flight at once
+  onProgress?: (file: UploadFile, loadedBytes: number, totalBytes: number) => void;
+}
+
+export interface UploadFile {
+  path: string;
+  key: string;
+}
+
+export interface UploadResult {
+  path: string;
+  key: string;
+  location?: string;
+  error?: string;
+  bytes: number;
+  seconds: number;
+}
+
+export interface UploadReport {
+  results: UploadResult[];
+  totalBytes: number;
+  seconds: number;
+  throughputMBps: number;
+}
+
+const DEFAULT_PART_SIZE_MB = parseInt(process.env.UPLOAD_PART_SIZE_MB || "8", 10);
+const DEFAULT_QUEUE_SIZE = parseInt(process.env.UPLOAD_QUEUE_SIZE || "4", 10);
+const DEFAULT_CONCURRENCY = parseInt(process.env.UPLOAD_CONCURRENCY || "8", 10);
+// Each part request is retried by the SDK; a failed part does not restart the file
+const PART_RETRIES = parseInt(process.env.UPLOAD_PART_RETRIES || "5", 10);
+
+/**
+ * Create an S3 client from the environment.
+ * AWS_S3_ENDPOINT points it at an S3-compatible server (e.g. a local moto_server) with path-style URLs.
+ */
+export function createS3Client() {
+  const endpoint = process.env.AWS_S3_ENDPOINT;
+  return new AWS.S3({
+    accessKeyId: process.env.AWS_ACCESS_KEY_ID,
+    secretAccessKey: process.env.AWS_SECRET_ACCESS_KEY,
+    region: process.env.AWS_REGION,
+    maxRetries: PART_RETRIES,
+    ...(endpoint ? { endpoint, s3ForcePathStyle: true } : {})
+  });
+}
+
+/**
+ * Upload one file with a multipart upload, sending up to queueSize parts at once.
+ */
+export async function uploadFile(s3: AWS.S3, file: UploadFile, options: UploadOptions = {}): Promise<UploadResult> {
+  const partSize = Math.max(5, options.partSizeMB ?? DEFAULT_PART_SIZE_MB) * MB;
+  const queueSize = Math.max(1, options.queueSize ?? DEFAULT_QUEUE_SIZE);
+  const bytes = (await fs.stat(file.path)).size;
+  const start = Date.now();
+
+  const upload = s3.upload(
+    {
+      Bucket: options.bucket ?? process.env.AWS_S3_BUCKET ?? "",
+      Key: file.key,
+      Body: fs.createReadStream(file.path),
+      ContentType: "video/mp4"
+    },
+    { partSize, queueSize }
+  );
+  if (options.onProgress) {
+    upload.on("httpUploadProgress", (progress) => options.onProgress!(file, progress.loaded, bytes));
+  }
+
+  const result = await upload.promise();
+  return { path: file.path, key: file.key, location: result.Location, bytes, seconds: (Date.now() - start) / 1000 };
+}
+
+/**
+ * Upload one file, reporting a failure in its result instead of throwing.
+ */
+async function uploadOrReport(s3: AWS.S3, file: UploadFile, options: UploadOptions): Promise<UploadResult> {
+  const start = Date.now();
+  try {
+    const result = await uploadFile(s3, file, options);
+    console.log(`[S3] Uploaded ${path.basename(file.path)} (${(result.bytes / MB).toFixed(1)}MB in ${result.seconds.toFixed(1)}s)`);
+    return result;
+  } catch (error) {
+    console.error(`[S3] Error uploading ${file.path}:`, error);
+    const bytes = await fs.stat(file.path).then(stats => stats.size).catch(() => 0);
+    return { path: file.path, key: file.key, error: (error as Error).message, bytes, seconds: (Date.now() - start) / 1000 };
+  }
+}
+
+export interface UploadQueue {
+  // Start uploading a file as soon as a slot is free
+  add(file: UploadFile): void;
+  // Wait for every added file; the report covers the time from the first add
+  finish(): Promise<UploadReport>;
+}
+
+/**
+ * Queue that uploads files as they are added (at most `concurrency` at once),
+ * so files can be sent while later ones are still being produced.
+ * Per-file failures are reported in the results instead of failing the batch.
+ */
+export function createUploadQueue(options: UploadOptions = {}, s3: AWS.S3 = createS3Client()): UploadQueue {
+  const concurrency = Math.max(1, options.concurrency ?? DEFAULT_CONCURRENCY);
+  const results: UploadResult[] = [];
+  const pending: Array<{ file: UploadFile, idx: number }> = [];
+  const idle: Array<() => void> = [];
+  let active = 0;
+  let start = 0;
+
+  const pump = () => {
+    while (active < concurrency && pending.length > 0) {
+      const { file, idx } = pending.shift()!;
+      active++;
+      uploadOrReport(s3, file, options).then(result => {
+        results[idx] = result;
+        active--;
+        pump();
+        if (active === 0 && pending.length === 0) {
+          idle.splice(0).forEach(resolve => resolve());
+        }
+      });
+    }
+  };
+
+  return {
+    add(file: UploadFile) {
+      if (results.length === 0 && pending.length === 0 && active === 0) {
+        start = Date.now();
+      }
+      pending.push({ file, idx: results.length });
+      results.length++;
+      pump();
+    },
+
+    async finish(): Promise<UploadReport> {
+      if (active > 0 || pending.length > 0) {
+        await new Promise<void>(resolve => idle.push(resolve));
+      }
+      const seconds = results.length > 0 ? (Date.now() - start) / 1000 : 0;
+      const totalBytes = results.filter(r => !r.error).reduce((sum, r) => sum + r.bytes, 0);
+      const throughputMBps = seconds > 0 ? totalBytes / MB / seconds : 0;
+      console.log(`[S3] Uploaded ${results.filter(r => !r.error).length}/${results.length} files, ${(totalBytes / MB).toFixed(1)}MB in ${seconds.toFixed(1)}s (${throughputMBps.toFixed(1)} MB/s)`);
+      return { results, totalBytes, seconds, throughputMBps };
+    }
+  };
+}
+
+/**
+ * Upload several files concurrently (at most `concurrency` at once).
+ * Per-file failures are reported in the results instead of failing the batch.
+ */
+export async function uploadFiles(files: UploadFile[], options: UploadOptions = {}, s3: AWS.S3 = createS3Client()): Promise<UploadReport> {
+  const queue = createUploadQueue(options, s3);
+  files.forEach(file => queue.add(file));
+  return queue.finish();
+}
@@ -3,6 +3,8 @@ import fs from "fs-extra";
 import path from "path";
 import { execFile } from "child_process";
 import ffmpegPath from "ffmpeg-static";
+import { getMediaInfoBatch } from "./mediaIndex";
+import { loadSegmentBank, assembleFromBank, backgroundSeed, concatList } from "./segmentBank";
 
 // Helper function to get audio duration
 async function getAudioDuration(audioPath: string): Promise<number> {
@@ -95,13 +97,14 @@ export async function concatenateVideos(videoDir: string, outputPath: string) {
   });
 }
 
-// New function to extend video to match audio duration by concatenating multiple videos
-export async function extendVideoToMatchAudio(videoDir: string, audioPath: string, outputPath: string) {
-  console.log("[extendVideoToMatchAudio] Creating video sequence to match audio duration...");
-  
-  const audioDuration = await getAudioDuration(audioPath);
-  console.log(`[extendVideoToMatchAudio] Target audio duration: ${audioDuration}s`);
-  
+interface SelectedClip {
+  file: string;
+  duration: number;
+  trim: boolean;
+}
+
+// Pick random standardized clips until they cover the audio duration; the last one is trimmed to fit
+async function selectBackgroundClips(videoDir: string, audioDuration: number): Promise<{ selectedVideos: SelectedClip[]; currentDuration: number }> {
   // Use standardized videos directory instead of raw input videos
   const standardizedDir = path.join(path.dirname(videoDir), 'standardized_videos');
   
@@ -119,9 +122,9 @@ export async function extendVideoToMatchAudio(videoDir: string, audioPath: strin
     // Pick a random subfolder
     const randomIndex = Math.floor(Math.random() * subfolders.length);
     themedDir = subfolders[randomIndex];
-    console.log(`[extendVideoToMatchAudio] Picked themed subfolder: ${path.basename(themedDir)}`);
+    console.log(`[selectBackgroundClips] Picked themed subfolder: ${path.basename(themedDir)}`);
   } else {
-    console.log(`[extendVideoToMatchAudio] No subfolders found, using root standardized_videos directory.`);
+    console.log(`[selectBackgroundClips] No subfolders found, using root standardized_videos directory.`);
   }
   
   const allFiles = await fs.readdir(themedDir);
@@ -133,18 +136,16 @@ export async function extendVideoToMatchAudio(videoDir: string, audioPath: strin
     throw new Error(`No standardized videos found in ${themedDir}\nPlease run 'node standardize-videos.js' first.`);
   }
   
-  console.log(`[extendVideoToMatchAudio] Found ${videoFiles.length} standardized video files`);
+  console.log(`[selectBackgroundClips] Found ${videoFiles.length} standardized video files`);
   
   // Get duration of each video file
-  const videoDurations = [];
-  for (const videoFile of videoFiles) {
-    const duration = await getVideoDuration(videoFile);
-    videoDurations.push({ file: videoFile, duration });
-    console.log(`[extendVideoToMatchAudio] ${path.basename(videoFile)}: ${duration}s`);
-  }
+  // Durations come from the shared media index; only new or changed clips are probed
+  const mediaInfo = await getMediaInfoBatch(videoFiles);
+  const videoDurations = videoFiles.map((file, i) => ({ file, duration: mediaInfo[i].duration }));
+  console.log(`[selectBackgroundClips] Loaded durations for ${videoDurations.length} clips from media index`);
   
   // Calculate which videos to use and in what order
-  const selectedVideos = [];
+  const selectedVideos: SelectedClip[] = [];
   let currentDuration = 0;
   
   while (currentDuration < audioDuration) {
@@ -173,11 +174,68 @@ export async function extendVideoToMatchAudio(videoDir: string, audioPath: strin
     
     // Safety check to prevent infinite loops (increased limit since we're not tracking videoIndex anymore)
     if (selectedVideos.length > videoDurations.length * 20) {
-      console.warn("[extendVideoToMatchAudio] Safety break: too many iterations");
+      console.warn("[selectBackgroundClips] Safety break: too many iterations");
       break;
     }
   }
   
+  return { selectedVideos, currentDuration };
+}
+
+// Write a concat list of segment bank segments covering the duration exactly, or return null without a bank
+// (SEGMENT_BANK=0 turns the bank off)
+async function writeBankConcatList(duration: number, workDir: string): Promise<string | null> {
+  const bank = process.env.SEGMENT_BANK === '0' ? null : await loadSegmentBank();
+  if (!bank) {
+    return null;
+  }
+  const seed = backgroundSeed();
+  const assembly = await assembleFromBank(bank, duration, workDir, seed);
+  console.log(`[segmentBank] Theme '${assembly.theme || 'root'}': ${assembly.files.length} segments, ${assembly.duration}s (BACKGROUND_SEED=${seed})`);
+  const fileListPath = path.join(workDir, 'concat_list.txt');
+  await fs.writeFile(fileListPath, concatList(assembly.files), 'utf8');
+  return fileListPath;
+}
+
+function concatCopy(fileListPath: string, outputPath: string): Promise<void> {
+  return new Promise<void>((resolve, reject) => {
+    execFile(
+      ffmpegPath || "ffmpeg",
+      ["-y", "-f", "concat", "-safe", "0", "-i", fileListPath, "-c", "copy", outputPath],
+      (error, stdout, stderr) => {
+        if (error) {
+          console.error("ffmpeg concat error:", stderr || error.message);
+          reject(new Error(stderr || error.message));
+        } else {
+          resolve();
+        }
+      }
+    );
+  });
+}
+
+// New function to extend video to match audio duration by concatenating multiple videos
+export async function extendVideoToMatchAudio(videoDir: string, audioPath: string, outputPath: string) {
+  console.log("[extendVideoToMatchAudio] Creating video sequence to match audio duration...");
+  
+  const audioDuration = await getAudioDuration(audioPath);
+  console.log(`[extendVideoToMatchAudio] Target audio duration: ${audioDuration}s`);
+  
+  // With a segment bank (build-segment-bank.js) the sequence is concat only and exact to the frame
+  const bankDir = await fs.mkdtemp(path.join(path.dirname(outputPath), 'bank-'));
+  try {
+    const bankList = await writeBankConcatList(audioDuration, bankDir);
+    if (bankList) {
+      await concatCopy(bankList, outputPath);
+      console.log(`[extendVideoToMatchAudio] Video sequence assembled from the segment bank: ${outputPath}`);
+      return;
+    }
+  } finally {
+    await fs.remove(bankDir);
+  }
+  
+  const { selectedVideos, currentDuration } = await selectBackgroundClips(videoDir, audioDuration);
+  
   console.log(`[extendVideoToMatchAudio] Selected ${selectedVideos.length} video segments for total duration: ${currentDuration}s`);
   
   // Create a temporary directory for final processing
@@ -259,6 +317,62 @@ export async function extendVideoToMatchAudio(videoDir: string, audioPath: strin
   console.log(`[extendVideoToMatchAudio] Video sequence created successfully: ${outputPath}`);
 }
 
+// Streaming alternative to extendVideoToMatchAudio + overlayAudioOnVideo: one ffmpeg pass
+// concatenates the clips (the last one cut with an outpoint directive) and muxes the audio,
+// so neither trimmed segments nor extended_video.mp4 are written to disk
+export async function buildFinalVideo(videoDir: string, audioPath: string, outputPath: string) {
+  console.log("[buildFinalVideo] Building final video in a single pass...");
+  
+  const audioDuration = await getAudioDuration(audioPath);
+  const listDir = await fs.mkdtemp(path.join(path.dirname(outputPath), 'concat-'));
+  
+  try {
+    let fileListPath = await writeBankConcatList(audioDuration, listDir);
+    if (!fileListPath) {
+      const { selectedVideos } = await selectBackgroundClips(videoDir, audioDuration);
+      fileListPath = path.join(listDir, 'concat_list.txt');
+      const fileListContent = selectedVideos
+        .map(clip => `file '${clip.file.replace(/\\/g, "/")}'` + (clip.trim ? `\noutpoint ${clip.duration.toFixed(6)}` : ''))
+        .join('\n');
+      await fs.writeFile(fileListPath, fileListContent, 'utf8');
+    }
+    
+    console.log(`[buildFinalVideo] Muxing background video with audio (${audioDuration}s)...`);
+    
+    await new Promise<void>((resolve, reject) => {
+      execFile(
+        ffmpegPath || "ffmpeg",
+        [
+          "-y",
+          "-f", "concat",
+          "-safe", "0",
+          "-i", fileListPath,
+          "-i", audioPath,
+          "-map", "0:v:0",
+          "-map", "1:a:0",
+          "-c:v", "copy",
+          "-c:a", "aac",
+          "-t", audioDuration.toString(),
+          outputPath
+        ],
+        { maxBuffer: 16 * 1024 * 1024 },
+        (error, stdout, stderr) => {
+          if (error) {
+            console.error("ffmpeg concat error:", stderr || error.message);
+            reject(new Error(stderr || error.message));
+          } else {
+            resolve();
+          }
+        }
+      );
+    });
+  } finally {
+    await fs.remove(listDir);
+  }
+  
+  console.log(`[buildFinalVideo] Done. Output: ${outputPath}`);
+}
+
 export async function overlayAudioOnVideo(videoPath: string, audioPath: string, outputPath: string) {
   console.log("[overlayAudioOnVideo] Overlaying audio:", audioPath, "on video:", videoPath, "->", outputPath);
   
@@ -1,130 +1,281 @@
 const path = require('path');
+const os = require('os');
+const crypto = require('crypto');
 const fs = require('fs-extra');
 const ffmpeg = require('fluent-ffmpeg');
 const ffmpegPath = require('ffmpeg-static');
+const { getMediaInfo } = require('./dist/service/mediaIndex');
 
 // Set ffmpeg path
 ffmpeg.setFfmpegPath(ffmpegPath);
 
-// Helper function to get video duration
+// Usage: node standardize-videos.js [inputDir] [outputDir] [--jobs N] [--threads N]
+const MANIFEST_FILE = 'manifest.json';
+const MANIFEST_VERSION = 1;
+
+const OUTPUT_OPTIONS = [
+  '-c:v', 'libx264',      // Use H.264 codec
+  '-preset', 'medium',     // Encoding speed vs quality
+  '-crf', '23',           // Quality (lower = better quality)
+  '-r', '30',             // Frame rate
+  '-s', '720x1280',       // Resolution (9:16 aspect ratio)
+  '-an',                  // Remove audio (we'll add TTS audio later)
+  '-avoid_negative_ts', 'make_zero',
+  '-map_metadata', '-1',  // Drop source metadata so outputs only depend on the pixels
+  '-fflags', '+bitexact', // No encoder version or timestamps in the container
+  '-movflags', '+faststart' // Optimize for streaming
+];
+
+// Outputs encoded with different settings are re-encoded
+const SETTINGS_SIGNATURE = crypto.createHash('sha256').update(OUTPUT_OPTIONS.join(' ')).digest('hex').slice(0, 16);
+
+function parseArgs(argv) {
+  const options = {
+    inputDir: path.join(__dirname, 'input_video124'),
+    outputDir: null,
+    threads: parseInt(process.env.STANDARDIZE_THREADS || '2', 10),
+    jobs: process.env.STANDARDIZE_JOBS ? parseInt(process.env.STANDARDIZE_JOBS, 10) : null
+  };
+  const positional = [];
+  for (let i = 0; i < argv.length; i++) {
+    if (argv[i] === '--jobs') {
+      options.jobs = parseInt(argv[++i], 10);
+    } else if (argv[i] === '--threads') {
+      options.threads = parseInt(argv[++i], 10);
+    } else {
+      positional.push(argv[i]);
+    }
+  }
+  if (positional[0]) options.inputDir = path.resolve(positional[0]);
+  options.outputDir = positional[1] ? path.resolve(positional[1]) : path.join(options.inputDir, 'standardized_videos');
+  options.threads = Math.max(1, options.threads || 1);
+  // Default: enough encodes to cover every core at the per-encode thread cap
+  options.jobs = Math.max(1, options.jobs || Math.floor(os.cpus().length / options.threads));
+  return options;
+}
+
+// Helper function to get video duration (cached in the shared media index)
 async function getVideoDuration(videoPath) {
+  const info = await getMediaInfo(videoPath);
+  if (!info.duration) {
+    throw new Error('Could not determine video duration');
+  }
+  return info.duration;
+}
+
+async function hashFile(filePath) {
   return new Promise((resolve, reject) => {
-    ffmpeg.ffprobe(videoPath, (err, metadata) => {
-      if (err) return reject(err);
-      if (!metadata.format || typeof metadata.format.duration !== 'number') {
-        return reject(new Error('Could not determine video duration'));
-      }
-      resolve(metadata.format.duration);
+    const hash = crypto.createHash('sha256');
+    fs.createReadStream(filePath)
+      .on('data', (data) => hash.update(data))
+      .on('end', () => resolve(hash.digest('hex')))
+      .on('error', reject);
+  });
+}
+
+async function loadManifest(manifestPath) {
+  try {
+    const manifest = await fs.readJson(manifestPath);
+    if (manifest.version === MANIFEST_VERSION) {
+      return manifest;
+    }
+  } catch (error) {
+    // Missing or unreadable manifest: start fresh
+  }
+  return { version: MANIFEST_VERSION, sources: {}, outputs: {} };
+}
+
+async function saveManifest(manifestPath, manifest) {
+  const tempPath = `${manifestPath}.tmp`;
+  await fs.writeJson(tempPath, manifest, { spaces: 2 });
+  await fs.rename(tempPath, manifestPath);
+}
+
+/**
+ * Hash a source, reusing the manifest's hash while the file's size and mtime are unchanged.
+ */
+async function sourceHash(manifest, inputDir, inputFile) {
+  const inputPath = path.join(inputDir, inputFile);
+  const stats = await fs.stat(inputPath);
+  const mtimeMs = Math.floor(stats.mtimeMs);
+  const cached = manifest.sources[inputFile];
+  if (cached && cached.size === stats.size && cached.mtimeMs === mtimeMs) {
+    return cached.hash;
+  }
+  const hash = await hashFile(inputPath);
+  manifest.sources[inputFile] = { size: stats.size, mtimeMs, hash };
+  return hash;
+}
+
+/**
+ * Find an output written before the manifest existed (standardized_<n>_<name>.mp4).
+ */
+function findLegacyOutput(existingOutputs, inputFile) {
+  const name = path.parse(inputFile).name;
+  return existingOutputs.find(f => f.startsWith('standardized_') && f.replace(/^standardized_\d+_/, '') === `${name}.mp4`);
+}
+
+function encodeVideo(inputPath, outputPath, threads) {
+  // Encode to a temporary name so an interrupted run never leaves a truncated .mp4 behind
+  const partialPath = `${outputPath}.partial`;
+  return new Promise((resolve, reject) => {
+    ffmpeg(inputPath)
+      .outputOptions([...OUTPUT_OPTIONS, '-threads', String(threads)])
+      .format('mp4')
+      .output(partialPath)
+      .on('end', resolve)
+      .on('error', reject)
+      .run();
+  }).then(() => fs.rename(partialPath, outputPath))
+    .catch(async (error) => {
+      await fs.remove(partialPath);
+      throw error;
     });
+}
+
+/**
+ * Run tasks with at most `limit` in flight.
+ */
+async function runPool(tasks, limit, worker) {
+  let next = 0;
+  const runners = Array.from({ length: Math.min(limit, tasks.length) }, async () => {
+    while (next < tasks.length) {
+      const task = tasks[next++];
+      await worker(task);
+    }
   });
+  await Promise.all(runners);
 }
 
 async function standardizeVideos() {
-  const inputDir = path.join(__dirname, 'input_video124');
-  const outputDir = path.join(__dirname, 'input_video124', 'standardized_videos');
-  
+  const { inputDir, outputDir, jobs, threads } = parseArgs(process.argv.slice(2));
+  const manifestPath = path.join(outputDir, MANIFEST_FILE);
+
   console.log('🎬 Video Standardization Script');
   console.log('================================');
-  
+
   // Check if input directory exists
   if (!await fs.pathExists(inputDir)) {
     console.error(`❌ Input directory not found: ${inputDir}`);
     console.log('Please create the input_videos folder and add your video files.');
     process.exit(1);
   }
-  
+
   // Create output directory
   await fs.ensureDir(outputDir);
-  
-  // Get all video files
+
+  // Get all video files, sorted so runs are reproducible
   const allFiles = await fs.readdir(inputDir);
-  const videoFiles = allFiles.filter(f => f.match(/\.(mp4|mov|avi|mkv)$/i));
-  
+  const videoFiles = allFiles.filter(f => f.match(/\.(mp4|mov|avi|mkv)$/i)).sort();
+
   if (videoFiles.length === 0) {
     console.error('❌ No video files found in input_videos directory');
     console.log('Supported formats: .mp4, .mov, .avi, .mkv');
     process.exit(1);
   }
-  
-  console.log(`📁 Found ${videoFiles.length} video files to standardize:`);
-  videoFiles.forEach(file => console.log(`   - ${file}`));
+
+  console.log(`📁 Found ${videoFiles.length} video files in ${inputDir}`);
+  console.log(`⚙️  Running ${jobs} encodes at a time with ${threads} threads each`);
+  console.log('');
+
+  const manifest = await loadManifest(manifestPath);
+  const existingOutputs = (await fs.readdir(outputDir)).filter(f => f.endsWith('.mp4'));
+
+  // Work out which sources need encoding; identical content is encoded once
+  const pending = [];
+  const scheduled = new Set();
+  let skipped = 0;
+  for (const inputFile of videoFiles) {
+    const hash = await sourceHash(manifest, inputDir, inputFile);
+    const entry = manifest.outputs[hash];
+
+    if (entry && entry.settings === SETTINGS_SIGNATURE && await fs.pathExists(path.join(outputDir, entry.output))) {
+      if (entry.source !== inputFile) {
+        console.log(`⏭️  Unchanged (renamed from ${entry.source}): ${inputFile}`);
+        entry.source = inputFile;
+      }
+      skipped++;
+      continue;
+    }
+
+    const legacyOutput = !entry && findLegacyOutput(existingOutputs, inputFile);
+    if (legacyOutput) {
+      console.log(`⏭️  Already exists: ${legacyOutput}`);
+      manifest.outputs[hash] = { source: inputFile, output: legacyOutput, settings: SETTINGS_SIGNATURE };
+      skipped++;
+      continue;
+    }
+
+    if (scheduled.has(hash)) {
+      // Same content as a file already queued
+      skipped++;
+      continue;
+    }
+    scheduled.add(hash);
+    const output = `standardized_${hash.slice(0, 12)}_${path.parse(inputFile).name}.mp4`;
+    if (entry && entry.output !== output) {
+      // Encoded with old settings under another name; the new encode replaces it
+      await fs.remove(path.join(outputDir, entry.output));
+    }
+    pending.push({ inputFile, hash, output });
+  }
+
+  // Forget sources that are gone and remove outputs whose source was changed or deleted
+  for (const inputFile of Object.keys(manifest.sources)) {
+    if (!videoFiles.includes(inputFile)) delete manifest.sources[inputFile];
+  }
+  const currentHashes = new Set(Object.values(manifest.sources).map(s => s.hash));
+  for (const [hash, entry] of Object.entries(manifest.outputs)) {
+    if (!currentHashes.has(hash)) {
+      console.log(`🗑️  Removing stale output: ${entry.output}`);
+      await fs.remove(path.join(outputDir, entry.output));
+      delete manifest.outputs[hash];
+    }
+  }
+  await saveManifest(manifestPath, manifest);
+
+  console.log(`🔄 ${pending.length} to encode, ${skipped} unchanged`);
   console.log('');
-  
-  // Process each video file
-  for (let i = 0; i < videoFiles.length; i++) {
-    const inputFile = videoFiles[i];
+
+  const startTime = Date.now();
+  let completed = 0;
+  let failed = 0;
+  // Manifest writes are chained so concurrent completions never interleave
+  let manifestWrite = Promise.resolve();
+
+  await runPool(pending, jobs, async ({ inputFile, hash, output }) => {
     const inputPath = path.join(inputDir, inputFile);
-    const outputFile = `standardized_${i + 1}_${path.parse(inputFile).name}.mp4`;
-    const outputPath = path.join(outputDir, outputFile);
-    
-    console.log(`🔄 Processing ${i + 1}/${videoFiles.length}: ${inputFile}`);
-    
+    const outputPath = path.join(outputDir, output);
+    const encodeStart = Date.now();
+    console.log(`🎯 Standardizing ${inputFile} to 720x1280 (9:16), 30fps, H.264...`);
+
     try {
-      // Get original video info
-      const originalDuration = await getVideoDuration(inputPath);
-      console.log(`   Original duration: ${originalDuration.toFixed(2)}s`);
-      
-      // Check if already processed
-      if (await fs.pathExists(outputPath)) {
-        console.log(`   ⏭️  Already exists: ${outputFile}`);
-        continue;
-      }
-      
-      // Standardize the video
-      await new Promise((resolve, reject) => {
-        ffmpeg(inputPath)
-          .outputOptions([
-            '-c:v', 'libx264',      // Use H.264 codec
-            '-preset', 'medium',     // Encoding speed vs quality
-            '-crf', '23',           // Quality (lower = better quality)
-            '-r', '30',             // Frame rate
-            '-s', '720x1280',       // Resolution (9:16 aspect ratio)
-            '-an',                  // Remove audio (we'll add TTS audio later)
-            '-avoid_negative_ts', 'make_zero',
-            '-movflags', '+faststart' // Optimize for streaming
-          ])
-          .output(outputPath)
-          .on('start', (commandLine) => {
-            console.log(`   🎯 Standardizing to 720x1280 (9:16), 30fps, H.264...`);
-          })
-          .on('progress', (progress) => {
-            if (progress.percent) {
-              process.stdout.write(`\r   📊 Progress: ${Math.round(progress.percent)}%`);
-            }
-          })
-          .on('end', () => {
-            console.log('\n   ✅ Completed');
-            resolve();
-          })
-          .on('error', (err) => {
-            console.log('\n   ❌ Error:', err.message);
-            reject(err);
-          })
-          .run();
-      });
-      
+      await encodeVideo(inputPath, outputPath, threads);
+
       // Verify the output
       const finalDuration = await getVideoDuration(outputPath);
-      console.log(`   📏 Final duration: ${finalDuration.toFixed(2)}s`);
-      
       const stats = await fs.stat(outputPath);
       const sizeMB = (stats.size / (1024 * 1024)).toFixed(1);
-      console.log(`   💾 File size: ${sizeMB}MB`);
-      console.log('');
-      
+      completed++;
+      console.log(`   ✅ [${completed + failed}/${pending.length}] ${output}: ${finalDuration.toFixed(2)}s, ${sizeMB}MB in ${((Date.now() - encodeStart) / 1000).toFixed(1)}s`);
+
+      manifest.outputs[hash] = { source: inputFile, output, settings: SETTINGS_SIGNATURE };
+      manifestWrite = manifestWrite.then(() => saveManifest(manifestPath, manifest));
+      await manifestWrite;
     } catch (error) {
-      console.error(`   ❌ Failed to process ${inputFile}:`, error.message);
-      console.log('');
+      failed++;
+      console.error(`   ❌ [${completed + failed}/${pending.length}] Failed to process ${inputFile}:`, error.message);
     }
-  }
-  
+  });
+
+  const elapsedSeconds = (Date.now() - startTime) / 1000;
+
   // Summary
-  const finalFiles = await fs.readdir(outputDir);
-  const standardizedCount = finalFiles.filter(f => f.endsWith('.mp4')).length;
-  
+  console.log('');
   console.log('🎉 Standardization Complete!');
   console.log('============================');
-  console.log(`✅ Successfully standardized: ${standardizedCount}/${videoFiles.length} videos`);
+  console.log(`✅ Successfully standardized: ${completed + skipped}/${videoFiles.length} videos (${completed} encoded, ${skipped} unchanged, ${failed} failed)`);
+  console.log(`⏱️  Encoding time: ${elapsedSeconds.toFixed(1)}s`);
   console.log(`📁 Standardized videos saved to: ${outputDir}`);
   console.log('');
   console.log('📋 Standardization settings used:');
@@ -135,10 +286,14 @@ async function standardizeVideos() {
   console.log('   - Audio: Removed (TTS audio will be added later)');
   console.log('');
   console.log('🚀 You can now run generate.js for fast video processing!');
+
+  if (failed > 0) {
+    process.exitCode = 1;
+  }
 }
 
 // Run the standardization
 standardizeVideos().catch(error => {
   console.error('💥 Script failed:', error);
   process.exit(1);
-}); 
\ No newline at end of file
+});
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Streaming execution of the burn-subtitles, chunk and overlay stages.
+One ffmpeg process decodes final_video.mp4 and burns the subtitles, raw
+frames are piped through the caption overlay, and each chunk is piped
+straight into its delivery encoder. Nothing is written to disk except the
+final processed_videos/video_N.mp4 files (no subtitled copy, no chunk files,
+no temporary overlay files).
+
+    python3 streaming_pipeline.py            # run the streaming stages
+    python3 streaming_pipeline.py --compare  # measure disk writes of the file-based and streaming stages
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+from chunk_planner import plan_boundaries, MIN_CHUNK_DURATION, MAX_CHUNK_DURATION
+from delivery_profiles import DEFAULT_PROFILE, DEFAULT_RENDITIONS, get_profile, rendition_output_args
+from media_index import get_media_info
+from progress import ProgressReporter
+from resource_scheduler import core_allotment, ffmpeg_thread_args
+from video_overlay_opencv import (CAPTION_SECONDS, layout_caption, draw_caption, clean_processed_videos_directory,
+                                  part_event_writer)
+
+PROJECT_ROOT = Path(__file__).parent
+
+# Same subtitle style as burn_subtitles.py
+SUBTITLE_STYLE = "Alignment=10,MarginV=0,Fontsize=20,PrimaryColour=&Hffffff,OutlineColour=&H000000,Outline=2,Shadow=1"
+
+
+def disk_bytes_written():
+    """
+    Bytes sent to storage by this process and its finished children (Linux).
+
+    Based on getrusage block output counts (512-byte units), so writes to
+    tmpfs and pipes are not counted.
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_oublock
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_oublock
+    return (own + children) * 512
+
+
+def subtitle_filter(subtitle_path):
+    """ffmpeg subtitles filter that renders cues like burn_subtitles.py."""
+    escaped = str(subtitle_path).replace('\\', '\\\\').replace(':', '\\:').replace("'", "\\'")
+    return f"subtitles=filename='{escaped}':force_style='{SUBTITLE_STYLE}'"
+
+
+def _read_frame(stream, buffer):
+    """Fill buffer with one raw frame; return False at end of stream."""
+    view = memoryview(buffer)
+    filled = 0
+    while filled < len(buffer):
+        count = stream.readinto(view[filled:])
+        if not count:
+            return False
+        filled += count
+    return True
+
+
+class ChunkEncoder:
+    """
+    ffmpeg process that encodes raw frames from stdin plus a slice of the
+    source audio, into the deliverable and any extra renditions.
+    """
+
+    def __init__(self, output_file, source_video, start, duration, width, height, fps, profile, renditions=(),
+                 threads=None):
+        output_args, self.output_files = rendition_output_args(
+            output_file, profile, renditions, video='0:v:0', audio='1:a:0?',
+            output_args=ffmpeg_thread_args(threads) if threads else [])
+        ffmpeg_cmd = [
+            'ffmpeg', '-y',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+            '-s', f'{width}x{height}', '-r', f'{fps:.6f}',
+            '-i', 'pipe:0',
+            '-ss', f'{start:.6f}', '-t', f'{duration:.6f}',
+            '-i', str(source_video),
+            *output_args
+        ]
+        self.output_file = output_file
+        self._log = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(ffmpeg_cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._log)
+
+    def write(self, frame_bytes):
+        self.process.stdin.write(frame_bytes)
+
+    def close(self):
+        """Finish the encode; raise RuntimeError with ffmpeg's log if it failed."""
+        self.process.stdin.close()
+        returncode = self.process.wait()
+        if returncode != 0:
+            self._log.seek(0)
+            raise RuntimeError(f"Encoding {self.output_file} failed: {self._log.read().decode(errors='replace')[-2000:]}")
+        self._log.close()
+
+
+def run_streaming(video_path, subtitle_path, caption, output_dir, profile=DEFAULT_PROFILE, threads=None,
+                  min_duration=MIN_CHUNK_DURATION, max_duration=MAX_CHUNK_DURATION, renditions=None,
+                  on_part_done=None):
+    """
+    Burn subtitles, chunk and overlay in one pass without intermediate files.
+
+    Chunk boundaries are planned on whole seconds within the duration limits;
+    since every chunk is encoded from raw frames, a boundary does not need an
+    existing keyframe. Extra renditions (defaults to DELIVERY_RENDITIONS) are
+    encoded from the same piped frames. on_part_done(part, output_file) is
+    called as soon as each chunk's encode has finished.
+
+    Returns:
+        list: Output file paths
+    """
+    info = get_media_info(str(video_path))
+    width, height, fps = info['width'], info['height'], info['fps']
+    duration = info['duration']
+    total_frames = info['frameCount'] or int(round(duration * fps))
+
+    starts = plan_boundaries([float(t) for t in range(1, int(duration))], duration, min_duration, max_duration)
+    ends = starts[1:] + [duration]
+    # Frame index at which each chunk starts
+    boundaries = [int(round(start * fps)) for start in starts] + [total_frames]
+    print(f"Streaming {duration:.1f}s at {width}x{height}, {fps:.2f} fps into {len(starts)} chunks")
+
+    decoder_cmd = [
+        'ffmpeg', '-nostdin',
+        '-i', str(video_path),
+        '-vf', subtitle_filter(subtitle_path),
+        '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+        *(ffmpeg_thread_args(threads) if threads else []),
+        'pipe:1'
+    ]
+    decoder_log = tempfile.TemporaryFile()
+    decoder = subprocess.Popen(decoder_cmd, stdout=subprocess.PIPE, stderr=decoder_log)
+
+    delivery_profile = get_profile(profile)
+    renditions = DEFAULT_RENDITIONS if renditions is None else renditions
+    reporter = ProgressReporter('stream', total=total_frames)
+    frame_buffer = bytearray(width * height * 3)
+    frame = np.frombuffer(frame_buffer, dtype=np.uint8).reshape(height, width, 3)
+    overlay_frames = CAPTION_SECONDS * int(fps)
+
+    os.makedirs(output_dir, exist_ok=True)
+    output_files = []
+    frame_index = 0
+    encoder = None
+
+    def check_decoder():
+        """Raise RuntimeError with ffmpeg's log if the decoder failed."""
+        if decoder.wait() != 0:
+            decoder_log.seek(0)
+            raise RuntimeError(f"Decoding {video_path} failed: {decoder_log.read().decode(errors='replace')[-2000:]}")
+
+    try:
+        for chunk, (start, end) in enumerate(zip(starts, ends), 1):
+            output_file = os.path.join(output_dir, f"video_{chunk}.mp4")
+            encoder = ChunkEncoder(output_file, video_path, start, end - start, width, height, fps,
+                                   delivery_profile, renditions, threads)
+            layout = layout_caption(f"Part {chunk} | {caption}", width)
+
+            chunk_frame = 0
+            last_chunk = chunk == len(starts)
+            decoder_ended = False
+            while last_chunk or frame_index < boundaries[chunk]:
+                if not _read_frame(decoder.stdout, frame_buffer):
+                    decoder_ended = True
+                    break
+                if chunk_frame < overlay_frames:
+                    draw_caption(frame, layout)
+                encoder.write(frame_buffer)
+                chunk_frame += 1
+                frame_index += 1
+                reporter.update(frame_index, message=f"Part {chunk}/{len(starts)}: frame {chunk_frame}")
+
+            # A decoder that died mid-stream must not leave a truncated part to be published
+            if decoder_ended:
+                check_decoder()
+                if chunk_frame == 0:
+                    raise RuntimeError(f"Decoding {video_path} ended before part {chunk}")
+
+            encoder.close()
+            encoder = None
+            output_files.append(output_file)
+            print(f"Video {chunk} completed: {output_file} ({chunk_frame} frames, {end - start:.1f}s)")
+            if on_part_done:
+                on_part_done(chunk, output_file)
+    except Exception as e:
+        decoder.kill()
+        if encoder is not None:
+            encoder.process.kill()
+        reporter.finish(error=str(e))
+        raise
+    finally:
+        decoder.stdout.close()
+        decoder.wait()
+
+    reporter.finish()
+    return output_files
+
+
+def _run_measured(name, cmd):
+    """Run one stage as a child process and return its disk writes and wall time."""
+    before = resource.getrusage(resource.RUSAGE_CHILDREN).ru_oublock
+    start = time.time()
+    result = subprocess.run(cmd, cwd=str(PROJECT_ROOT), capture_output=True, text=True)
+    seconds = time.time() - start
+    written = (resource.getrusage(resource.RUSAGE_CHILDREN).ru_oublock - before) * 512
+    if result.returncode != 0:
+        raise RuntimeError(f"{name} failed: {result.stdout[-1000:]}{result.stderr[-1000:]}")
+    return {'stage': name, 'bytes_written': written, 'seconds': round(seconds, 1)}
+
+
+def compare():
+    """
+    Run the file-based stages and the streaming stages on the current
+    output/final_video.mp4 and report the bytes each writes to disk.
+    """
+    processed_dir = PROJECT_ROOT / 'processed_videos'
+    saved_dir = Path(tempfile.mkdtemp(prefix='reelgen-compare-'))
+
+    file_based = [
+        _run_measured('burn-subtitles', [sys.executable, 'burn_subtitles.py']),
+        _run_measured('chunk', ['node', 'chunk-video.js']),
+        _run_measured('overlay', [sys.executable, 'video_overlay_opencv.py'])
+    ]
+    # Keep the file-based outputs aside so both runs start from the same state
+    shutil.copytree(processed_dir, saved_dir / 'processed_videos', dirs_exist_ok=True)
+    streaming = [_run_measured('streaming', [sys.executable, 'streaming_pipeline.py'])]
+
+    report = {'file_based': file_based, 'streaming': streaming}
+    totals = {mode: sum(stage['bytes_written'] for stage in stages) for mode, stages in report.items()}
+
+    print("\n" + "=" * 60)
+    print("Disk writes per job after final_video.mp4")
+    print("=" * 60)
+    for mode, stages in report.items():
+        for stage in stages:
+            print(f"{mode:>12} {stage['stage']:>16} {stage['bytes_written'] / 1e6:>10.1f} MB {stage['seconds']:>8}s")
+        print(f"{mode:>12} {'total':>16} {totals[mode] / 1e6:>10.1f} MB")
+    if totals['file_based']:
+        print(f"Streaming writes {100 * totals['streaming'] / totals['file_based']:.0f}% of the file-based bytes")
+    print(f"File-based outputs kept in {saved_dir / 'processed_videos'}")
+    return {'stages': report, 'totals': totals}
+
+
+def main():
+    """Run the streaming stages from the command line."""
+    parser = argparse.ArgumentParser(description="Burn subtitles, chunk and overlay without intermediate files")
+    parser.add_argument('--video', default=str(PROJECT_ROOT / 'output' / 'final_video.mp4'), help="Input video")
+    parser.add_argument('--subtitles', default=str(PROJECT_ROOT / 'output' / 'final_video.vtt'), help="Subtitle file")
+    parser.add_argument('--output-dir', default='processed_videos', help="Directory for video_N.mp4")
+    parser.add_argument('--profile', default=DEFAULT_PROFILE, help="Delivery profile")
+    parser.add_argument('--events', default=os.environ.get('OVERLAY_EVENTS_FILE'),
+                        help="Append an NDJSON line to this file as each video is finished")
+    parser.add_argument('--compare', action='store_true',
+                        help="Measure disk writes of the file-based and streaming stages")
+    args = parser.parse_args()
+
+    if args.compare:
+        print(json.dumps(compare()['totals']))
+        return 0
+
+    for path in (args.video, args.subtitles):
+        if not os.path.exists(path):
+            print(f"File not found: {path}")
+            return 1
+
+    try:
+        with open("caption.txt", "r", encoding="utf-8") as f:
+            caption = f.readline().strip()
+    except OSError:
+        caption = "Default Caption"
+
+    clean_processed_videos_directory(args.output_dir)
+
+    written_before = disk_bytes_written()
+    start = time.time()
+    with core_allotment('stream') as cores:
+        output_files = run_streaming(args.video, args.subtitles, caption, args.output_dir,
+                                     profile=args.profile, threads=cores,
+                                     on_part_done=part_event_writer(args.events) if args.events else None)
+    written = disk_bytes_written() - written_before
+
+    output_bytes = sum(os.path.getsize(path) for path in output_files)
+    print(f"\n{len(output_files)} videos processed in {time.time() - start:.1f}s")
+    print(f"[io] bytes written to disk: {written}, of which final outputs: {output_bytes}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Batched transcription across several jobs.
+Stacks the mel spectrograms of 30-second windows from different inputs and
+runs the Whisper encoder and greedy decoder over them as one batch, then
+splits the results back into per-job transcripts and cues.
+"""
+
+import os
+import sys
+import time
+import queue
+import argparse
+import threading
+from concurrent.futures import Future
+
+try:
+    from .config import DEFAULT_MODEL, BATCH_MAX_WINDOWS, BATCH_WAIT_MS
+    from .simple_subtitle_generator import segments_to_cues
+    from .windowed_audio import SAMPLE_RATE, WINDOW_SECONDS, decode_to_pcm, open_pcm
+    from .model_cache import load_model
+except ImportError:
+    from config import DEFAULT_MODEL, BATCH_MAX_WINDOWS, BATCH_WAIT_MS
+    from simple_subtitle_generator import segments_to_cues
+    from windowed_audio import SAMPLE_RATE, WINDOW_SECONDS, decode_to_pcm, open_pcm
+    from model_cache import load_model
+
+# Seconds per Whisper timestamp token
+TIME_PRECISION = 0.02
+
+
+def _get_tokenizer(model, language=None):
+    """Build the tokenizer matching the model (handles older whisper releases)."""
+    from whisper.tokenizer import get_tokenizer
+
+    kwargs = {'language': language, 'task': 'transcribe'}
+    if hasattr(model, 'num_languages'):
+        kwargs['num_languages'] = model.num_languages
+    return get_tokenizer(model.is_multilingual, **kwargs)
+
+
+def tokens_to_segments(tokens, tokenizer, window_duration):
+    """
+    Turn decoded tokens with timestamp tokens into segments.
+
+    Args:
+        tokens (list): Token ids from a DecodingResult
+        tokenizer: Whisper tokenizer used for decoding
+        window_duration (float): Length of the audio in the window, in seconds
+
+    Returns:
+        list: Segments with 'start', 'end' and 'text', relative to the window
+    """
+    segments = []
+    start = None
+    text_tokens = []
+
+    for token in tokens:
+        if token >= tokenizer.timestamp_begin:
+            timestamp = (token - tokenizer.timestamp_begin) * TIME_PRECISION
+            if start is None:
+                start = timestamp
+            elif text_tokens:
+                segments.append({'start': start, 'end': timestamp, 'text': tokenizer.decode(text_tokens)})
+                text_tokens = []
+                start = None
+            else:
+                start = timestamp
+        elif token < tokenizer.eot:
+            text_tokens.append(token)
+
+    # Text without a closing timestamp runs to the end of the window
+    if text_tokens:
+        segments.append({
+            'start': start if start is not None else 0.0,
+            'end': window_duration,
+            'text': tokenizer.decode(text_tokens)
+        })
+
+    for segment in segments:
+        segment['start'] = min(segment['start'], window_duration)
+        segment['end'] = min(max(segment['end'], segment['start']), window_duration)
+
+    return [segment for segment in segments if segment['text'].strip()]
+
+
+def decode_windows(model, windows, language=None):
+    """
+    Run one batched encoder + greedy decoder pass over several audio windows.
+
+    Args:
+        model: Loaded Whisper model
+        windows (list): float32 sample arrays of at most 30 seconds each
+        language (str): Spoken language, or None to detect it per window
+
+    Returns:
+        list: Segments for each window, relative to the window start
+    """
+    import torch
+    import whisper
+
+    # large-v3 uses 128 mel bins; older whisper releases only know 80
+    n_mels = getattr(model.dims, 'n_mels', 80)
+    mels = []
+    for window in windows:
+        padded = whisper.pad_or_trim(window)
+        mels.append(whisper.log_mel_spectrogram(padded, n_mels) if n_mels != 80 else whisper.log_mel_spectrogram(padded))
+    mel_batch = torch.stack(mels).to(model.device)
+
+    options = whisper.DecodingOptions(
+        language=language,
+        task='transcribe',
+        temperature=0.0,
+        without_timestamps=False,
+        fp16=model.device.type != 'cpu'
+    )
+    results = whisper.decode(model, mel_batch, options)
+
+    window_segments = []
+    for window, result in zip(windows, results):
+        tokenizer = _get_tokenizer(model, result.language or language)
+        window_segments.append(tokens_to_segments(result.tokens, tokenizer, len(window) / SAMPLE_RATE))
+    return window_segments
+
+
+def transcribe_batch(model, media_paths, language=None, max_windows=BATCH_MAX_WINDOWS, temp_dir=None,
+                     return_exceptions=False):
+    """
+    Transcribe several inputs, batching their 30-second windows together.
+
+    Windows are stacked across jobs, so three short jobs of one window each
+    are decoded in a single pass. Unlike model.transcribe, windows are not
+    conditioned on the previous window's text.
+
+    Each input is decoded and opened on its own, so with return_exceptions
+    an input that cannot be read (or a pass that fails) only fails the jobs
+    it belongs to; the windows of the other jobs are still batched.
+
+    Args:
+        model: Loaded Whisper model
+        media_paths (list): Audio or video files, one per job
+        language (str): Spoken language, or None to detect it per window
+        max_windows (int): Maximum windows per encoder/decoder pass
+        temp_dir (str): Directory for the decoded PCM files
+        return_exceptions (bool): Return the exception in place of a failed input's result
+            instead of raising it
+
+    Returns:
+        list: One result per input with 'text', 'segments' and 'cues'
+    """
+    pcm_paths = []
+    samples = [None] * len(media_paths)
+    errors = [None] * len(media_paths)
+    try:
+        for job, media_path in enumerate(media_paths):
+            try:
+                pcm_path = decode_to_pcm(media_path, temp_dir=temp_dir)
+                pcm_paths.append(pcm_path)
+                samples[job] = open_pcm(pcm_path)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                print(f"Could not read {media_path}: {e}")
+                errors[job] = e
+
+        # (job index, window start in samples) for every window of every job that was read
+        window_size = WINDOW_SECONDS * SAMPLE_RATE
+        work = [(job, start) for job, job_samples in enumerate(samples) if job_samples is not None
+                for start in range(0, len(job_samples), window_size)]
+
+        job_segments = [[] for _ in media_paths]
+        for batch_start in range(0, len(work), max_windows):
+            # Jobs that failed in an earlier pass are not decoded further
+            batch = [(job, start) for job, start in work[batch_start:batch_start + max_windows] if errors[job] is None]
+            if not batch:
+                continue
+            windows = [samples[job][start:start + window_size].astype('float32') / 32768.0
+                       for job, start in batch]
+
+            print(f"Decoding batch of {len(batch)} windows from {len({job for job, _ in batch})} jobs")
+            try:
+                batch_segments = decode_windows(model, windows, language)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                for job, _ in batch:
+                    errors[job] = e
+                continue
+            for (job, start), segments in zip(batch, batch_segments):
+                offset = start / SAMPLE_RATE
+                for segment in segments:
+                    job_segments[job].append({
+                        'start': segment['start'] + offset,
+                        'end': segment['end'] + offset,
+                        'text': segment['text']
+                    })
+    finally:
+        del samples
+        for pcm_path in pcm_paths:
+            try:
+                os.remove(pcm_path)
+            except OSError:
+                pass
+
+    results = []
+    for segments, error in zip(job_segments, errors):
+        if error is not None:
+            results.append(error)
+            continue
+        for i, segment in enumerate(segments):
+            segment['id'] = i
+        results.append({
+            'text': ' '.join(segment['text'].strip() for segment in segments),
+            'segments': segments,
+            'cues': segments_to_cues(segments)
+        })
+    return results
+
+
+class BatchTranscriptionWorker:
+    """
+    Background worker that groups queued jobs into shared batches.
+
+    Jobs submitted within batch_wait_ms of each other are transcribed
+    together, trading a few milliseconds of latency for throughput.
+    """
+
+    def __init__(self, model_type=DEFAULT_MODEL, model=None, language=None,
+                 max_windows=BATCH_MAX_WINDOWS, batch_wait_ms=BATCH_WAIT_MS):
+        """
+        Args:
+            model_type (str): Whisper model type, used when no model is passed
+            model: Already loaded Whisper model (optional)
+            language (str): Spoken language, or None to detect it per window
+            max_windows (int): Maximum windows per encoder/decoder pass
+            batch_wait_ms (int): How long to wait for more jobs before running a batch
+        """
+        if model is None:
+            print(f"Loading Whisper model: {model_type}")
+            model = load_model(model_type)
+
+        self.model = model
+        self.language = language
+        self.max_windows = max_windows
+        self.batch_wait = batch_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, media_path):
+        """
+        Queue a file for transcription.
+
+        Returns:
+            Future: Resolves to a result with 'text', 'segments' and 'cues'
+        """
+        future = Future()
+        self._queue.put((media_path, future))
+        return future
+
+    def close(self):
+        """Finish queued jobs and stop the worker thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _gather(self, first):
+        """Collect jobs arriving within the batch window after the first one."""
+        # Each job contributes at least one window, so cap jobs at the window limit
+        jobs = [first]
+        deadline = time.monotonic() + self.batch_wait
+        while len(jobs) < self.max_windows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job is None:
+                # Put the stop signal back so the run loop sees it after this batch
+                self._queue.put(None)
+                break
+            jobs.append(job)
+        return jobs
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            jobs = self._gather(first)
+            jobs = [(path, future) for path, future in jobs if future.set_running_or_notify_cancel()]
+            if not jobs:
+                continue
+
+            try:
+                # A job whose input cannot be read fails on its own, not the whole batch
+                results = transcribe_batch(
+                    self.model,
+                    [path for path, _ in jobs],
+                    language=self.language,
+                    max_windows=self.max_windows,
+                    return_exceptions=True
+                )
+                for (_, future), result in zip(jobs, results):
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+            except Exception as e:
+                for _, future in jobs:
+                    future.set_exception(e)
+
+
+def main():
+    """Transcribe several files in shared batches from the command line."""
+    parser = argparse.ArgumentParser(description="Transcribe several files with batched Whisper passes")
+    parser.add_argument('media', nargs='+', help="Audio or video files")
+    parser.add_argument('--model', default=DEFAULT_MODEL, help="Whisper model type")
+    parser.add_argument('--language', default=None, help="Spoken language (detected when omitted)")
+    parser.add_argument('--max-windows', type=int, default=BATCH_MAX_WINDOWS,
+                        help="Maximum windows per encoder/decoder pass")
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+
+    start = time.time()
+    results = transcribe_batch(model, args.media, language=args.language, max_windows=args.max_windows)
+    elapsed = time.time() - start
+
+    for media_path, result in zip(args.media, results):
+        print(f"\n{media_path}: {len(result['cues'])} cues")
+        print(result['text'])
+    print(f"\nTranscribed {len(args.media)} files in {elapsed:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Peak memory benchmark for the full-track and windowed audio loaders.
+Transcribes synthetic inputs of increasing length in fresh processes and
+reports the peak RSS of each run, which should stay flat for the windowed
+loader as the input grows.
+"""
+
+import os
+import sys
+import json
+import argparse
+import resource
+import subprocess
+import tempfile
+import time
+
+# Input lengths in seconds
+DEFAULT_DURATIONS = [60, 300, 900]
+
+
+def make_test_audio(path, duration):
+    """Write a synthetic tone of the given duration to path."""
+    ffmpeg_cmd = [
+        'ffmpeg', '-nostdin', '-y',
+        '-f', 'lavfi',
+        '-i', f'sine=frequency=440:sample_rate=44100:duration={duration}',
+        '-c:a', 'aac', '-b:a', '64k',
+        path
+    ]
+    subprocess.run(ffmpeg_cmd, capture_output=True, check=True)
+
+
+def run_single(loader, media_path, model_type):
+    """Transcribe one file in this process and print peak RSS as JSON."""
+    import whisper
+    from windowed_audio import transcribe_windowed
+
+    model = whisper.load_model(model_type)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.time()
+    if loader == 'windowed':
+        transcribe_windowed(model, media_path, fp16=False)
+    else:
+        model.transcribe(media_path, fp16=False)
+    elapsed = time.time() - start
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        'loader': loader,
+        'peak_rss_mb': round(peak_kb / 1024, 1),
+        'model_rss_mb': round(baseline_kb / 1024, 1),
+        'seconds': round(elapsed, 1)
+    }))
+
+
+def run_benchmark(durations, model_type):
+    """Run both loaders against each duration and print a table."""
+    rows = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for duration in durations:
+            media_path = os.path.join(temp_dir, f'tone_{duration}s.m4a')
+            print(f"Creating {duration}s test input...")
+            make_test_audio(media_path, duration)
+
+            for loader in ('full', 'windowed'):
+                print(f"  {loader} loader...")
+                # Fresh interpreter per run so peak RSS is not shared between runs
+                result = subprocess.run(
+                    [sys.executable, __file__, '--single', loader, media_path, '--model', model_type],
+                    capture_output=True, text=True, check=True
+                )
+                stats = json.loads(result.stdout.strip().splitlines()[-1])
+                stats['duration'] = duration
+                rows.append(stats)
+
+    print("\n" + "=" * 60)
+    print(f"Peak RSS by input length (model: {model_type})")
+    print("=" * 60)
+    print(f"{'input':>8} {'loader':>10} {'model MB':>10} {'peak MB':>10} {'time s':>8}")
+    for row in rows:
+        print(f"{row['duration']:>7}s {row['loader']:>10} {row['model_rss_mb']:>10} "
+              f"{row['peak_rss_mb']:>10} {row['seconds']:>8}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare peak RSS of the full and windowed audio loaders")
+    parser.add_argument('--durations', type=int, nargs='+', default=DEFAULT_DURATIONS,
+                        help="Input lengths in seconds")
+    parser.add_argument('--model', default='tiny', help="Whisper model type")
+    parser.add_argument('--single', nargs=2, metavar=('LOADER', 'MEDIA'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        run_single(args.single[0], args.single[1], args.model)
+    else:
+        run_benchmark(args.durations, args.model)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
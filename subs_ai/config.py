@@ -47,4 +47,8 @@ SUBTITLE_FORMATS = ['srt', 'vtt', 'ass', 'ssa', 'sub', 'json', 'txt']
 OUTPUT_DIR = 'output'
 
 # Video file name
-VIDEO_FILE = 'final_video.mp4' 
\ No newline at end of file
+VIDEO_FILE = 'final_video.mp4' 
+
+# Batched transcription (batch_transcriber.py)
+BATCH_MAX_WINDOWS = 8  # 30-second windows stacked into one encoder/decoder pass
+BATCH_WAIT_MS = 50  # How long the worker waits for more jobs before running a batch
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped Whisper model cache for fast cold starts.
+Converts each checkpoint once into a float32 file that torch can map
+directly, so later loads skip deserialization, page weights in lazily, and
+share the page cache between processes.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+try:
+    from .config import WHISPER_MODELS, DEFAULT_MODEL
+except ImportError:
+    from config import WHISPER_MODELS, DEFAULT_MODEL
+
+# Converted checkpoints live here
+CACHE_DIR = os.environ.get(
+    'REELGEN_MODEL_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'reelgen', 'whisper')
+)
+
+
+def cache_path(model_type):
+    """Return the path of the converted checkpoint for a model type."""
+    return os.path.join(CACHE_DIR, f'{model_type}.mmap.pt')
+
+
+def convert_checkpoint(model_type):
+    """
+    Convert an official Whisper checkpoint into the memory-mappable layout.
+
+    Weights are stored as float32 (the dtype Whisper runs with), so a loaded
+    model can use the mapped tensors as-is without copying them.
+
+    Args:
+        model_type (str): Whisper model type ('tiny', 'base', ...)
+
+    Returns:
+        str: Path to the converted checkpoint
+    """
+    import torch
+    import whisper
+
+    if model_type not in whisper._MODELS:
+        raise ValueError(f"Unknown Whisper model: {model_type}")
+
+    download_root = os.path.join(os.path.expanduser('~'), '.cache', 'whisper')
+    source_path = whisper._download(whisper._MODELS[model_type], download_root, False)
+
+    # Diagnostics go to stderr: stdout may be an NDJSON stream (generate_subtitles_only.py --ndjson)
+    print(f"Converting {model_type} checkpoint for memory-mapped loading...", file=sys.stderr)
+    checkpoint = torch.load(source_path, map_location='cpu')
+    state_dict = {
+        name: tensor.to(torch.float32).contiguous() if tensor.is_floating_point() else tensor.contiguous()
+        for name, tensor in checkpoint['model_state_dict'].items()
+    }
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    target_path = cache_path(model_type)
+    temp_path = f"{target_path}.partial"
+    torch.save({'dims': checkpoint['dims'], 'model_state_dict': state_dict}, temp_path)
+    os.replace(temp_path, target_path)
+
+    print(f"Converted checkpoint saved to: {target_path}", file=sys.stderr)
+    return target_path
+
+
+def load_cached_model(model_type):
+    """
+    Load a Whisper model from the memory-mapped cache, converting it on first use.
+
+    The model is built on the meta device and its parameters are pointed at
+    the mapped tensors, so no weight memory is allocated up front. CPU only.
+
+    Args:
+        model_type (str): Whisper model type
+
+    Returns:
+        whisper.model.Whisper: Model whose weights are backed by the cache file
+    """
+    import torch
+    import whisper
+    from whisper.model import ModelDimensions, Whisper
+
+    path = cache_path(model_type)
+    if not os.path.exists(path):
+        convert_checkpoint(model_type)
+
+    checkpoint = torch.load(path, map_location='cpu', mmap=True, weights_only=True)
+    dims = ModelDimensions(**checkpoint['dims'])
+
+    with torch.device('meta'):
+        model = Whisper(dims)
+    model.load_state_dict(checkpoint['model_state_dict'], assign=True)
+
+    # Non-persistent buffers are not in the checkpoint; rebuild them on the CPU
+    model.decoder.register_buffer(
+        'mask', torch.empty(dims.n_text_ctx, dims.n_text_ctx).fill_(-float('inf')).triu_(1), persistent=False
+    )
+    if model_type in whisper._ALIGNMENT_HEADS:
+        model.set_alignment_heads(whisper._ALIGNMENT_HEADS[model_type])
+
+    leftover = [name for name, buffer in model.named_buffers() if buffer.is_meta]
+    if leftover:
+        raise RuntimeError(f"Buffers not restored from cache: {', '.join(leftover)}")
+
+    model.is_memory_mapped = True
+    return model.eval()
+
+
+def load_model(model_type=DEFAULT_MODEL, device=None):
+    """
+    Load a Whisper model, preferring the memory-mapped cache on CPU.
+
+    Falls back to whisper.load_model on GPUs, on torch releases without
+    mmap support, and if the cache cannot be used for any other reason.
+
+    Args:
+        model_type (str): Whisper model type
+        device (str): Torch device (defaults to CUDA when available)
+
+    Returns:
+        whisper.model.Whisper: Loaded model
+    """
+    import torch
+    import whisper
+
+    if device is None:
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+
+    if device == 'cpu' and os.environ.get('REELGEN_MODEL_CACHE_DISABLE') != '1':
+        try:
+            return load_cached_model(model_type)
+        except Exception as e:
+            print(f"Memory-mapped model cache unavailable ({e}); using whisper.load_model", file=sys.stderr)
+
+    return whisper.load_model(model_type, device=device)
+
+
+def _time_single_load(loader, model_type):
+    """Load one model in this process and print the elapsed time as JSON."""
+    import torch
+    import whisper
+
+    start = time.time()
+    if loader == 'cached':
+        model = load_cached_model(model_type)
+    else:
+        model = whisper.load_model(model_type, device='cpu')
+    load_seconds = time.time() - start
+
+    # First forward pass pages in the weights the encoder touches
+    start = time.time()
+    with torch.inference_mode():
+        mel = torch.zeros(1, model.dims.n_mels, 3000)
+        model.embed_audio(mel)
+    first_pass_seconds = time.time() - start
+
+    print(json.dumps({'load': round(load_seconds, 3), 'first_pass': round(first_pass_seconds, 3)}))
+
+
+def benchmark(model_types, runs=3):
+    """
+    Compare cold-start time of whisper.load_model with the mmap cache.
+
+    Each load runs in a fresh interpreter. The OS page cache is not dropped,
+    so after the first run both loaders read from warm page cache; what is
+    measured is deserialization and allocation, which is what a worker
+    restart pays.
+    """
+    rows = []
+    for model_type in model_types:
+        if not os.path.exists(cache_path(model_type)):
+            convert_checkpoint(model_type)
+
+        for loader in ('whisper', 'cached'):
+            timings = []
+            for _ in range(runs):
+                result = subprocess.run(
+                    [sys.executable, __file__, '_single', loader, model_type],
+                    capture_output=True, text=True, check=True
+                )
+                timings.append(json.loads(result.stdout.strip().splitlines()[-1]))
+            best = min(timings, key=lambda t: t['load'])
+            rows.append((model_type, loader, best['load'], best['first_pass']))
+
+    print("\n" + "=" * 60)
+    print(f"Cold-start time per model tier (best of {runs} fresh processes)")
+    print("=" * 60)
+    print(f"{'model':>8} {'size':>10} {'loader':>10} {'load s':>8} {'1st pass s':>11}")
+    for model_type, loader, load_seconds, first_pass in rows:
+        size = WHISPER_MODELS.get(model_type, {}).get('size', '')
+        print(f"{model_type:>8} {size:>10} {loader:>10} {load_seconds:>8} {first_pass:>11}")
+    return rows
+
+
+def main():
+    """Convert checkpoints or benchmark cold starts from the command line."""
+    if len(sys.argv) == 4 and sys.argv[1] == '_single':
+        _time_single_load(sys.argv[2], sys.argv[3])
+        return 0
+
+    parser = argparse.ArgumentParser(description="Memory-mapped Whisper model cache")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser = subparsers.add_parser('convert', help="Convert checkpoints ahead of time")
+    convert_parser.add_argument('models', nargs='+', help="Whisper model types")
+
+    bench_parser = subparsers.add_parser('benchmark', help="Compare cold-start time with whisper.load_model")
+    bench_parser.add_argument('models', nargs='+', help="Whisper model types")
+    bench_parser.add_argument('--runs', type=int, default=3, help="Fresh processes per loader")
+
+    args = parser.parse_args()
+    if args.command == 'convert':
+        for model_type in args.models:
+            convert_checkpoint(model_type)
+    else:
+        benchmark(args.models, runs=args.runs)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
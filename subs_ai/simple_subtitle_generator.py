@@ -7,8 +7,22 @@ Generates subtitles for final_video.mp4 in the output directory.
 import os
 import sys
 import json
+from contextlib import nullcontext
 from pathlib import Path
 
+try:
+    from .model_cache import load_model
+except ImportError:
+    from model_cache import load_model
+
+try:
+    # Available when run from the project root (generate_subtitles_only.py)
+    from resource_scheduler import core_allotment
+    from job_journal import JobJournal
+except ImportError:
+    core_allotment = None
+    JobJournal = None
+
 def install_whisper():
     """Install openai-whisper if not already installed."""
     try:
@@ -54,7 +68,130 @@ def split_text_into_chunks(text, max_words=4):
     
     return chunks
 
-def generate_subtitles(video_path, output_dir=None, model_type='base', subtitle_format='srt'):
+def segments_to_cues(segments, max_words=4, offset=0.0):
+    """
+    Break Whisper segments into word-limited subtitle cues.
+    
+    Args:
+        segments (list): Whisper segments with 'start', 'end' and 'text'
+        max_words (int): Maximum words per cue
+        offset (float): Seconds added to every cue (for chunked audio)
+    
+    Returns:
+        list: Cues as dicts with 'start', 'end' and 'text'
+    """
+    cues = []
+    for segment in segments:
+        text = segment['text'].strip()
+        text_chunks = split_text_into_chunks(text, max_words=max_words)
+        
+        if text_chunks:
+            # Calculate time per chunk
+            segment_duration = segment['end'] - segment['start']
+            time_per_chunk = segment_duration / len(text_chunks)
+            
+            for i, chunk in enumerate(text_chunks):
+                cues.append({
+                    'start': offset + segment['start'] + (i * time_per_chunk),
+                    'end': offset + segment['start'] + ((i + 1) * time_per_chunk),
+                    'text': chunk
+                })
+    
+    return cues
+
+def write_subtitle_file(result, subtitle_path, subtitle_format):
+    """
+    Write a Whisper result to disk in the requested subtitle format.
+    
+    Args:
+        result (dict): Whisper result with 'text' and 'segments'
+        subtitle_path (str): Destination file path
+        subtitle_format (str): Output format ('srt', 'vtt', 'json', 'txt')
+    """
+    if subtitle_format.lower() == 'srt':
+        # Generate SRT format with 4-word line limit
+        with open(subtitle_path, 'w', encoding='utf-8') as f:
+            for subtitle_index, cue in enumerate(segments_to_cues(result['segments']), 1):
+                f.write(f"{subtitle_index}\n")
+                f.write(f"{format_timestamp(cue['start'])} --> {format_timestamp(cue['end'])}\n")
+                f.write(f"{cue['text']}\n\n")
+    
+    elif subtitle_format.lower() == 'vtt':
+        # Generate VTT format with 4-word line limit
+        with open(subtitle_path, 'w', encoding='utf-8') as f:
+            f.write("WEBVTT\n\n")
+            for cue in segments_to_cues(result['segments']):
+                f.write(f"{format_timestamp_vtt(cue['start'])} --> {format_timestamp_vtt(cue['end'])}\n")
+                f.write(f"{cue['text']}\n\n")
+    
+    elif subtitle_format.lower() == 'json':
+        # Save raw JSON
+        with open(subtitle_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+    
+    elif subtitle_format.lower() == 'txt':
+        # Save plain text
+        with open(subtitle_path, 'w', encoding='utf-8') as f:
+            f.write(result['text'])
+    
+    else:
+        raise ValueError(f"Unsupported subtitle format: {subtitle_format}")
+
+def window_checkpoint(video_path, model_type):
+    """
+    Journal checkpoint for the transcription windows of a video, so an
+    interrupted job resumes at the first window it had not finished.
+    
+    Returns:
+        job_journal.UnitCheckpoint, or None outside the project root
+    """
+    try:
+        from .windowed_audio import WINDOW_SECONDS
+    except ImportError:
+        from windowed_audio import WINDOW_SECONDS
+    
+    if JobJournal is None:
+        return None
+    return JobJournal().checkpoint('transcribe', inputs=[os.path.abspath(video_path)],
+                                   params={'model': model_type, 'windowSeconds': WINDOW_SECONDS})
+
+def iter_cues(video_path, model_type='base', model=None, max_words=4):
+    """
+    Transcribe a video and yield subtitle cues as they are decoded.
+    
+    The audio is transcribed in 30-second windows, and the cues of each
+    window are yielded as soon as that window has been decoded, so callers
+    can start on the first cues before the whole video is done.
+    
+    Args:
+        video_path (str): Path to the video file
+        model_type (str): Whisper model type, used when no model is passed
+        model: Already loaded Whisper model (optional)
+        max_words (int): Maximum words per cue
+    
+    Yields:
+        dict: Cue with 'index', 'start', 'end' and 'text'
+    """
+    try:
+        from .windowed_audio import iter_window_segments
+    except ImportError:
+        from windowed_audio import iter_window_segments
+    
+    if not os.path.exists(video_path):
+        raise FileNotFoundError(f"Video file not found: {video_path}")
+    
+    if model is None:
+        model = load_model(model_type)
+    
+    index = 1
+    checkpoint = window_checkpoint(video_path, model_type)
+    for _, segments, _ in iter_window_segments(model, video_path, checkpoint=checkpoint):
+        for cue in segments_to_cues(segments, max_words=max_words):
+            cue['index'] = index
+            index += 1
+            yield cue
+
+def generate_subtitles(video_path, output_dir=None, model_type='base', subtitle_format='srt', windowed=False):
     """
     Generate subtitles for a video file using openai-whisper.
     
@@ -63,6 +200,8 @@ def generate_subtitles(video_path, output_dir=None, model_type='base', subtitle_
         output_dir (str): Directory to save subtitles (defaults to same as video)
         model_type (str): Whisper model type ('tiny', 'base', 'small', 'medium', 'large')
         subtitle_format (str): Output format ('srt', 'vtt', 'json', 'txt')
+        windowed (bool): Feed the model 30-second windows from a memory-mapped
+            PCM file instead of decoding the whole track into memory
     
     Returns:
         str: Path to the generated subtitle file
@@ -81,11 +220,19 @@ def generate_subtitles(video_path, output_dir=None, model_type='base', subtitle_
         
         # Load the model
         print("Loading model...")
-        model = whisper.load_model(model_type)
+        model = load_model(model_type)
         
         # Transcribe the video
         print("Transcribing audio... This may take a while depending on video length.")
-        result = model.transcribe(video_path)
+        if windowed:
+            try:
+                from .windowed_audio import transcribe_windowed
+            except ImportError:
+                from windowed_audio import transcribe_windowed
+            print("Using memory-mapped 30-second windows")
+            result = transcribe_windowed(model, video_path, checkpoint=window_checkpoint(video_path, model_type))
+        else:
+            result = model.transcribe(video_path)
         
         # Determine output path
         video_name = Path(video_path).stem
@@ -98,66 +245,7 @@ def generate_subtitles(video_path, output_dir=None, model_type='base', subtitle_
         # Save subtitles
         print(f"Saving subtitles to: {subtitle_path}")
         
-        if subtitle_format.lower() == 'srt':
-            # Generate SRT format with 4-word line limit
-            with open(subtitle_path, 'w', encoding='utf-8') as f:
-                subtitle_index = 1
-                for segment in result['segments']:
-                    text = segment['text'].strip()
-                    text_chunks = split_text_into_chunks(text, max_words=4)
-                    
-                    if text_chunks:
-                        # Calculate time per chunk
-                        segment_duration = segment['end'] - segment['start']
-                        time_per_chunk = segment_duration / len(text_chunks)
-                        
-                        for i, chunk in enumerate(text_chunks):
-                            start_time = segment['start'] + (i * time_per_chunk)
-                            end_time = segment['start'] + ((i + 1) * time_per_chunk)
-                            
-                            start_time_formatted = format_timestamp(start_time)
-                            end_time_formatted = format_timestamp(end_time)
-                            
-                            f.write(f"{subtitle_index}\n")
-                            f.write(f"{start_time_formatted} --> {end_time_formatted}\n")
-                            f.write(f"{chunk}\n\n")
-                            subtitle_index += 1
-        
-        elif subtitle_format.lower() == 'vtt':
-            # Generate VTT format with 4-word line limit
-            with open(subtitle_path, 'w', encoding='utf-8') as f:
-                f.write("WEBVTT\n\n")
-                for segment in result['segments']:
-                    text = segment['text'].strip()
-                    text_chunks = split_text_into_chunks(text, max_words=4)
-                    
-                    if text_chunks:
-                        # Calculate time per chunk
-                        segment_duration = segment['end'] - segment['start']
-                        time_per_chunk = segment_duration / len(text_chunks)
-                        
-                        for i, chunk in enumerate(text_chunks):
-                            start_time = segment['start'] + (i * time_per_chunk)
-                            end_time = segment['start'] + ((i + 1) * time_per_chunk)
-                            
-                            start_time_formatted = format_timestamp_vtt(start_time)
-                            end_time_formatted = format_timestamp_vtt(end_time)
-                            
-                            f.write(f"{start_time_formatted} --> {end_time_formatted}\n")
-                            f.write(f"{chunk}\n\n")
-        
-        elif subtitle_format.lower() == 'json':
-            # Save raw JSON
-            with open(subtitle_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-        
-        elif subtitle_format.lower() == 'txt':
-            # Save plain text
-            with open(subtitle_path, 'w', encoding='utf-8') as f:
-                f.write(result['text'])
-        
-        else:
-            raise ValueError(f"Unsupported subtitle format: {subtitle_format}")
+        write_subtitle_file(result, subtitle_path, subtitle_format)
         
         print("Subtitles generated successfully!")
         return subtitle_path
@@ -186,13 +274,15 @@ def main():
         return 1
     
     try:
-        # Generate subtitles in VTT format only
-        vtt_path = generate_subtitles(
-            str(video_path),
-            output_dir=str(project_root / "output"),
-            model_type='base',  # Good balance of speed and accuracy
-            subtitle_format='vtt'
-        )
+        # Generate subtitles in VTT format only, within this stage's share of the host's cores
+        with core_allotment('transcribe') if core_allotment else nullcontext():
+            vtt_path = generate_subtitles(
+                str(video_path),
+                output_dir=str(project_root / "output"),
+                model_type='base',  # Good balance of speed and accuracy
+                subtitle_format='vtt',
+                windowed=os.environ.get('SUBTITLE_WINDOWED') == '1'
+            )
         
         print(f"\nSUCCESS!")
         print(f"VTT subtitle file: {vtt_path}")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Incremental subtitle generation for TTS audio chunks.
+Transcribes chunk_1.wav, chunk_2.wav, ... as generate.js writes them and
+merges the cues into one subtitle file once the last chunk has arrived.
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+from pathlib import Path
+
+try:
+    from .simple_subtitle_generator import write_subtitle_file
+    from .config import DEFAULT_MODEL
+    from .model_cache import load_model
+except ImportError:
+    from simple_subtitle_generator import write_subtitle_file
+    from config import DEFAULT_MODEL
+    from model_cache import load_model
+
+# Matches the chunk files written by generate.js
+CHUNK_PATTERN = re.compile(r'^chunk_(\d+)\.wav$')
+
+# Written by generate.js once every chunk has been synthesized
+COMBINED_AUDIO_FILE = 'combined_audio.wav'
+
+
+class ChunkedTranscriber:
+    """
+    Transcribe audio chunks one at a time and merge them into a single timeline.
+
+    Each chunk's segments are shifted by the cumulative duration of the chunks
+    before it, which matches the timeline of the concatenated audio track.
+    """
+
+    def __init__(self, model_type=DEFAULT_MODEL, model=None):
+        """
+        Args:
+            model_type (str): Whisper model type, used when no model is passed
+            model: Already loaded Whisper model (optional)
+        """
+        self.model_type = model_type
+        self.model = model
+        self.offset = 0.0
+        self.segments = []
+        self.texts = []
+        self.chunks_done = 0
+
+    def _load_model(self):
+        if self.model is None:
+            print(f"Loading Whisper model: {self.model_type}")
+            self.model = load_model(self.model_type)
+        return self.model
+
+    def add_chunk(self, audio_path):
+        """
+        Transcribe one chunk and append its segments to the merged timeline.
+
+        Args:
+            audio_path (str): Path to the chunk audio file
+
+        Returns:
+            list: The chunk's segments, already offset into the merged timeline
+        """
+        import whisper
+
+        model = self._load_model()
+        audio = whisper.load_audio(str(audio_path))
+        duration = len(audio) / whisper.audio.SAMPLE_RATE
+
+        print(f"Transcribing {os.path.basename(audio_path)} ({duration:.1f}s, offset {self.offset:.1f}s)")
+        result = model.transcribe(audio)
+
+        chunk_segments = []
+        for segment in result['segments']:
+            chunk_segments.append({
+                'start': segment['start'] + self.offset,
+                'end': min(segment['end'], duration) + self.offset,
+                'text': segment['text']
+            })
+
+        self.segments.extend(chunk_segments)
+        self.texts.append(result['text'].strip())
+        self.offset += duration
+        self.chunks_done += 1
+        return chunk_segments
+
+    def finalize(self, subtitle_path, subtitle_format='vtt'):
+        """
+        Write the merged subtitle file.
+
+        Args:
+            subtitle_path (str): Destination file path
+            subtitle_format (str): Output format ('srt', 'vtt', 'json', 'txt')
+
+        Returns:
+            str: Path to the written subtitle file
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(subtitle_path)), exist_ok=True)
+        result = {'text': ' '.join(self.texts), 'segments': self.segments}
+
+        # Write next to the destination and rename so readers never see a partial file
+        temp_path = f"{subtitle_path}.partial"
+        write_subtitle_file(result, temp_path, subtitle_format)
+        os.replace(temp_path, subtitle_path)
+
+        print(f"Merged subtitles for {self.chunks_done} chunks ({self.offset:.1f}s) saved to: {subtitle_path}")
+        return subtitle_path
+
+
+def _list_chunks(temp_dir):
+    """Return {chunk_number: path} for the chunk files currently in temp_dir."""
+    chunks = {}
+    for name in os.listdir(temp_dir):
+        match = CHUNK_PATTERN.match(name)
+        if match:
+            chunks[int(match.group(1))] = os.path.join(temp_dir, name)
+    return chunks
+
+
+def watch_directory(temp_dir, subtitle_path, expected_chunks=None, model_type=DEFAULT_MODEL,
+                    subtitle_format='vtt', poll_interval=0.5, timeout=3600):
+    """
+    Watch a job's temp directory and transcribe chunks in order as they land.
+
+    A chunk is treated as complete once its size stops changing between two
+    polls, or as soon as the next chunk or combined_audio.wav appears. The
+    merged file is written once the expected number of chunks is done, or,
+    when the count is unknown, once combined_audio.wav exists.
+
+    Args:
+        temp_dir (str): Directory generate.js writes chunk_N.wav files into
+        subtitle_path (str): Destination of the merged subtitle file
+        expected_chunks (int): Number of chunks to wait for (optional)
+        model_type (str): Whisper model type
+        subtitle_format (str): Output format ('srt', 'vtt', 'json', 'txt')
+        poll_interval (float): Seconds between directory scans
+        timeout (float): Seconds to wait for the next chunk before giving up
+
+    Returns:
+        str: Path to the merged subtitle file
+    """
+    transcriber = ChunkedTranscriber(model_type=model_type)
+    next_chunk = 1
+    last_sizes = {}
+    last_progress = time.time()
+
+    print(f"Watching {temp_dir} for TTS chunks...")
+
+    while True:
+        if expected_chunks is not None and next_chunk > expected_chunks:
+            break
+
+        chunks = _list_chunks(temp_dir) if os.path.isdir(temp_dir) else {}
+        all_written = os.path.exists(os.path.join(temp_dir, COMBINED_AUDIO_FILE))
+
+        if expected_chunks is None and all_written and next_chunk not in chunks:
+            break
+
+        path = chunks.get(next_chunk)
+        if path is not None:
+            size = os.path.getsize(path)
+            stable = size > 0 and last_sizes.get(next_chunk) == size
+            if stable or all_written or (next_chunk + 1) in chunks:
+                transcriber.add_chunk(path)
+                next_chunk += 1
+                last_progress = time.time()
+                continue
+            last_sizes[next_chunk] = size
+
+        if time.time() - last_progress > timeout:
+            raise TimeoutError(f"Timed out waiting for chunk_{next_chunk}.wav in {temp_dir}")
+
+        time.sleep(poll_interval)
+
+    return transcriber.finalize(subtitle_path, subtitle_format)
+
+
+def transcribe_chunks(chunk_paths, subtitle_path, model_type=DEFAULT_MODEL, subtitle_format='vtt'):
+    """
+    Transcribe an ordered list of audio chunks into one merged subtitle file.
+
+    Args:
+        chunk_paths (list): Chunk audio files in playback order
+        subtitle_path (str): Destination of the merged subtitle file
+        model_type (str): Whisper model type
+        subtitle_format (str): Output format ('srt', 'vtt', 'json', 'txt')
+
+    Returns:
+        str: Path to the merged subtitle file
+    """
+    transcriber = ChunkedTranscriber(model_type=model_type)
+    for chunk_path in chunk_paths:
+        transcriber.add_chunk(chunk_path)
+    return transcriber.finalize(subtitle_path, subtitle_format)
+
+
+def main():
+    """Watch a temp directory from the command line."""
+    parser = argparse.ArgumentParser(description="Transcribe TTS chunks as they are produced")
+    parser.add_argument('temp_dir', help="Job temp directory containing chunk_N.wav files")
+    parser.add_argument('--output', default=str(Path(__file__).parent.parent / 'output' / 'final_video.vtt'),
+                        help="Merged subtitle file to write")
+    parser.add_argument('--expected-chunks', type=int, default=None,
+                        help="Number of chunks to wait for (defaults to waiting for combined_audio.wav)")
+    parser.add_argument('--model', default=DEFAULT_MODEL, help="Whisper model type")
+    parser.add_argument('--format', default='vtt', help="Subtitle format")
+    parser.add_argument('--timeout', type=float, default=3600, help="Seconds to wait for each chunk")
+    args = parser.parse_args()
+
+    try:
+        watch_directory(
+            args.temp_dir,
+            args.output,
+            expected_chunks=args.expected_chunks,
+            model_type=args.model,
+            subtitle_format=args.format,
+            timeout=args.timeout
+        )
+        return 0
+    except Exception as e:
+        print(f"Streaming transcription failed: {e}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped, windowed audio loading for long videos.
+Decodes the audio track once to a 16 kHz PCM file on disk and feeds Whisper
+30-second windows from a numpy memmap, so peak memory does not grow with
+the length of the input.
+"""
+
+import os
+import subprocess
+import tempfile
+
+import numpy as np
+
+# Whisper's native input: 16 kHz mono, 30-second windows
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 30
+
+# Characters of previous text passed as the prompt for the next window
+PROMPT_CHARS = 200
+
+
+def decode_to_pcm(media_path, pcm_path=None, temp_dir=None):
+    """
+    Decode the audio track of a media file to raw 16 kHz mono int16 PCM.
+
+    Args:
+        media_path (str): Path to the audio or video file
+        pcm_path (str): Destination of the PCM file (defaults to a temp file)
+        temp_dir (str): Directory for the temp file (defaults to the system temp dir)
+
+    Returns:
+        str: Path to the PCM file
+    """
+    if pcm_path is None:
+        fd, pcm_path = tempfile.mkstemp(suffix='.pcm', dir=temp_dir)
+        os.close(fd)
+
+    ffmpeg_cmd = [
+        'ffmpeg', '-nostdin', '-y',
+        '-i', str(media_path),
+        '-vn',
+        '-ac', '1',
+        '-ar', str(SAMPLE_RATE),
+        '-f', 's16le',
+        '-acodec', 'pcm_s16le',
+        pcm_path
+    ]
+    result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to decode audio from {media_path}: {result.stderr}")
+
+    return pcm_path
+
+
+def open_pcm(pcm_path):
+    """
+    Memory-map a PCM file written by decode_to_pcm.
+
+    Returns:
+        numpy.memmap: int16 samples, paged in from disk on access
+    """
+    if os.path.getsize(pcm_path) == 0:
+        return np.zeros(0, dtype=np.int16)
+    return np.memmap(pcm_path, dtype=np.int16, mode='r')
+
+
+def iter_windows(samples, window_seconds=WINDOW_SECONDS):
+    """
+    Yield consecutive windows of float32 audio from an int16 sample buffer.
+
+    Only the current window is converted to float32, so memory use is
+    bounded by the window size rather than the input length.
+
+    Args:
+        samples: int16 sample buffer (usually a memmap)
+        window_seconds (int): Window length in seconds
+
+    Yields:
+        tuple: (window start in seconds, float32 samples in [-1, 1])
+    """
+    window_size = window_seconds * SAMPLE_RATE
+    for start in range(0, len(samples), window_size):
+        window = np.asarray(samples[start:start + window_size], dtype=np.float32) / 32768.0
+        yield start / SAMPLE_RATE, window
+
+
+def iter_window_segments(model, media_path, window_seconds=WINDOW_SECONDS, temp_dir=None, checkpoint=None,
+                         **transcribe_options):
+    """
+    Transcribe a media file window by window.
+
+    The mel spectrogram is computed for one window at a time, and the tail
+    of each window's text is passed as the prompt for the next one so that
+    sentences continue naturally across window boundaries.
+
+    With a checkpoint, each window's segments are saved once decoded, and
+    windows saved by an interrupted run are restored instead of transcribed.
+
+    Args:
+        model: Loaded Whisper model
+        media_path (str): Path to the audio or video file
+        window_seconds (int): Window length in seconds
+        temp_dir (str): Directory for the decoded PCM file
+        checkpoint: job_journal.UnitCheckpoint for the windows (optional)
+        **transcribe_options: Extra options passed to model.transcribe
+
+    Yields:
+        tuple: (window start in seconds, list of segments offset into the full timeline, window text)
+    """
+    pcm_path = decode_to_pcm(media_path, temp_dir=temp_dir)
+    try:
+        samples = open_pcm(pcm_path)
+        previous_text = ''
+        for window_start, window in iter_windows(samples, window_seconds):
+            saved = checkpoint.get(f"{window_start:g}") if checkpoint else None
+            if saved is not None:
+                segments, text = saved['segments'], saved['text']
+            else:
+                window_duration = len(window) / SAMPLE_RATE
+                result = model.transcribe(
+                    window,
+                    initial_prompt=previous_text[-PROMPT_CHARS:] or None,
+                    **transcribe_options
+                )
+
+                segments = []
+                for segment in result['segments']:
+                    segments.append({
+                        'start': window_start + segment['start'],
+                        'end': window_start + min(segment['end'], window_duration),
+                        'text': segment['text']
+                    })
+
+                text = result['text'].strip()
+                if checkpoint:
+                    checkpoint.put(f"{window_start:g}", {'segments': segments, 'text': text})
+
+            if text:
+                previous_text = f"{previous_text} {text}".strip()
+            yield window_start, segments, text
+
+        # Release the mapping before the file is removed
+        del samples
+    finally:
+        try:
+            os.remove(pcm_path)
+        except OSError:
+            pass
+
+
+def transcribe_windowed(model, media_path, window_seconds=WINDOW_SECONDS, temp_dir=None, checkpoint=None,
+                        **transcribe_options):
+    """
+    Transcribe a media file with bounded memory.
+
+    Args:
+        model: Loaded Whisper model
+        media_path (str): Path to the audio or video file
+        window_seconds (int): Window length in seconds
+        temp_dir (str): Directory for the decoded PCM file
+        checkpoint: job_journal.UnitCheckpoint for the windows (optional)
+        **transcribe_options: Extra options passed to model.transcribe
+
+    Returns:
+        dict: Result with 'text' and 'segments', in the same shape as model.transcribe
+    """
+    all_segments = []
+    texts = []
+    for _, segments, text in iter_window_segments(model, media_path, window_seconds, temp_dir, checkpoint,
+                                                  **transcribe_options):
+        all_segments.extend(segments)
+        if text:
+            texts.append(text)
+
+    for i, segment in enumerate(all_segments):
+        segment['id'] = i
+
+    return {'text': ' '.join(texts), 'segments': all_segments}
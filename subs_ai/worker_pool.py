@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Transcription worker pool that shares one copy of the Whisper weights.
+The parent loads the model once, moves its tensors into shared memory and
+forks the workers, so N workers cost one set of weights plus their own
+activations instead of N full copies.
+"""
+
+import os
+import gc
+import sys
+import time
+import queue
+import argparse
+import multiprocessing
+
+try:
+    from .config import DEFAULT_MODEL
+    from .model_cache import load_model
+except ImportError:
+    from config import DEFAULT_MODEL
+    from model_cache import load_model
+
+# Model inherited by forked workers
+_MODEL = None
+
+# Fields read from /proc/<pid>/smaps_rollup, in kB
+MEMORY_FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+# Seconds between checks that the workers are alive while waiting for results
+_POLL_SECONDS = 1.0
+
+
+def read_memory(pid='self'):
+    """
+    Read a process's memory breakdown from /proc (Linux only).
+
+    Args:
+        pid: Process id, or 'self'
+
+    Returns:
+        dict: rss_mb, pss_mb, shared_mb and private_mb, or None when unavailable
+    """
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    values = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].rstrip(':') in MEMORY_FIELDS:
+            values[parts[0].rstrip(':')] = int(parts[1])
+
+    return {
+        'rss_mb': round(values.get('Rss', 0) / 1024, 1),
+        'pss_mb': round(values.get('Pss', 0) / 1024, 1),
+        'shared_mb': round((values.get('Shared_Clean', 0) + values.get('Shared_Dirty', 0)) / 1024, 1),
+        'private_mb': round((values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)) / 1024, 1)
+    }
+
+
+def _worker_loop(tasks, results, threads, model_type):
+    """Run in each worker: transcribe queued files with the shared model."""
+    import torch
+
+    global _MODEL
+    if _MODEL is None:
+        # Spawned workers cannot inherit the parent's model
+        _MODEL = load_model(model_type, device='cpu')
+
+    torch.set_num_threads(threads)
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        task_id, media_path, options = task
+        start = time.time()
+        try:
+            with torch.inference_mode():
+                result = _MODEL.transcribe(media_path, **options)
+            results.put((task_id, os.getpid(), result, None, time.time() - start, read_memory()))
+        except Exception as e:
+            results.put((task_id, os.getpid(), None, str(e), time.time() - start, read_memory()))
+
+
+class TranscriptionPool:
+    """
+    Pool of transcription processes sharing the parent's model weights.
+
+    On Linux the workers are forked after the model is loaded and its tensors
+    are moved into shared memory, so they map the same pages. Where fork is
+    not available, every worker loads its own copy.
+
+    If a worker dies (e.g. killed for lack of memory), the pool is broken:
+    the files it had not returned are reported as errors, the other workers
+    are stopped and later calls to map raise RuntimeError.
+    """
+
+    def __init__(self, model_type=DEFAULT_MODEL, workers=2, threads_per_worker=None):
+        """
+        Args:
+            model_type (str): Whisper model type
+            workers (int): Number of worker processes
+            threads_per_worker (int): torch threads per worker (defaults to cores / workers)
+        """
+        global _MODEL
+
+        self.model_type = model_type
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        self.shared = 'fork' in multiprocessing.get_all_start_methods()
+
+        if self.shared:
+            print(f"Loading Whisper model once in parent: {model_type}")
+            _MODEL = load_model(model_type, device='cpu')
+            _MODEL.eval()
+            # Weights from the mmap cache are already shared through the page cache;
+            # otherwise move them into shared memory so a stray write cannot un-share them
+            if not getattr(_MODEL, 'is_memory_mapped', False):
+                _MODEL.share_memory()
+            # Keep the garbage collector from touching (and un-sharing) objects created so far
+            gc.collect()
+            gc.freeze()
+            context = multiprocessing.get_context('fork')
+        else:
+            print("fork is not available; each worker will load its own model copy")
+            context = multiprocessing.get_context('spawn')
+
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._next_id = 0
+        self._processes = []
+        self._broken = None
+        for _ in range(workers):
+            process = context.Process(
+                target=_worker_loop,
+                args=(self._tasks, self._results, self.threads_per_worker, model_type),
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+
+        if self.shared:
+            gc.unfreeze()
+
+        print(f"Started {workers} workers with {self.threads_per_worker} threads each")
+
+    def map(self, media_paths, **options):
+        """
+        Transcribe files across the workers.
+
+        Args:
+            media_paths (list): Audio or video files
+            **options: Extra options passed to model.transcribe
+
+        Returns:
+            list: One dict per file with 'result', 'error', 'seconds', 'pid' and 'memory'
+
+        Raises:
+            RuntimeError: If a worker died during an earlier call
+        """
+        if self._broken:
+            raise RuntimeError(self._broken)
+
+        options.setdefault('fp16', False)
+        ids = []
+        for media_path in media_paths:
+            self._tasks.put((self._next_id, str(media_path), options))
+            ids.append(self._next_id)
+            self._next_id += 1
+
+        collected = {}
+        while len(collected) < len(ids):
+            try:
+                self._collect(self._results.get(timeout=_POLL_SECONDS), collected)
+            except queue.Empty:
+                dead = [process for process in self._processes if not process.is_alive()]
+                if dead:
+                    self._break(dead, ids, collected)
+
+        return [collected[task_id] for task_id in ids]
+
+    @staticmethod
+    def _collect(message, collected):
+        task_id, pid, result, error, seconds, memory = message
+        collected[task_id] = {
+            'result': result,
+            'error': error,
+            'seconds': seconds,
+            'pid': pid,
+            'memory': memory
+        }
+
+    def _break(self, dead, ids, collected):
+        """Report every file not returned yet as lost and stop the remaining workers."""
+        # Keep results that were sent before the worker died
+        while True:
+            try:
+                self._collect(self._results.get_nowait(), collected)
+            except queue.Empty:
+                break
+
+        causes = ', '.join(f"pid {process.pid} exited with code {process.exitcode}" for process in dead)
+        self._broken = f"Transcription worker died ({causes})"
+        print(f"{self._broken}; reporting {len(ids) - len(collected)} unfinished files as errors")
+        for task_id in ids:
+            if task_id not in collected:
+                collected[task_id] = {
+                    'result': None,
+                    'error': self._broken,
+                    'seconds': 0.0,
+                    'pid': None,
+                    'memory': None
+                }
+
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        self._processes = []
+
+    def memory_report(self):
+        """
+        Report the memory of the parent and every worker.
+
+        Shared pages (the model weights) are counted once across processes in
+        PSS, so the sum of PSS is the pool's real footprint, and each worker's
+        private memory is what one more worker would cost.
+
+        Returns:
+            dict: 'parent', 'workers' (pid -> memory) and 'total_pss_mb'
+        """
+        parent = read_memory()
+        workers = {process.pid: read_memory(process.pid) for process in self._processes}
+        reports = [parent] + list(workers.values())
+        total_pss = sum(report['pss_mb'] for report in reports if report)
+        return {'parent': parent, 'workers': workers, 'total_pss_mb': round(total_pss, 1)}
+
+    def close(self):
+        """Stop the workers."""
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join()
+        self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def print_memory_report(report):
+    """Print a memory report from TranscriptionPool.memory_report."""
+    print(f"{'process':>12} {'rss MB':>10} {'pss MB':>10} {'shared MB':>10} {'private MB':>11}")
+    rows = [('parent', report['parent'])] + [(str(pid), memory) for pid, memory in report['workers'].items()]
+    for name, memory in rows:
+        if memory is None:
+            print(f"{name:>12} {'n/a':>10}")
+            continue
+        print(f"{name:>12} {memory['rss_mb']:>10} {memory['pss_mb']:>10} "
+              f"{memory['shared_mb']:>10} {memory['private_mb']:>11}")
+    print(f"Total PSS: {report['total_pss_mb']} MB")
+
+    private = [memory['private_mb'] for memory in report['workers'].values() if memory]
+    if private:
+        print(f"Each additional worker costs about {max(private)} MB of private memory")
+
+
+def main():
+    """Transcribe files with a shared-weight pool and report per-worker memory."""
+    parser = argparse.ArgumentParser(description="Transcribe files with a shared-weight worker pool")
+    parser.add_argument('media', nargs='+', help="Audio or video files")
+    parser.add_argument('--model', default=DEFAULT_MODEL, help="Whisper model type")
+    parser.add_argument('--workers', type=int, default=2, help="Number of worker processes")
+    parser.add_argument('--threads', type=int, default=None, help="torch threads per worker")
+    args = parser.parse_args()
+
+    with TranscriptionPool(args.model, workers=args.workers, threads_per_worker=args.threads) as pool:
+        start = time.time()
+        outcomes = pool.map(args.media)
+        elapsed = time.time() - start
+
+        for media_path, outcome in zip(args.media, outcomes):
+            status = f"error: {outcome['error']}" if outcome['error'] else f"{len(outcome['result']['segments'])} segments"
+            print(f"{media_path}: {status} ({outcome['seconds']:.1f}s on pid {outcome['pid']})")
+        print(f"Transcribed {len(args.media)} files in {elapsed:.1f}s\n")
+
+        print_memory_report(pool.memory_report())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
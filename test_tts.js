@@ -0,0 +1,102 @@
+const os = require('os');
+const path = require('path');
+const fs = require('fs-extra');
+
+// Test the TTS chunking and cache offline, against the in-process TTS stand-in.
+//
+//   npm run build && node test_tts.js
+//
+// Checks that splitTextIntoChunks keeps every character of the story, and that
+// audio cached from one TTS endpoint is never reused for another.
+
+process.env.TTS_STANDIN_LATENCY_MS = '0';
+process.env.TTS_STANDIN_MS_PER_CHAR = '0';
+process.env.TTS_CACHE_DISABLE = '0';
+const cacheDir = fs.mkdtempSync(path.join(os.tmpdir(), 'tts-cache-test-'));
+process.env.TTS_CACHE_DIR = cacheDir;
+
+const { createServer } = require('./tts-standin');
+const { generateTTS, generateTTSBatch } = require('./dist/service/tts');
+const { splitTextIntoChunks } = require('./generate');
+
+let passed = true;
+function check(ok, label) {
+  passed = passed && ok;
+  console.log(`   ${ok ? '✅' : '❌'} ${label}`);
+}
+
+function testSplitting() {
+  console.log('\n🔍 Splitting text into chunks...');
+  const sentence = 'The quick brown fox jumps over the lazy dog. ';
+  const cases = {
+    'ellipsis at the start of a line': 'Hello world.\n...and then?',
+    'punctuation-only lines': 'First line.\n!!!\n?\nLast line',
+    'only punctuation': '?!...',
+    'no punctuation': 'a story without any sentence ends',
+    'quoted sentences': '"Run!" she said. (Quietly.) Then nothing',
+    'paragraphs': `${sentence.repeat(40)}\n\n${sentence.repeat(40)}`,
+    'long story': sentence.repeat(300),
+    'word longer than a chunk': `Start. ${'x'.repeat(450)} end.`
+  };
+  for (const [label, text] of Object.entries(cases)) {
+    const chunks = splitTextIntoChunks(text, 200, 80);
+    // Chunks are trimmed and split at spaces, so only whitespace may differ
+    const ok = chunks.join('').replace(/\s+/g, '') === text.replace(/\s+/g, '') &&
+      chunks.every(chunk => chunk.length > 0 && chunk.length <= 200);
+    check(ok, `${label}: ${chunks.length} chunk(s)`);
+  }
+}
+
+async function testCacheByEndpoint(tempDir) {
+  console.log('\n🔍 Caching audio per endpoint...');
+  const servers = [createServer(), createServer()];
+  const requests = [0, 0];
+  servers.forEach((server, i) => server.on('request', () => requests[i]++));
+  await Promise.all(servers.map(server => new Promise(resolve => server.listen(0, resolve))));
+  const endpoint = server => `http://localhost:${server.address().port}/audio/speech`;
+  const text = 'The same chunk of text, synthesized twice.';
+
+  try {
+    process.env.TTS_ENDPOINT = endpoint(servers[0]);
+    await generateTTS(text, path.join(tempDir, 'first.wav'));
+    await generateTTS(text, path.join(tempDir, 'second.wav'));
+    check(requests[0] === 1, `repeated text on one endpoint is served from the cache (${requests[0]} request)`);
+
+    process.env.TTS_ENDPOINT = endpoint(servers[1]);
+    await generateTTS(text, path.join(tempDir, 'third.wav'));
+    check(requests[1] === 1, `another endpoint does not reuse that audio (${requests[1]} request)`);
+
+    // Identical chunks in one batch write the same cache entry at the same time
+    process.env.TTS_ENDPOINT = endpoint(servers[0]);
+    const texts = Array(8).fill('A chunk that appears several times.');
+    const outputs = texts.map((_, i) => path.join(tempDir, `batch_${i}.wav`));
+    await generateTTSBatch(texts, outputs, { concurrency: 8, retries: 0 });
+    const written = await Promise.all(outputs.map(output => fs.pathExists(output)));
+    const leftovers = (await fs.readdir(cacheDir)).filter(name => name.endsWith('.partial'));
+    check(written.every(Boolean) && leftovers.length === 0, 'concurrent identical chunks are all written and cached');
+  } finally {
+    servers.forEach(server => server.close());
+  }
+}
+
+async function main() {
+  console.log('🧪 TTS Chunking and Cache Test');
+  console.log('==============================');
+
+  const tempDir = await fs.mkdtemp(path.join(os.tmpdir(), 'tts-test-'));
+  try {
+    testSplitting();
+    await testCacheByEndpoint(tempDir);
+  } finally {
+    await fs.remove(tempDir);
+    await fs.remove(cacheDir);
+  }
+
+  console.log(`\n${passed ? '🎉 All TTS tests passed' : '💥 Some TTS tests failed'}`);
+  process.exit(passed ? 0 : 1);
+}
+
+main().catch(error => {
+  console.error('💥 Test failed:', error);
+  process.exit(1);
+});
@@ -0,0 +1,138 @@
+const os = require('os');
+const path = require('path');
+const crypto = require('crypto');
+const fs = require('fs-extra');
+
+// Test the parallel multipart upload stage against a local S3-compatible server.
+//
+//   pip install "moto[server]" && moto_server -p 5000 &
+//   npm run build && node test_upload.js
+//
+//   npm run build && node test_upload.js --standin    # in-process s3-standin.js instead of moto
+//
+// AWS_S3_ENDPOINT defaults to the moto server; the bucket is created if needed.
+// The last run simulates the overlay finishing one file every TEST_UPLOAD_ENCODE_MS
+// and compares uploading each file as it is finished with uploading after the last one.
+
+const useStandin = process.argv.includes('--standin');
+process.env.AWS_S3_ENDPOINT = process.env.AWS_S3_ENDPOINT || 'http://localhost:5000';
+process.env.AWS_ACCESS_KEY_ID = process.env.AWS_ACCESS_KEY_ID || 'testing';
+process.env.AWS_SECRET_ACCESS_KEY = process.env.AWS_SECRET_ACCESS_KEY || 'testing';
+process.env.AWS_REGION = process.env.AWS_REGION || 'us-east-1';
+
+const { createS3Client, createUploadQueue, uploadFiles } = require('./dist/service/upload');
+
+const BUCKET = process.env.TEST_UPLOAD_BUCKET || 'reelgen-upload-test';
+const FILE_COUNT = parseInt(process.env.TEST_UPLOAD_FILES || '6', 10);
+const FILE_SIZE_MB = parseInt(process.env.TEST_UPLOAD_FILE_MB || '24', 10);
+const ENCODE_MS = parseInt(process.env.TEST_UPLOAD_ENCODE_MS || '1500', 10);
+
+async function makeFiles(dir) {
+  const files = [];
+  for (let i = 1; i <= FILE_COUNT; i++) {
+    // Uneven sizes, like real chunks
+    const filePath = path.join(dir, `video_${i}.mp4`);
+    await fs.writeFile(filePath, crypto.randomBytes(Math.round(FILE_SIZE_MB * (0.5 + i / FILE_COUNT) * 1024 * 1024)));
+    files.push({ path: filePath, key: `upload-test/video_${i}.mp4` });
+  }
+  return files;
+}
+
+async function verify(s3, files) {
+  let passed = true;
+  for (const file of files) {
+    const head = await s3.headObject({ Bucket: BUCKET, Key: file.key }).promise();
+    const size = (await fs.stat(file.path)).size;
+    // Multipart uploads get an ETag of the form "<md5>-<parts>"
+    const multipart = /-\d+"?$/.test(head.ETag || '');
+    const ok = head.ContentLength === size && multipart;
+    passed = passed && ok;
+    console.log(`   ${ok ? '✅' : '❌'} ${file.key}: ${head.ContentLength}/${size} bytes, ETag ${head.ETag}`);
+  }
+  return passed;
+}
+
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+
+/**
+ * Simulate the overlay finishing one file every ENCODE_MS and return the time
+ * from the start of encoding until every file is uploaded.
+ */
+async function encodeThenUpload(s3, files, progressive) {
+  const start = Date.now();
+  const options = { bucket: BUCKET, concurrency: files.length, queueSize: 4, partSizeMB: 5 };
+  let report;
+  if (progressive) {
+    const queue = createUploadQueue(options, s3);
+    for (const file of files) {
+      await sleep(ENCODE_MS);
+      queue.add(file);
+    }
+    report = await queue.finish();
+  } else {
+    await sleep(ENCODE_MS * files.length);
+    report = await uploadFiles(files, options, s3);
+  }
+  const encodeSeconds = ENCODE_MS * files.length / 1000;
+  const totalSeconds = (Date.now() - start) / 1000;
+  return { report, totalSeconds, afterEncodeSeconds: totalSeconds - encodeSeconds };
+}
+
+async function main() {
+  let standin = null;
+  if (useStandin) {
+    standin = require('./s3-standin').createServer();
+    await new Promise(resolve => standin.listen(0, resolve));
+    process.env.AWS_S3_ENDPOINT = `http://localhost:${standin.address().port}`;
+  }
+
+  console.log('🧪 Parallel S3 Upload Test');
+  console.log('==========================');
+  console.log(`Endpoint: ${process.env.AWS_S3_ENDPOINT}${standin ? ' (s3-standin.js)' : ''}, bucket: ${BUCKET}`);
+
+  const s3 = createS3Client();
+  await s3.createBucket({ Bucket: BUCKET }).promise().catch(error => {
+    if (error.code !== 'BucketAlreadyOwnedByYou' && error.code !== 'BucketAlreadyExists') throw error;
+  });
+
+  const dir = await fs.mkdtemp(path.join(os.tmpdir(), 'upload-test-'));
+  try {
+    const files = await makeFiles(dir);
+    console.log(`Created ${files.length} test files in ${dir}\n`);
+
+    console.log('🔍 Sequential upload (one file, one part at a time)...');
+    const sequential = await uploadFiles(files, { bucket: BUCKET, concurrency: 1, queueSize: 1, partSizeMB: 5 }, s3);
+
+    console.log('\n🔍 Parallel upload...');
+    const parallel = await uploadFiles(files, { bucket: BUCKET, concurrency: files.length, queueSize: 4, partSizeMB: 5 }, s3);
+
+    console.log(`\n🔍 Upload after encoding (${files.length} files, one finished every ${ENCODE_MS}ms)...`);
+    const batch = await encodeThenUpload(s3, files, false);
+
+    console.log('\n🔍 Progressive upload while encoding...');
+    const progressive = await encodeThenUpload(s3, files, true);
+
+    console.log('\n🔍 Verifying uploaded objects...');
+    const passed = await verify(s3, files) &&
+      [parallel, batch.report, progressive.report].every(report => report.results.every(r => !r.error));
+
+    console.log('\n📊 Results');
+    console.log(`   Sequential: ${sequential.seconds.toFixed(2)}s (${sequential.throughputMBps.toFixed(1)} MB/s)`);
+    console.log(`   Parallel:   ${parallel.seconds.toFixed(2)}s (${parallel.throughputMBps.toFixed(1)} MB/s)`);
+    console.log(`   Slowest single file: ${Math.max(...parallel.results.map(r => r.seconds)).toFixed(2)}s`);
+    console.log(`   Speedup: ${(sequential.seconds / parallel.seconds).toFixed(2)}x`);
+    console.log(`   Encode + upload after encoding: ${batch.totalSeconds.toFixed(2)}s (${batch.afterEncodeSeconds.toFixed(2)}s after the last file)`);
+    console.log(`   Encode + progressive upload:    ${progressive.totalSeconds.toFixed(2)}s (${progressive.afterEncodeSeconds.toFixed(2)}s after the last file)`);
+    console.log(passed ? '\n🎉 Upload test passed' : '\n❌ Upload test failed');
+    process.exitCode = passed ? 0 : 1;
+  } finally {
+    await fs.remove(dir);
+    if (standin) standin.close();
+  }
+}
+
+main().catch(error => {
+  console.error('💥 Upload test failed:', error.message);
+  console.log('Is the S3 stand-in running? Start it with: moto_server -p 5000');
+  process.exit(1);
+});
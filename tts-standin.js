@@ -0,0 +1,142 @@
+const http = require('http');
+const os = require('os');
+const path = require('path');
+const fs = require('fs-extra');
+
+// Local stand-in for the TTS endpoint used by src/service/tts.ts.
+// Returns synthetic WAV audio after a configurable delay so TTS concurrency can be benchmarked offline.
+//
+//   node tts-standin.js                      # serve on TTS_STANDIN_PORT (default 5055)
+//   node tts-standin.js --benchmark          # compare sequential and concurrent synthesis
+//
+// Point the pipeline at it with TTS_ENDPOINT=http://localhost:5055/audio/speech
+
+const PORT = parseInt(process.env.TTS_STANDIN_PORT || '5055', 10);
+const LATENCY_MS = parseInt(process.env.TTS_STANDIN_LATENCY_MS || '1500', 10);        // Fixed delay per request
+const LATENCY_PER_CHAR_MS = parseFloat(process.env.TTS_STANDIN_MS_PER_CHAR || '0.5'); // Extra delay per input character
+const FAIL_RATE = parseFloat(process.env.TTS_STANDIN_FAIL_RATE || '0');               // Share of requests answered with 503
+const SAMPLE_RATE = 24000;
+const CHARS_PER_SECOND = 15; // Roughly the speaking rate of the real voice
+
+// Build a mono 16-bit PCM WAV with a quiet tone, sized like speech for the given text
+function synthesizeWav(text) {
+  const seconds = Math.max(0.5, text.length / CHARS_PER_SECOND);
+  const samples = Math.round(seconds * SAMPLE_RATE);
+  const buffer = Buffer.alloc(44 + samples * 2);
+
+  buffer.write('RIFF', 0);
+  buffer.writeUInt32LE(36 + samples * 2, 4);
+  buffer.write('WAVE', 8);
+  buffer.write('fmt ', 12);
+  buffer.writeUInt32LE(16, 16);
+  buffer.writeUInt16LE(1, 20);              // PCM
+  buffer.writeUInt16LE(1, 22);              // Mono
+  buffer.writeUInt32LE(SAMPLE_RATE, 24);
+  buffer.writeUInt32LE(SAMPLE_RATE * 2, 28);
+  buffer.writeUInt16LE(2, 32);
+  buffer.writeUInt16LE(16, 34);
+  buffer.write('data', 36);
+  buffer.writeUInt32LE(samples * 2, 40);
+
+  for (let i = 0; i < samples; i++) {
+    buffer.writeInt16LE(Math.round(Math.sin(2 * Math.PI * 220 * i / SAMPLE_RATE) * 3000), 44 + i * 2);
+  }
+  return buffer;
+}
+
+function createServer() {
+  let active = 0;
+  let peak = 0;
+  const server = http.createServer((req, res) => {
+    if (req.method !== 'POST') {
+      res.writeHead(405).end();
+      return;
+    }
+
+    let body = '';
+    req.on('data', (data) => { body += data; });
+    req.on('end', () => {
+      let text = '';
+      try {
+        text = JSON.parse(body).input || '';
+      } catch (error) {
+        res.writeHead(400, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify({ error: 'Invalid JSON body' }));
+        return;
+      }
+
+      active++;
+      peak = Math.max(peak, active);
+      setTimeout(() => {
+        active--;
+        if (Math.random() < FAIL_RATE) {
+          res.writeHead(503, { 'Content-Type': 'application/json' });
+          res.end(JSON.stringify({ error: 'Simulated overload' }));
+          return;
+        }
+        const wav = synthesizeWav(text);
+        res.writeHead(200, { 'Content-Type': 'audio/wav', 'Content-Length': wav.length });
+        res.end(wav);
+      }, LATENCY_MS + text.length * LATENCY_PER_CHAR_MS);
+    });
+  });
+  server.peakConcurrency = () => peak;
+  server.resetPeak = () => { peak = 0; };
+  return server;
+}
+
+// Time the pipeline's TTS step against the stand-in, sequentially and with each concurrency level
+async function benchmark(levels) {
+  const { generateTTSBatch } = require('./dist/service/tts');
+
+  const server = createServer();
+  await new Promise(resolve => server.listen(0, resolve));
+  process.env.TTS_ENDPOINT = `http://localhost:${server.address().port}/audio/speech`;
+  // Every round must reach the server
+  process.env.TTS_CACHE_DISABLE = '1';
+
+  // A long story: 12 chunks of 4000 characters, like splitTextIntoChunks produces
+  const texts = Array.from({ length: 12 }, (_, i) => `Chunk ${i + 1}. ` + 'lorem ipsum dolor sit amet '.repeat(148));
+  const tempDir = await fs.mkdtemp(path.join(os.tmpdir(), 'tts-bench-'));
+  const outputPaths = texts.map((_, i) => path.join(tempDir, `chunk_${i + 1}.wav`));
+
+  const rows = [];
+  try {
+    for (const concurrency of levels) {
+      server.resetPeak();
+      const start = Date.now();
+      await generateTTSBatch(texts, outputPaths, { concurrency, baseDelayMs: 200 });
+      rows.push({ concurrency, seconds: (Date.now() - start) / 1000, peak: server.peakConcurrency() });
+    }
+  } finally {
+    server.close();
+    await fs.remove(tempDir);
+  }
+
+  console.log('\n' + '='.repeat(50));
+  console.log(`TTS synthesis of ${texts.length} chunks (${LATENCY_MS}ms + ${LATENCY_PER_CHAR_MS}ms/char per request)`);
+  console.log('='.repeat(50));
+  console.log(`${'concurrency'.padStart(12)} ${'seconds'.padStart(9)} ${'speedup'.padStart(9)} ${'peak'.padStart(6)}`);
+  for (const row of rows) {
+    const speedup = (rows[0].seconds / row.seconds).toFixed(2);
+    console.log(`${String(row.concurrency).padStart(12)} ${row.seconds.toFixed(2).padStart(9)} ${(speedup + 'x').padStart(9)} ${String(row.peak).padStart(6)}`);
+  }
+}
+
+if (require.main !== module) {
+  // Required by another script (e.g. load-test.js), which starts its own server
+} else if (process.argv.includes('--benchmark')) {
+  const levelsArg = process.argv[process.argv.indexOf('--benchmark') + 1];
+  const levels = levelsArg && /^[\d,]+$/.test(levelsArg) ? levelsArg.split(',').map(Number) : [1, 2, 4, 8];
+  benchmark(levels).catch(error => {
+    console.error('💥 Benchmark failed:', error);
+    process.exit(1);
+  });
+} else {
+  createServer().listen(PORT, () => {
+    console.log(`🗣️  TTS stand-in listening on http://localhost:${PORT}/audio/speech`);
+    console.log(`   Latency: ${LATENCY_MS}ms + ${LATENCY_PER_CHAR_MS}ms/char, failure rate: ${FAIL_RATE}`);
+  });
+}
+
+module.exports = { createServer, synthesizeWav };
@@ -2,36 +2,68 @@
 """
 Video Text Overlay Script using OpenCV
 Overlays part numbers and captions on the first 5 seconds of video chunks
+
+    python3 video_overlay_opencv.py                 # overlay all chunks
+    python3 video_overlay_opencv.py --caption-only  # re-apply a new caption to the last render
 """
 
 import cv2
 import os
+import sys
+import json
 import numpy as np
+import argparse
 import subprocess
+import tempfile
 import shutil
 import re
 import glob
-from typing import List
+from typing import Callable, List, Optional
+
+from resource_scheduler import core_allotment, ffmpeg_thread_args
+from delivery_profiles import DEFAULT_PROFILE, DEFAULT_RENDITIONS, get_profile, get_rendition, rendition_output_args
+from progress import ProgressReporter, run_ffmpeg_with_progress
+from chunk_planner import load_manifest
+from media_index import get_media_info, index_paths
+from frame_pipeline import FramePipeline, capture_reader, compose_workers
+from job_journal import JobJournal
+
+# Seconds at the start of each chunk that show the caption
+CAPTION_SECONDS = 5
+
+# Record of the last render in the output directory, used by the caption-only path
+RENDER_STATE_FILE = 'overlay.json'
 
-def clean_processed_videos_directory(processed_dir: str):
+def clean_processed_videos_directory(processed_dir: str, keep=()):
     """
     Clean only the processed videos directory
     
     Args:
         processed_dir: Path to processed videos directory
+        keep: Files to leave in place (outputs a resumed job reuses)
     """
     print("Cleaning processed videos directory...")
+    keep = {os.path.abspath(path) for path in keep}
+    
+    def clean(directory):
+        for filename in os.listdir(directory):
+            file_path = os.path.join(directory, filename)
+            if os.path.abspath(file_path) in keep:
+                continue
+            if os.path.isfile(file_path):
+                os.remove(file_path)
+            elif any(path.startswith(os.path.abspath(file_path) + os.sep) for path in keep):
+                clean(file_path)
+            elif os.path.isdir(file_path):
+                shutil.rmtree(file_path)
     
     # Clean processed videos directory
     if os.path.exists(processed_dir):
         try:
-            for filename in os.listdir(processed_dir):
-                file_path = os.path.join(processed_dir, filename)
-                if os.path.isfile(file_path):
-                    os.remove(file_path)
-                elif os.path.isdir(file_path):
-                    shutil.rmtree(file_path)
+            clean(processed_dir)
             print(f"Cleaned processed videos directory: {processed_dir}")
+            if keep:
+                print(f"Kept {len(keep)} files completed by an earlier run of this job")
         except Exception as e:
             print(f"Warning: Could not clean processed videos directory: {e}")
     
@@ -72,7 +104,86 @@ def draw_simple_rectangle_with_border(img, pt1, pt2, bg_color, border_color, bor
     if border_thickness > 0:
         cv2.rectangle(img, (x1, y1), (x2, y2), border_color, border_thickness)
 
-def overlay_text_on_chunks_opencv(video_files: List[str], caption: str, output_dir: str = "output", start_number: int = 1) -> List[str]:
+# Caption box style
+CAPTION_FONT = cv2.FONT_HERSHEY_SIMPLEX
+CAPTION_FONT_SCALE = 1.8  # Increased text size
+CAPTION_TEXT_COLOR = (0, 0, 0)  # Black text
+CAPTION_BG_COLOR = (255, 255, 255)  # White background
+CAPTION_BORDER_COLOR = (0, 0, 0)  # Black border
+CAPTION_BORDER_THICKNESS = 3
+CAPTION_THICKNESS = 3  # Increased text thickness
+CAPTION_PADDING = 20  # Increased padding around text
+CAPTION_LINE_SPACING = 15  # Increased space between lines
+CAPTION_TOP_MARGIN = 250  # 250px margin from top (moved down by 50px)
+
+def layout_caption(text: str, width: int, words_per_line: int = 4, top: int = CAPTION_TOP_MARGIN) -> dict:
+    """
+    Lay out a caption box centered horizontally near the top of the frame
+    
+    Args:
+        text: Caption text
+        width: Frame width in pixels
+        words_per_line: Maximum words on each line
+        top: Distance of the box from the top of the frame
+    
+    Returns:
+        Layout for draw_caption: the lines with their positions and the box rectangle
+    """
+    words = text.split()
+    
+    # Split words into lines of max 4 words each
+    text_lines = []
+    for j in range(0, len(words), words_per_line):
+        text_lines.append(" ".join(words[j:j+words_per_line]))
+    
+    # Calculate total text dimensions
+    max_text_width = 0
+    total_text_height = 0
+    line_sizes = []
+    
+    for line in text_lines:
+        (line_width, line_height), baseline = cv2.getTextSize(line, CAPTION_FONT, CAPTION_FONT_SCALE, CAPTION_THICKNESS)
+        max_text_width = max(max_text_width, line_width)
+        line_sizes.append((line_width, line_height))
+        total_text_height += line_height + CAPTION_LINE_SPACING
+    
+    total_text_height -= CAPTION_LINE_SPACING  # Remove extra spacing from last line
+    
+    # Calculate background rectangle dimensions
+    bg_width = max_text_width + (CAPTION_PADDING * 2)
+    bg_height = total_text_height + (CAPTION_PADDING * 2)
+    
+    # Position the background rectangle (centered horizontally, margin from top)
+    bg_x = (width - bg_width) // 2
+    bg_y = top
+    
+    # Center each line horizontally within the background
+    lines = []
+    current_y = bg_y + CAPTION_PADDING
+    for line, (line_width, line_height) in zip(text_lines, line_sizes):
+        lines.append((line, (bg_x + (bg_width - line_width) // 2, current_y + line_height)))
+        current_y += line_height + CAPTION_LINE_SPACING
+    
+    return {'box': ((bg_x, bg_y), (bg_x + bg_width, bg_y + bg_height)), 'lines': lines}
+
+def draw_caption(frame, layout: dict):
+    """
+    Draw a caption laid out by layout_caption onto a frame in place
+    """
+    # Draw simple rectangle with background and border (no artifacts)
+    draw_simple_rectangle_with_border(frame, layout['box'][0], layout['box'][1],
+                                      CAPTION_BG_COLOR, CAPTION_BORDER_COLOR, CAPTION_BORDER_THICKNESS)
+    
+    # Draw each line of text
+    for line, origin in layout['lines']:
+        cv2.putText(frame, line, origin, CAPTION_FONT, CAPTION_FONT_SCALE,
+                    CAPTION_TEXT_COLOR, CAPTION_THICKNESS, cv2.LINE_AA)
+
+def overlay_text_on_chunks_opencv(video_files: List[str], caption: str, output_dir: str = "output", start_number: int = 1,
+                                  threads: Optional[int] = None, profile: str = DEFAULT_PROFILE,
+                                  renditions: Optional[List[str]] = None,
+                                  journal: Optional[JobJournal] = None,
+                                  on_part_done: Optional[Callable[[int, str], None]] = None) -> List[str]:
     """
     Overlay text on the first 5 seconds of each video chunk using OpenCV
     
@@ -81,6 +192,11 @@ def overlay_text_on_chunks_opencv(video_files: List[str], caption: str, output_d
         caption: Caption text to display
         output_dir: Directory to save output files
         start_number: Starting number for unique video numbering
+        threads: Cap on ffmpeg threads for the final encode (defaults to ffmpeg's choice)
+        profile: Delivery profile the final chunks are encoded with (see delivery_profiles.py)
+        renditions: Extra renditions encoded from the same decode (defaults to DELIVERY_RENDITIONS)
+        journal: Job journal; parts it records as completed with the same chunk and settings are skipped
+        on_part_done: Called with the part number and output path as soon as each part is final
     
     Returns:
         List of output file paths
@@ -89,14 +205,50 @@ def overlay_text_on_chunks_opencv(video_files: List[str], caption: str, output_d
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
+    delivery_profile = get_profile(profile)
+    renditions = DEFAULT_RENDITIONS if renditions is None else renditions
     output_files = []
+    rendered = {}
+    
+    def finish_part(part, output_file):
+        output_files.append(output_file)
+        if on_part_done:
+            on_part_done(part, output_file)
+    
+    # Frame loop and delivery encode report separately to /api/pipeline/status (see progress.py)
+    # Frame counts come from the shared media index, probing only chunks it does not know yet
+    media = index_paths(video_files)
+    chunk_frames = [media[os.path.abspath(video_file)]['frameCount'] for video_file in video_files]
+    total_frames_all = sum(chunk_frames)
+    overlay_progress = ProgressReporter('overlay', total=total_frames_all or None)
+    encode_progress = ProgressReporter('overlay-encode', total=total_frames_all or None)
+    frames_before = 0
     
     for i, video_file in enumerate(video_files, 1):
         # Use unique number for this video
         unique_number = start_number + i - 1
         print(f"Processing Part {i} (Video #{unique_number}): {video_file}")
+        output_file = os.path.join(output_dir, f"video_{unique_number}.mp4")
+        part_params = _part_params(caption, unique_number, profile, renditions)
+        
+        # Resume: reuse a part this job already completed, if its chunk and outputs are unchanged
+        if journal and journal.unit('overlay', os.path.basename(output_file), [os.path.abspath(video_file)],
+                                    part_params):
+            print(f"Video {unique_number} already completed by this job: {output_file}")
+            finish_part(unique_number, output_file)
+            rendered[os.path.basename(output_file)] = {'part': unique_number, 'chunk': os.path.abspath(video_file),
+                                                       **_file_signature(video_file)}
+            frames_before += chunk_frames[i - 1]
+            overlay_progress.update(frames_before, message=f"Part {i}/{len(video_files)}: resumed")
+            encode_progress.update(frames_before, message=f"Part {i}/{len(video_files)}: resumed")
+            continue
         
         try:
+            # Anything left at the part's output paths is from an interrupted or older render
+            for stale_file in _rendition_files(output_file, renditions):
+                if os.path.exists(stale_file):
+                    os.remove(stale_file)
+            
             # Open video file
             cap = cv2.VideoCapture(video_file)
             
@@ -104,141 +256,337 @@ def overlay_text_on_chunks_opencv(video_files: List[str], caption: str, output_d
                 print(f"Error: Could not open video file {video_file}")
                 continue
             
-            # Get video properties
-            fps = int(cap.get(cv2.CAP_PROP_FPS))
+            # Get video properties; fractional rates (e.g. 29.97) are kept so the
+            # frames stay in sync with the original audio
+            fps = cap.get(cv2.CAP_PROP_FPS)
             width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
             
             # Calculate frames for 5 seconds
-            overlay_frames = min(5 * fps, total_frames)
+            overlay_frames = min(CAPTION_SECONDS * int(fps), total_frames)
             
             # Create output video writer with unique number
             temp_output_file = os.path.join(output_dir, f"video_{unique_number}_temp.mp4")
-            output_file = os.path.join(output_dir, f"video_{unique_number}.mp4")
             
             fourcc = cv2.VideoWriter_fourcc(*'mp4v')
             out = cv2.VideoWriter(temp_output_file, fourcc, fps, (width, height))
             
             # Use only the caption for overlay
-            full_text = f"Part {unique_number} | {caption}"
-            words = full_text.split()
-            
-            # Split words into lines of max 4 words each
-            text_lines = []
-            for j in range(0, len(words), 4):
-                line = " ".join(words[j:j+4])
-                text_lines.append(line)
-            
-            # Text properties
-            font = cv2.FONT_HERSHEY_SIMPLEX
-            font_scale = 1.8  # Increased text size
-            text_color = (0, 0, 0)  # Black text
-            bg_color = (255, 255, 255)  # White background
-            border_color = (0, 0, 0)  # Black border
-            border_thickness = 3
-            corner_radius = 15
-            thickness = 3  # Increased text thickness
-            padding = 20  # Increased padding around text
-            line_spacing = 15  # Increased space between lines
-            
-            # Calculate total text dimensions
-            max_text_width = 0
-            total_text_height = 0
-            line_heights = []
-            
-            for line in text_lines:
-                (line_width, line_height), baseline = cv2.getTextSize(line, font, font_scale, thickness)
-                max_text_width = max(max_text_width, line_width)
-                line_heights.append(line_height)
-                total_text_height += line_height + line_spacing
-            
-            total_text_height -= line_spacing  # Remove extra spacing from last line
-            
-            # Calculate background rectangle dimensions
-            bg_width = max_text_width + (padding * 2)
-            bg_height = total_text_height + (padding * 2)
-            
-            # Position the background rectangle (centered horizontally, margin from top)
-            bg_x = (width - bg_width) // 2
-            bg_y = 250  # 250px margin from top (moved down by 50px)
-            
-            # Calculate text starting position
-            text_start_x = bg_x + padding
-            text_start_y = bg_y + padding
-            
-            frame_count = 0
+            layout = layout_caption(f"Part {unique_number} | {caption}", width)
             
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
+            def compose(index, frame):
                 # Add text overlay for first 5 seconds
-                if frame_count < overlay_frames:
-                    # Draw simple rectangle with background and border (no artifacts)
-                    draw_simple_rectangle_with_border(frame, (bg_x, bg_y), (bg_x + bg_width, bg_y + bg_height), 
-                                                     bg_color, border_color, border_thickness)
-                    
-                    # Draw each line of text
-                    current_y = text_start_y
-                    for idx, line in enumerate(text_lines):
-                        line_height = line_heights[idx]
-                        # Center each line horizontally within the background
-                        (line_width, _), _ = cv2.getTextSize(line, font, font_scale, thickness)
-                        line_x = bg_x + (bg_width - line_width) // 2
-                        
-                        cv2.putText(frame, line, (line_x, current_y + line_height), font, font_scale, 
-                                  text_color, thickness, cv2.LINE_AA)
-                        current_y += line_height + line_spacing
-                
-                out.write(frame)
-                frame_count += 1
+                if index < overlay_frames:
+                    draw_caption(frame, layout)
             
-            # Release everything
-            cap.release()
-            out.release()
+            def written(count):
+                overlay_progress.update(frames_before + count,
+                                        message=f"Part {i}/{len(video_files)}: frame {count}/{total_frames}")
             
-            # Use FFmpeg to copy audio from original file to processed video
+            # Decode, caption and write overlap on separate threads (see frame_pipeline.py)
+            pipeline = FramePipeline(capture_reader(cap), compose, out.write, (height, width, 3),
+                                     workers=compose_workers(threads), on_written=written)
             try:
+                frame_count = pipeline.run()
+            finally:
+                # Release everything
+                cap.release()
+                out.release()
+            
+            # Use FFmpeg to encode the final chunk at delivery settings with the original audio,
+            # so it can be uploaded without another encode; extra renditions share its decode
+            try:
+                output_args, rendition_files = rendition_output_args(
+                    output_file, delivery_profile, renditions,
+                    video='0:v:0',           # Video from first input (processed)
+                    audio='1:a:0?',          # Audio from second input (original), if it has any
+                    # A keyframe where the caption ends lets a caption-only re-render keep the rest
+                    output_args=['-force_key_frames', str(CAPTION_SECONDS),
+                                 *(ffmpeg_thread_args(threads) if threads else [])]
+                )
                 ffmpeg_cmd = [
                     'ffmpeg', '-y',  # -y to overwrite output file
                     '-i', temp_output_file,  # Video input (processed)
                     '-i', video_file,        # Audio input (original)
-                    '-c:v', 'copy',          # Copy video without re-encoding
-                    '-c:a', 'aac',           # Use AAC audio codec
-                    '-map', '0:v:0',         # Map video from first input
-                    '-map', '1:a:0',         # Map audio from second input
-                    output_file
+                    *output_args             # Delivery profile (H.264, AAC, +faststart) per rendition
                 ]
                 
-                result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+                result = run_ffmpeg_with_progress(ffmpeg_cmd, encode_progress, offset=frames_before, check=False)
                 
                 if result.returncode == 0:
                     # Remove temporary file
                     os.remove(temp_output_file)
-                    output_files.append(output_file)
                     print(f"Video {unique_number} completed with audio: {output_file}")
+                    for rendition_file in rendition_files[1:]:
+                        print(f"   Rendition: {rendition_file}")
+                    rendered[os.path.basename(output_file)] = {'part': unique_number, 'chunk': os.path.abspath(video_file),
+                                                               **_file_signature(video_file)}
+                    if journal:
+                        journal.complete_unit('overlay', os.path.basename(output_file), rendition_files,
+                                              [os.path.abspath(video_file)], part_params)
+                    finish_part(unique_number, output_file)
                 else:
-                    print(f"Warning: Audio merge failed for Video {unique_number}")
+                    print(f"Warning: Delivery encode failed for Video {unique_number}")
                     print(f"FFmpeg error: {result.stderr}")
                     # Fallback: use the temp file without audio
                     os.rename(temp_output_file, output_file)
-                    output_files.append(output_file)
+                    finish_part(unique_number, output_file)
                     print(f"Video {unique_number} completed (no audio): {output_file}")
                     
             except FileNotFoundError:
                 print(f"Warning: FFmpeg not found. Video {unique_number} will have no audio.")
                 # Fallback: use the temp file without audio
                 os.rename(temp_output_file, output_file)
-                output_files.append(output_file)
+                finish_part(unique_number, output_file)
                 print(f"Video {unique_number} completed (no audio): {output_file}")
             
+            frames_before += frame_count
+            
         except Exception as e:
             print(f"Error processing {video_file}: {str(e)}")
     
+    failed = None if len(output_files) == len(video_files) else f"{len(video_files) - len(output_files)} chunks failed"
+    overlay_progress.finish(error=failed)
+    encode_progress.finish(error=failed)
+    if rendered:
+        _update_render_state(output_dir, rendered, profile, renditions)
+    return output_files
+
+def part_event_writer(events_file: str) -> Callable[[int, str], None]:
+    """
+    Return an on_part_done callback that appends one NDJSON line per finished part to events_file
+    
+    The API server follows this file to upload each part while later ones are still encoding.
+    """
+    def emit(part, output_file):
+        with open(events_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'event': 'video', 'part': part, 'file': output_file}) + "\n")
+    return emit
+
+def _rendition_files(output_file: str, renditions: List[str]) -> List[str]:
+    """Paths of a part's deliverable and its extra renditions, the deliverable first"""
+    name = os.path.basename(output_file)
+    return [output_file] + [os.path.join(os.path.dirname(output_file), get_rendition(r)['subdir'], name)
+                            for r in renditions]
+
+def _part_params(caption: str, part: int, profile: str, renditions: List[str]) -> dict:
+    """Settings a part's journal record must match to be reused"""
+    return {'caption': caption, 'part': part, 'profile': profile, 'renditions': list(renditions),
+            'captionSeconds': CAPTION_SECONDS}
+
+def _file_signature(path: str) -> dict:
+    """Size and modification time, to tell whether a kept chunk is still the one rendered"""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+def _load_render_state(output_dir: str) -> Optional[dict]:
+    """Read the record of the last render, or None if there is none"""
+    try:
+        with open(os.path.join(output_dir, RENDER_STATE_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _update_render_state(output_dir: str, rendered: dict, profile: str, renditions: List[str]):
+    """
+    Record which chunk, profile and renditions produced each output
+    
+    Parts rendered with different settings than the recorded ones replace
+    the whole record, since the caption-only path needs them to match.
+    """
+    state = _load_render_state(output_dir)
+    if not state or state.get('profile') != profile or state.get('renditions') != list(renditions):
+        state = {'profile': profile, 'renditions': list(renditions), 'captionSeconds': CAPTION_SECONDS, 'parts': {}}
+    state['parts'].update(rendered)
+    
+    state_path = os.path.join(output_dir, RENDER_STATE_FILE)
+    with open(f"{state_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(f"{state_path}.tmp", state_path)
+
+def _caption_keyframe(output_files: List[str]) -> Optional[float]:
+    """
+    Find the keyframe where the caption ends, shared by every rendition of a part
+    
+    Returns:
+        Time of the first keyframe at or after CAPTION_SECONDS, or None when the
+        renditions disagree or the part has nothing after it
+    """
+    keyframe = None
+    for output_file in output_files:
+        info = get_media_info(output_file, keyframes=True)
+        after = [t for t in (info['keyframes'] or []) if t >= CAPTION_SECONDS - 0.001]
+        if not after or after[0] >= info['duration'] - 0.001:
+            return None
+        if keyframe is not None and abs(after[0] - keyframe) > 0.001:
+            return None
+        keyframe = after[0]
+    return keyframe
+
+def _recaption_part(output_file: str, entry: dict, caption: str, work_dir: str, profile: dict,
+                    renditions: List[str], threads: Optional[int] = None) -> bool:
+    """
+    Re-apply the caption to one part, re-encoding only the GOPs the caption touches
+    
+    The frames up to the keyframe where the caption ends are decoded from the
+    kept chunk, captioned and encoded again; everything after that keyframe,
+    and the audio, is copied from the existing output.
+    
+    Returns:
+        True if the part was re-rendered, False if it needs a full overlay
+    """
+    chunk = entry['chunk']
+    if not os.path.exists(chunk) or _file_signature(chunk) != {'size': entry['size'], 'mtime': entry['mtime']}:
+        return False
+    
+    name = os.path.basename(output_file)
+    outputs = _rendition_files(output_file, renditions)
+    if not all(os.path.exists(path) for path in outputs):
+        return False
+    keyframe = _caption_keyframe(outputs)
+    if keyframe is None:
+        return False
+    
+    cap = cv2.VideoCapture(chunk)
+    if not cap.isOpened():
+        return False
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    # Outputs timestamped at another rate (e.g. rendered at a rounded rate) cannot be spliced frame-exactly
+    if fps <= 0 or abs(get_media_info(outputs[0])['fps'] - fps) > 0.01:
+        cap.release()
+        return False
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    # The keyframe is the timestamp of a frame, so this counts the frames before it
+    head_frames = int(round(keyframe * fps))
+    overlay_frames = CAPTION_SECONDS * int(fps)
+    layout = layout_caption(f"Part {entry['part']} | {caption}", width)
+    
+    # Encode the captioned head of every rendition from one pass over the frames
+    head_file = os.path.join(work_dir, name)
+    head_args, heads = rendition_output_args(
+        head_file, profile, renditions, video='0:v:0', audio=None,
+        output_args=ffmpeg_thread_args(threads) if threads else []
+    )
+    encoder_log = tempfile.TemporaryFile(dir=work_dir)
+    encoder = subprocess.Popen(
+        ['ffmpeg', '-y', '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}', '-r', f'{fps:.6f}',
+         '-i', 'pipe:0', *head_args],
+        stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=encoder_log
+    )
+    
+    def compose(index, frame):
+        if index < overlay_frames:
+            draw_caption(frame, layout)
+    
+    pipeline = FramePipeline(capture_reader(cap), compose, encoder.stdin.write, (height, width, 3),
+                             workers=compose_workers(threads), limit=head_frames)
+    frame_count = 0
+    try:
+        frame_count = pipeline.run()
+    except OSError:
+        # The encoder exited early; its log says why
+        pass
+    finally:
+        cap.release()
+        encoder.stdin.close()
+        encoder.wait()
+    encoder_log.seek(0)
+    stderr = encoder_log.read().decode(errors='replace')
+    encoder_log.close()
+    if encoder.returncode != 0 or frame_count < head_frames:
+        print(f"Warning: Caption re-encode failed for {name}: {stderr[-500:]}")
+        return False
+    
+    # Splice each new head onto the existing output from the keyframe on, keeping its audio
+    for head, target in zip(heads, outputs):
+        list_file = f"{head}.txt"
+        with open(list_file, 'w', encoding='utf-8') as f:
+            f.write(f"file '{os.path.abspath(head)}'\nfile '{os.path.abspath(target)}'\ninpoint {keyframe:.6f}\n")
+        spliced = f"{head}.spliced.mp4"
+        result = subprocess.run(
+            ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', list_file, '-i', target,
+             '-map', '0:v:0', '-map', '1:a:0?', '-c', 'copy', '-movflags', '+faststart', spliced],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            print(f"Warning: Splicing {target} failed: {result.stderr[-500:]}")
+            return False
+        os.replace(spliced, target)
+    return True
+
+def recaption_chunks(caption: str, output_dir: str, threads: Optional[int] = None,
+                     journal: Optional[JobJournal] = None) -> Optional[List[str]]:
+    """
+    Re-apply only the "Part N | caption" overlay to the last render
+    
+    Each part is spliced in place (see _recaption_part); a part whose kept
+    chunk or outputs do not match the render record gets a full overlay of
+    its chunk instead.
+    
+    Args:
+        caption: New caption text
+        output_dir: Directory holding the last render and its record
+        threads: Cap on ffmpeg threads
+        journal: Job journal, updated with the re-captioned parts
+    
+    Returns:
+        List of output file paths, or None if there is no render to reuse
+    """
+    state = _load_render_state(output_dir)
+    if not state or not state.get('parts'):
+        return None
+    
+    profile = get_profile(state['profile'])
+    renditions = state['renditions']
+    parts = sorted(state['parts'].items(), key=lambda item: item[1]['part'])
+    progress = ProgressReporter('recaption', total=len(parts), unit='chunks')
+    
+    output_files = []
+    work_dir = tempfile.mkdtemp(prefix='.recaption-', dir=output_dir)
+    try:
+        for done, (name, entry) in enumerate(parts, 1):
+            output_file = os.path.join(output_dir, name)
+            if _recaption_part(output_file, entry, caption, work_dir, profile, renditions, threads):
+                print(f"Video {entry['part']} re-captioned: {output_file}")
+                output_files.append(output_file)
+                if journal:
+                    journal.complete_unit('overlay', name, _rendition_files(output_file, renditions), [entry['chunk']],
+                                          _part_params(caption, entry['part'], state['profile'], renditions))
+            elif os.path.exists(entry['chunk']):
+                print(f"Video {entry['part']}: kept render does not match, running the full overlay")
+                output_files += overlay_text_on_chunks_opencv([entry['chunk']], caption, output_dir,
+                                                              start_number=entry['part'], threads=threads,
+                                                              profile=state['profile'], renditions=renditions,
+                                                              journal=journal)
+            else:
+                print(f"Warning: Chunk for Video {entry['part']} is gone; it keeps its old caption")
+            progress.update(done, message=f"Part {entry['part']}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    progress.finish(error=None if len(output_files) == len(parts) else f"{len(parts) - len(output_files)} parts failed")
     return output_files
 
+def _resumable_outputs(journal: JobJournal, video_files: List[str], caption: str, output_dir: str,
+                       profile: str, renditions: List[str]) -> List[str]:
+    """
+    Outputs of the parts the journal records as completed with the same chunks and settings
+    
+    Returns:
+        Their deliverables and renditions, plus the render record when there are any
+    """
+    keep = []
+    for part, video_file in enumerate(video_files, 1):
+        output_file = os.path.join(output_dir, f"video_{part}.mp4")
+        if journal.unit('overlay', os.path.basename(output_file), [os.path.abspath(video_file)],
+                        _part_params(caption, part, profile, renditions)):
+            keep += _rendition_files(output_file, renditions)
+    if keep:
+        keep.append(os.path.join(output_dir, RENDER_STATE_FILE))
+    return keep
+
 def get_video_chunks(chunks_dir: str) -> List[str]:
     """
     Get all video files from the chunks directory
@@ -247,11 +595,16 @@ def get_video_chunks(chunks_dir: str) -> List[str]:
         chunks_dir: Directory containing video chunks
     
     Returns:
-        Sorted list of video file paths
+        Sorted list of video file paths (manifest order when chunk_planner.py wrote one)
     """
     if not os.path.exists(chunks_dir):
         return []
     
+    # The planner's manifest gives the playback order
+    manifest_chunks = load_manifest(chunks_dir)
+    if manifest_chunks is not None:
+        return manifest_chunks
+    
     # Common video file extensions
     video_extensions = {'.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm'}
     
@@ -260,12 +613,22 @@ def get_video_chunks(chunks_dir: str) -> List[str]:
         if os.path.splitext(file.lower())[1] in video_extensions:
             video_files.append(os.path.join(chunks_dir, file))
     
-    # Sort files to ensure consistent processing order
-    return sorted(video_files)
+    # Sort files numerically so chunk_10 comes after chunk_9
+    return sorted(video_files, key=lambda f: [int(part) if part.isdigit() else part
+                                              for part in re.split(r'(\d+)', os.path.basename(f))])
 
 def main():
     """Main function to run the script"""
     
+    parser = argparse.ArgumentParser(description="Overlay the caption on the video chunks")
+    parser.add_argument('--caption-only', action='store_true',
+                        help="Re-apply only the caption to the last render, reusing its kept chunks")
+    parser.add_argument('--clean-chunks', action='store_true', default=os.environ.get('OVERLAY_CLEAN_CHUNKS') == '1',
+                        help="Delete the chunks after processing (disables --caption-only for this render)")
+    parser.add_argument('--events', default=os.environ.get('OVERLAY_EVENTS_FILE'),
+                        help="Append an NDJSON line to this file as each video is finished")
+    args = parser.parse_args()
+    
     # Read caption from caption.txt
     try:
         with open("caption.txt", "r", encoding="utf-8") as f:
@@ -284,12 +647,27 @@ def main():
     # Output directory
     OUTPUT_DIR = r"processed_videos"
     
-    # Clean only the processed videos directory before processing
-    clean_processed_videos_directory(OUTPUT_DIR)
+    # Parts this job completed before it was interrupted are reused (see job_journal.py)
+    journal = JobJournal()
+    
+    if args.caption_only:
+        # Caption A/B variants: splice the new caption into the existing outputs
+        with core_allotment('overlay') as cores:
+            output_files = recaption_chunks(CAPTION, OUTPUT_DIR, threads=cores, journal=journal)
+        if output_files is not None:
+            print(f"\n{len(output_files)} videos re-captioned")
+            for file in output_files:
+                print(f"   {file}")
+            return
+        print("No earlier render to reuse; running the full overlay")
     
     # Get all video chunks from the directory
     VIDEO_CHUNKS = get_video_chunks(CHUNKS_DIR)
     
+    # Clean only the processed videos directory before processing, keeping parts this job already completed
+    clean_processed_videos_directory(OUTPUT_DIR, keep=_resumable_outputs(journal, VIDEO_CHUNKS, CAPTION, OUTPUT_DIR,
+                                                                         DEFAULT_PROFILE, DEFAULT_RENDITIONS))
+    
     if not VIDEO_CHUNKS:
         print(f"No video files found in '{CHUNKS_DIR}' directory.")
         print(f"Please ensure video files exist in: {os.path.abspath(CHUNKS_DIR)}")
@@ -302,8 +680,12 @@ def main():
     print(f"Output directory: {OUTPUT_DIR}")
     print("-" * 50)
     
-    # Process the videos with numbering starting from 1
-    output_files = overlay_text_on_chunks_opencv(VIDEO_CHUNKS, CAPTION, OUTPUT_DIR, start_number=1)
+    # Process the videos with numbering starting from 1, within this stage's share of the host's cores
+    with core_allotment('overlay') as cores:
+        output_files = overlay_text_on_chunks_opencv(VIDEO_CHUNKS, CAPTION, OUTPUT_DIR, start_number=1, threads=cores,
+                                                     profile=DEFAULT_PROFILE, renditions=DEFAULT_RENDITIONS,
+                                                     journal=journal,
+                                                     on_part_done=part_event_writer(args.events) if args.events else None)
     
     print("\n" + "=" * 50)
     print("Processing complete!")
@@ -312,9 +694,10 @@ def main():
     for file in output_files:
         print(f"   {file}")
     
-    # Clean chunks directory after processing
-    clean_chunks_directory(CHUNKS_DIR)
-    print("Chunks directory cleaned after processing")
+    # The chunks are kept so --caption-only can reuse them; the next chunking run replaces them
+    if args.clean_chunks:
+        clean_chunks_directory(CHUNKS_DIR)
+        print("Chunks directory cleaned after processing")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file